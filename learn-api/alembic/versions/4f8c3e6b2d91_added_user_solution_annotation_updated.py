@@ -0,0 +1,33 @@
+"""Added user solution annotation updated
+
+Revision ID: 4f8c3e6b2d91
+Revises: 9b4e2d7a1c35
+Create Date: 2026-10-18 17:41:05.218733
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = "4f8c3e6b2d91"
+down_revision = "9b4e2d7a1c35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "usersolutionannotation",
+        sa.Column(
+            "updated",
+            mysql.DATETIME(fsp=6),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP(6)"),
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("usersolutionannotation", "updated")
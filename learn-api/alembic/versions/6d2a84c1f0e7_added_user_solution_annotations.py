@@ -0,0 +1,118 @@
+"""Added user solution annotations
+
+Revision ID: 6d2a84c1f0e7
+Revises: 3c7e1f92ab54
+Create Date: 2026-10-18 11:24:52.391046
+
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "6d2a84c1f0e7"
+down_revision = "3c7e1f92ab54"
+branch_labels = None
+depends_on = None
+
+user_solution = sa.table(
+    "usersolution",
+    sa.column("user_id", sa.CHAR(36)),
+    sa.column("task_id", sa.Integer()),
+    sa.column("solution_data", sa.JSON()),
+)
+user_solution_annotation = sa.table(
+    "usersolutionannotation",
+    sa.column("id", sa.Integer()),
+    sa.column("user_id", sa.CHAR(36)),
+    sa.column("task_id", sa.Integer()),
+    sa.column("annotation_id", sa.String(255)),
+    sa.column("data", sa.JSON()),
+)
+
+
+def get_annotation_id(data):
+    return data.get("id") if isinstance(data, dict) else None
+
+
+def upgrade():
+    op.create_table(
+        "usersolutionannotation",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.CHAR(length=36), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("annotation_id", sa.String(length=255), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id", "task_id"],
+            ["usersolution.user_id", "usersolution.task_id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_usersolutionannotation_user_id_task_id_annotation_id",
+        "usersolutionannotation",
+        ["user_id", "task_id", "annotation_id"],
+        unique=False,
+    )
+
+    # The annotations keep their order, as the rows are inserted in the order of the arrays
+    conn = op.get_bind()
+    for row in conn.execute(
+        sa.select(
+            user_solution.c.user_id,
+            user_solution.c.task_id,
+            user_solution.c.solution_data,
+        )
+    ).fetchall():
+        solution_data = row.solution_data
+        if isinstance(solution_data, str):
+            solution_data = json.loads(solution_data)
+        if not solution_data:
+            continue
+        conn.execute(
+            user_solution_annotation.insert(),
+            [
+                {
+                    "user_id": row.user_id,
+                    "task_id": row.task_id,
+                    "annotation_id": get_annotation_id(data),
+                    "data": data,
+                }
+                for data in solution_data
+            ],
+        )
+
+    op.drop_column("usersolution", "solution_data")
+
+
+def downgrade():
+    op.add_column("usersolution", sa.Column("solution_data", sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    solution_data = {}
+    for row in conn.execute(
+        sa.select(
+            user_solution_annotation.c.user_id,
+            user_solution_annotation.c.task_id,
+            user_solution_annotation.c.data,
+        ).order_by(user_solution_annotation.c.id)
+    ).fetchall():
+        solution_data.setdefault((row.user_id, row.task_id), []).append(row.data)
+
+    conn.execute(user_solution.update().values(solution_data=[]))
+    for (user_id, task_id), data in solution_data.items():
+        conn.execute(
+            user_solution.update()
+            .where(user_solution.c.user_id == user_id)
+            .where(user_solution.c.task_id == task_id)
+            .values(solution_data=data)
+        )
+
+    op.alter_column(
+        "usersolution", "solution_data", existing_type=sa.JSON(), nullable=False
+    )
+    op.drop_table("usersolutionannotation")
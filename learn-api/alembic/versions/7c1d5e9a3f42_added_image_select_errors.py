@@ -0,0 +1,43 @@
+"""Added image select errors
+
+Revision ID: 7c1d5e9a3f42
+Revises: 4f8c3e6b2d91
+Create Date: 2026-10-18 19:12:44.530918
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "7c1d5e9a3f42"
+down_revision = "4f8c3e6b2d91"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled with python -m app.rebuild_image_select_errors from the existing task statistics
+    op.create_table(
+        "imageselecterror",
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("task_image_id", sa.String(length=255), nullable=False),
+        sa.Column("base_task_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.ForeignKeyConstraint(["base_task_id"], ["basetask.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["task_id"], ["task.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("task_id", "task_image_id"),
+    )
+    op.create_index(
+        op.f("ix_imageselecterror_base_task_id"),
+        "imageselecterror",
+        ["base_task_id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_imageselecterror_base_task_id"), table_name="imageselecterror"
+    )
+    op.drop_table("imageselecterror")
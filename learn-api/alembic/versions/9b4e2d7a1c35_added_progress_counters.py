@@ -0,0 +1,110 @@
+"""Added progress counters
+
+Revision ID: 9b4e2d7a1c35
+Revises: 6d2a84c1f0e7
+Create Date: 2026-10-18 15:02:17.846213
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "9b4e2d7a1c35"
+down_revision = "6d2a84c1f0e7"
+branch_labels = None
+depends_on = None
+
+user_solution = sa.table(
+    "usersolution",
+    sa.column("user_id", sa.CHAR(36)),
+    sa.column("course_id", sa.Integer()),
+    sa.column("task_group_id", sa.Integer()),
+    sa.column("base_task_id", sa.Integer()),
+    sa.column("percentage_solved", sa.Numeric(5, 2)),
+    sa.column("task_result", sa.JSON()),
+)
+progress_counter = sa.table(
+    "progresscounter",
+    sa.column("user_id", sa.CHAR(36)),
+    sa.column("scope", sa.Integer()),
+    sa.column("scope_id", sa.Integer()),
+    sa.column("course_id", sa.Integer()),
+    sa.column("percentage_solved", sa.Numeric(10, 2)),
+    sa.column("correct_tasks", sa.Integer()),
+    sa.column("wrong_tasks", sa.Integer()),
+)
+
+
+def upgrade():
+    op.create_table(
+        "progresscounter",
+        sa.Column("user_id", sa.CHAR(length=36), nullable=False),
+        sa.Column("scope", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("scope_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "percentage_solved",
+            sa.Numeric(precision=10, scale=2),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+        sa.Column(
+            "correct_tasks", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.Column(
+            "wrong_tasks", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["course_id"], ["course.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "scope", "scope_id"),
+    )
+    op.create_index(
+        op.f("ix_progresscounter_course_id"),
+        "progresscounter",
+        ["course_id"],
+        unique=False,
+    )
+
+    # Same aggregation as CRUDProgressCounter.rebuild, scopes are course, task group and base task
+    correct = user_solution.c.percentage_solved == 1.00
+    wrong = sa.and_(
+        sa.func.JSON_LENGTH(user_solution.c.task_result) != 1,
+        user_solution.c.percentage_solved != 1.00,
+    )
+    for scope, column in enumerate(
+        [
+            user_solution.c.course_id,
+            user_solution.c.task_group_id,
+            user_solution.c.base_task_id,
+        ]
+    ):
+        op.execute(
+            progress_counter.insert().from_select(
+                [
+                    "user_id",
+                    "scope",
+                    "scope_id",
+                    "course_id",
+                    "percentage_solved",
+                    "correct_tasks",
+                    "wrong_tasks",
+                ],
+                sa.select(
+                    user_solution.c.user_id,
+                    sa.literal(scope),
+                    column,
+                    user_solution.c.course_id,
+                    sa.func.coalesce(sa.func.sum(user_solution.c.percentage_solved), 0),
+                    sa.func.sum(sa.case((correct, 1), else_=0)),
+                    sa.func.sum(sa.case((wrong, 1), else_=0)),
+                )
+                .where(column.isnot(None), user_solution.c.course_id.isnot(None))
+                .group_by(user_solution.c.user_id, column, user_solution.c.course_id),
+            )
+        )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_progresscounter_course_id"), table_name="progresscounter")
+    op.drop_table("progresscounter")
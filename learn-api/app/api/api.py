@@ -9,6 +9,7 @@ from app.api.endpoints import (
     task,
     annotations,
     questionnaires,
+    exports,
 )
 
 """
@@ -28,3 +29,4 @@ api_router.include_router(
 api_router.include_router(
     annotations.router, prefix="/annotations", tags=["annotations"]
 )
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
@@ -1,18 +1,19 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from starlette.background import BackgroundTasks
 
 from app.core import security
 from app.core.config import settings
 from app.crud.crud_base_task import crud_base_task
 from app.crud.crud_course import crud_course
-from app.crud.crud_user import crud_user
-from app.db.session import SessionLocal, SessionManager, close_session
+from app.crud.crud_user import async_crud_user, crud_user
+from app.db.async_session import AsyncSessionLocal
+from app.db.session import SessionLocal, SessionManager
 from app.models.user import User
 from app.schemas.token import TokenPayload
 from supertokens_python.recipe.session.framework.fastapi import verify_session
@@ -37,9 +38,25 @@ reusable_oauth2 = OAuth2PasswordBearer(
 #         db.close()
 
 
-def get_db(background_tasks: BackgroundTasks):
+def get_db() -> Generator:
+    """
+    Creates a new DB Session, which is closed once the response was sent.
+    Streamed responses can still use it while they are sent. Failed requests close it as well,
+    unlike background tasks which are skipped then.
+
+    :return: DB Session
+    """
     with SessionManager() as db:
-        background_tasks.add_task(close_session, db)
+        yield db
+
+
+async def get_async_db() -> AsyncGenerator:
+    """
+    Creates a new async DB Session for endpoints which run on the event loop.
+
+    :return: Async DB Session
+    """
+    async with AsyncSessionLocal() as db:
         yield db
 
 
@@ -71,11 +88,15 @@ def get_current_user_back(
 
 
 async def get_current_user(
-    db: Session = Depends(get_db), s: SessionContainer = Depends(verify_session())
+    db: AsyncSession = Depends(get_async_db),
+    s: SessionContainer = Depends(verify_session()),
 ):
     user_id = s.get_user_id()
-    loaded_user = crud_user.get(db, id=user_id)
+    loaded_user = await async_crud_user.get(db, id=user_id)
 
+    # Detaches the user, so sync endpoints can add it to their own session, and returns the
+    # connection to the pool. Async endpoints of the request can still use the session.
+    await db.close()
     return loaded_user
 
 
@@ -123,5 +144,5 @@ def check_if_user_can_access_course(db: Session, user_id: str, course_id: int) -
 def check_if_user_can_access_task(
     db: Session, *, user_id: str, base_task_id: int
 ) -> None:
-    base_task = crud_base_task.get(db, id=base_task_id)
-    check_if_user_can_access_course(db, user_id=user_id, course_id=base_task.course_id)
+    course_id = crud_base_task.get_course_id(db, base_task_id=base_task_id)
+    check_if_user_can_access_course(db, user_id=user_id, course_id=course_id)
@@ -3,6 +3,7 @@ import json
 import os
 import traceback
 import uuid
+from collections import Counter
 from io import StringIO
 from typing import Any, Dict, List
 
@@ -11,21 +12,30 @@ import pyvips
 import requests
 from app.api.deps import (
     check_if_user_can_access_course,
+    check_if_user_can_access_task,
     get_current_active_superuser,
+    get_async_db,
     get_current_active_user,
     get_db,
 )
 from app.core.config import settings
+from app.core.export.export_cache import ExportCache
+from app.core.export.export_helper import MEDIA_TYPES
 from app.core.export.task_exporter import TaskExporter
-from app.core.solver.solver import Solver
+from app.core.solver.bulk_solver import BulkSolver
+from app.core.solver.user_solution_solver import UserSolutionSolver
 from app.crud.crud_base_task import crud_base_task
 from app.crud.crud_course import crud_course
+from app.crud.crud_image_select_error import crud_image_select_error
 from app.crud.crud_questionnaire import crud_questionnaire
 from app.crud.crud_task import crud_task
 from app.crud.crud_task_group import crud_task_group
-from app.crud.crud_task_hint import crud_task_hint
+from app.crud.crud_task_hint import async_crud_task_hint, crud_task_hint
 from app.crud.crud_task_statistic import crud_task_statistic
-from app.crud.crud_user_solution import crud_user_solution
+from app.crud.crud_user_solution import (
+    async_crud_user_solution,
+    crud_user_solution,
+)
 from app.models.user import User
 from app.schemas.base_task import (
     BaseTask,
@@ -33,6 +43,7 @@ from app.schemas.base_task import (
     BaseTaskDetail,
     BaseTaskUpdate,
 )
+from app.schemas.export import ExportFormat, ExportKind
 from app.schemas.membersolution_summary import (
     MembersolutionSummary,
     SummaryRow,
@@ -44,21 +55,32 @@ from app.schemas.statistic import (
     WrongLabelDetailStatistic,
     WrongLabelStatistic,
 )
-from app.schemas.task import TaskAnnotationType, TaskCreate, TaskStatus, TaskType
+from app.schemas.task import (
+    SolvableTask,
+    SolveJob,
+    TaskAnnotationType,
+    TaskCreate,
+    TaskStatus,
+    TaskType,
+)
 from app.schemas.task_hint import TaskHint
 from app.schemas.task_statistic import TaskStatisticCreate
 from app.schemas.user_solution import (
     UserSolution,
     UserSolutionCreate,
+    UserSolutionData,
     UserSolutionUpdate,
 )
 from app.utils.logger import logger
 from app.utils.minio_client import MinioClient, minio_client
 from app.utils.timer import Timer
+from app.worker.tasks import create_job_id, is_job_of_user
+from app.worker.tasks import solve_task as solve_task_job
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.datastructures import UploadFile
 from fastapi.params import File, Form
 from pydantic.tools import parse_obj_as
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette.responses import StreamingResponse
 
@@ -228,16 +250,31 @@ def update_base_task(
 
 
 @router.get("/{short_name}", response_model=BaseTaskDetail)
-def read_task_details(
+async def read_task_details(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     short_name: str,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
+    # The tasks are loaded with their questionnaires, questions and answers lazily
+    return await db.run_sync(
+        get_task_details, short_name=short_name, user_id=current_user.id
+    )
+
+
+def get_task_details(db: Session, *, short_name: str, user_id: str) -> BaseTaskDetail:
+    """
+    Returns the base task with the tasks, the solutions and the questionnaire answers of the user.
+
+    :param db: DB-Session, the sync session of an async session in the async endpoint
+    :param short_name: Shortname of the base task
+    :param user_id: id of the user
+    :return: The base task
+    """
     base_task = crud_base_task.get_by_short_name(db, short_name=short_name)
 
     if crud_course.is_not_member_and_owner(
-        db, course_id=base_task.course_id, user_id=current_user.id
+        db, course_id=base_task.course_id, user_id=user_id
     ):
         course = crud_course.get(db, id=base_task.course_id)
         raise HTTPException(
@@ -253,11 +290,16 @@ def read_task_details(
                 }
             },
         )
-    crud_task.remove_new_task(db, base_task_id=base_task.id, user_id=current_user.id)
+    crud_task.remove_new_task(db, base_task_id=base_task.id, user_id=user_id)
 
+    user_solutions = crud_user_solution.get_solutions_to_tasks_and_user(
+        db, user_id=user_id, task_ids=[task.id for task in base_task.tasks]
+    )
     for task in base_task.tasks:
-        task.user_solution = crud_user_solution.get_solution_to_task_and_user(
-            db, task_id=task.id, user_id=current_user.id
+        user_solution = user_solutions.get(task.id)
+        # solution_data is a property, the entity itself would be serialized without it
+        task.user_solution = (
+            UserSolution.from_orm(user_solution) if user_solution else None
         )
         for questionnaire in task.questionnaires:
             is_before = crud_questionnaire.is_before(
@@ -267,14 +309,14 @@ def read_task_details(
             for question in questionnaire.questions:
                 answers = []
                 for answer in question.answers:
-                    if answer.user_id == current_user.id:
+                    if answer.user_id == user_id:
                         answers.append(answer)
                 question.answers = answers
         delattr(task, "solution")
 
     task_group = crud_task_group.get(db=db, id=base_task.task_group_id)
     base_task.task_group_short_name = task_group.short_name
-    return base_task
+    return BaseTaskDetail.from_orm(base_task)
 
 
 @router.get("/{short_name}/admin", response_model=BaseTaskDetail)
@@ -310,6 +352,7 @@ def download_usersolutions(
     *,
     db: Session = Depends(get_db),
     short_name: str,
+    export_format: ExportFormat = ExportFormat.XLSX,
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
     base_task = crud_base_task.get_by_short_name(db, short_name=short_name)
@@ -318,13 +361,19 @@ def download_usersolutions(
         db, user_id=current_user.id, course_id=base_task.course_id
     )
 
-    output = TaskExporter.export_point_base_task_as_xlsx(db, base_task)
+    output = ExportCache.get_stored_export(
+        db, ExportKind.BASE_TASK, base_task, export_format
+    )
+    if output is None:
+        output = TaskExporter.export_point_base_task(db, base_task, export_format)
 
     headers = {
-        "Content-Disposition": 'attachment; filename="' + base_task.short_name + '"'
+        "Content-Disposition": f'attachment; filename="{base_task.short_name}.{export_format.value}"'
     }
 
-    return StreamingResponse(output, headers=headers)
+    return StreamingResponse(
+        output, headers=headers, media_type=MEDIA_TYPES[export_format]
+    )
 
 
 @router.delete("/{short_name}", response_model=BaseTask)
@@ -342,7 +391,9 @@ def delete_base_task(
 
     crud_task.remove_all_to_task_id(db, base_task_id=base_task.id)
     crud_user_solution.remove_all_to_base_task(db, base_task_id=base_task.id)
-    crud_task_statistic.remove_all_by_base_task_id(db, base_task_id=base_task.id)
+    crud_task_statistic.remove_all_by_base_task_id(
+        db, base_task_id=base_task.id, chunk_size=settings.DELETE_CHUNK_SIZE
+    )
 
     for task in base_task.tasks:
         if task.task_type == TaskType.IMAGE_SELECT:
@@ -384,21 +435,20 @@ def get_membersolution_summary(
     for task in base_task.tasks:
         summary.tasks.append(task.task_question)
 
+    task_ids = [task.id for task in base_task.tasks]
+    solutions = crud_user_solution.get_percentage_solved_to_tasks(db, task_ids=task_ids)
+    solved = {
+        (user_id, task_id): 1 if percentage_solved == 1.0 else -1
+        for user_id, task_id, percentage_solved in solutions
+    }
+
     members = sorted(course.members, key=lambda x: x.lastname)
     for member in members:
         row = SummaryRow()
         row.user = SummaryUser()
         row.user.firstname = member.firstname
         row.user.lastname = member.lastname
-        row.summary = []
-        for task in base_task.tasks:
-            user_solution = crud_user_solution.get_solution_to_task_and_user(
-                db, user_id=member.id, task_id=task.id
-            )
-            if user_solution:
-                row.summary.append(1 if user_solution.percentage_solved == 1.0 else -1)
-            else:
-                row.summary.append(0)
+        row.summary = [solved.get((member.id, task_id), 0) for task_id in task_ids]
         summary.rows.append(row)
 
     return summary
@@ -481,51 +531,151 @@ def solve_task(
     timer = Timer()
     timer.start()
     task = crud_task.get(db, id=task_id)
-    user_solution = crud_user_solution.get_solution_to_task_and_user(
-        db, task_id=task_id, user_id=current_user.id
+    task_result = UserSolutionSolver.solve(db, task=task, user_id=current_user.id)
+
+    timer.stop()
+    logger.debug(f"Solving task completed in {timer.total_run_time * 1000}ms")
+    return task_result
+
+
+@router.post("/{task_id}/solve/job", response_model=SolveJob)
+def enqueue_solve_task(
+    *,
+    db: Session = Depends(get_db),
+    task_id: int,
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Solves the task in the background worker instead of the API.
+    The feedback is pushed to the channel of the user and can also be polled with the returned job id.
+    """
+    task = crud_task.get(db, id=task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    job = solve_task_job.apply_async(
+        (task_id, current_user.id), task_id=create_job_id(current_user.id)
+    )
+    return SolveJob(job_id=job.id, task_id=task_id, status=job.status)
+
+
+@router.get("/{task_id}/solve/job/{job_id}", response_model=SolveJob)
+def get_solve_task_job(
+    *,
+    task_id: int,
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+):
+    if not is_job_of_user(job_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job = solve_task_job.AsyncResult(job_id)
+    # The arguments are stored once the job finished
+    if job.args is not None and job.args[0] != task_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    solve_job = SolveJob(job_id=job_id, task_id=task_id, status=job.status)
+    if job.successful():
+        solve_job.task_result = job.result["task_result"]
+    return solve_job
+
+
+@router.post("/{task_id}/solve/all", response_model=Any)
+def solve_task_to_all_users(
+    *,
+    db: Session = Depends(get_db),
+    task_id: int,
+    current_user: User = Depends(get_current_active_superuser),
+):
+    """
+    Solves the task again for every user who has a solution to it.
+    The solutions are solved in parallel and the progress is streamed as one JSON object per line.
+    """
+    task = crud_task.get(db, id=task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    check_if_user_can_access_task(
+        db, user_id=current_user.id, base_task_id=task.base_task_id
     )
-    if user_solution is None:
-        base_task = crud_base_task.get(db=db, id=task.base_task_id)
-        user_solution = crud_user_solution.create(
-            db=db,
-            obj_in=UserSolutionCreate(
-                task_id=task.id,
-                user_id=current_user.id,
-                base_task_id=task.base_task_id,
-                task_group_id=base_task.task_group_id,
-                course_id=base_task.course_id,
-                solution_data=[],
-                percentage_solved=0.0,
-            ),
+
+    solvable_task = SolvableTask.from_orm(task)
+    user_solutions = [
+        UserSolutionData(
+            user_id=user_solution.user_id, solution_data=user_solution.solution_data
+        )
+        for user_solution in crud_user_solution.get_solution_to_task(
+            db, task_id=task_id
         )
-    task_result = Solver.solve(user_solution=user_solution, task=task)
+    ]
+
+    def solve_all():
+        timer = Timer()
+        timer.start()
+        solved = 0
+        correct = 0
+        for results in BulkSolver.solve(
+            task=solvable_task,
+            user_solutions=user_solutions,
+            max_workers=settings.SOLVER_PROCESSES,
+        ):
+            crud_user_solution.update_task_results(
+                db,
+                task_id=task_id,
+                task_results=[
+                    (user_solution.user_id, task_result)
+                    for user_solution, task_result in results
+                ],
+            )
+            crud_image_select_error.add_first_attempts(
+                db,
+                task=task,
+                solutions=[
+                    (user_solution.user_id, user_solution.solution_data)
+                    for user_solution, _ in results
+                ],
+                commit=False,
+            )
+            solved_date = datetime.datetime.now()
+            crud_task_statistic.create_multi(
+                db,
+                objs_in=[
+                    TaskStatisticCreate(
+                        user_id=user_solution.user_id,
+                        task_id=task_id,
+                        base_task_id=task.base_task_id,
+                        solved_date=solved_date,
+                        percentage_solved=(
+                            1.0
+                            if task_result.task_status == TaskStatus.CORRECT
+                            else 0.0
+                        ),
+                        solution_data=user_solution.solution_data,
+                        task_result=task_result,
+                    )
+                    for user_solution, task_result in results
+                ],
+            )
+            solved += len(results)
+            correct += sum(
+                1
+                for _, task_result in results
+                if task_result.task_status == TaskStatus.CORRECT
+            )
+            yield json.dumps(
+                {
+                    "task_id": task_id,
+                    "solved": solved,
+                    "correct": correct,
+                    "total": len(user_solutions),
+                }
+            ) + "\n"
 
-    solution_update = UserSolutionUpdate(task_result=task_result)
-    if task_result.task_status == TaskStatus.CORRECT:
-        solution_update.percentage_solved = 1.0
-    else:
-        crud_user_solution.increment_failed_attempts(
-            db, user_id=current_user.id, task_id=task_id
+        timer.stop()
+        logger.debug(
+            f"Solving {len(user_solutions)} solutions completed in {timer.total_run_time * 1000}ms"
         )
-        solution_update.percentage_solved = 0.0
-    crud_user_solution.update(db, db_obj=user_solution, obj_in=solution_update)
-
-    crud_task_statistic.create(
-        db,
-        obj_in=TaskStatisticCreate(
-            user_id=current_user.id,
-            task_id=task.id,
-            base_task_id=user_solution.base_task_id,
-            solved_date=datetime.datetime.now(),
-            percentage_solved=solution_update.percentage_solved,
-            solution_data=user_solution.solution_data,
-            task_result=task_result,
-        ),
-    )
 
-    timer.stop()
-    logger.debug(f"Solving task completed in {timer.total_run_time * 1000}ms")
-    return task_result
+    return StreamingResponse(solve_all(), media_type="application/x-ndjson")
 
 
 @router.get("/{task_id}/solve/{user_id}", response_model=Any)
@@ -539,46 +689,8 @@ def solve_task_to_user(
     timer = Timer()
     timer.start()
     task = crud_task.get(db, id=task_id)
-    user_solution = crud_user_solution.get_solution_to_task_and_user(
-        db, task_id=task_id, user_id=user_id
-    )
-    if user_solution is None:
-        base_task = crud_base_task.get(db=db, id=task.base_task_id)
-        user_solution = crud_user_solution.create(
-            db=db,
-            obj_in=UserSolutionCreate(
-                task_id=task.id,
-                user_id=user_id,
-                base_task_id=task.base_task_id,
-                task_group_id=base_task.task_group_id,
-                course_id=base_task.course_id,
-                solution_data=[],
-                percentage_solved=0.0,
-            ),
-        )
-    task_result = Solver.solve(user_solution=user_solution, task=task, force_solve=True)
-
-    solution_update = UserSolutionUpdate(task_result=task_result)
-    if task_result.task_status == TaskStatus.CORRECT:
-        solution_update.percentage_solved = 1.0
-    else:
-        crud_user_solution.increment_failed_attempts(
-            db, user_id=user_id, task_id=task_id
-        )
-        solution_update.percentage_solved = 0.0
-    crud_user_solution.update(db, db_obj=user_solution, obj_in=solution_update)
-
-    crud_task_statistic.create(
-        db,
-        obj_in=TaskStatisticCreate(
-            user_id=user_id,
-            task_id=task.id,
-            base_task_id=user_solution.base_task_id,
-            solved_date=datetime.datetime.now(),
-            percentage_solved=solution_update.percentage_solved,
-            solution_data=user_solution.solution_data,
-            task_result=task_result,
-        ),
+    task_result = UserSolutionSolver.solve(
+        db, task=task, user_id=user_id, force_solve=True
     )
 
     timer.stop()
@@ -626,15 +738,15 @@ def remove_task_hint(
 
 
 @router.get("/hints/{task_id}", response_model=List[TaskHint])
-def get_task_hints(
+async def get_task_hints(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     task_id: int,
     current_user: User = Depends(get_current_active_user),
 ):
     failed_attempts = 99999999
 
-    user_solution = crud_user_solution.get_solution_to_task_and_user(
+    user_solution = await async_crud_user_solution.get_solution_to_task_and_user(
         db, task_id=task_id, user_id=current_user.id
     )
 
@@ -644,143 +756,79 @@ def get_task_hints(
     if user_solution:
         failed_attempts = user_solution.failed_attempts
 
-    hints = crud_task_hint.get_hints_by_task(
+    hints = await async_crud_task_hint.get_hints_by_task(
         db, task_id=task_id, mistakes=failed_attempts
     )
     return hints
 
 
-@router.get("/{short_name}/statistic", response_model=Any)
-def get_statistic_to_base_task(*, db: Session = Depends(get_db), short_name: str):
-    base_task = crud_base_task.get_by_short_name(db, short_name=short_name)
+def load_task_images(task_image_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Loads the names and labels of the task images from the slide api with a single request
 
-    (
-        task_statistics,
-        task_ids,
-    ) = crud_task_statistic.get_oldest_task_statistics_to_base_task_id(
-        db, base_task_id=base_task.id
-    )
+    :param task_image_ids: Ids of the task images
+    :return: The found task images by their id
+    """
+    if len(task_image_ids) == 0:
+        return {}
+    try:
+        images = requests.get(
+            settings.SLIDE_URL + "/task-images",
+            params={"taskimageid": task_image_ids},
+            timeout=10,
+        ).json()
+    except Exception as e:
+        logger.warning(f"Task images not found: {e}")
+        return {}
+    return {image["task_image_id"]: image for image in images}
 
-    mapped_tasks = {}
-
-    for task_id in task_ids:
-        if task_id not in mapped_tasks:
-            mapped_tasks[task_id] = crud_task.get(db, id=task_id)
-
-    task_data = []
-    loaded_images = []
-
-    for task in mapped_tasks.values():
-        if task.task_data:
-            task_data.extend(task.task_data)
-        if len(task_data) > 0 and task.task_type == TaskType.IMAGE_SELECT:
-            print(task_data)
-            image_query = "&taskimageid=".join(task_data)
-            loaded_images.append(
-                requests.get(
-                    settings.SLIDE_URL + "/task-images?taskimageid=" + image_query
-                ).json()
-            )
-        else:
-            return ImageSelectStatistic(
-                wrong_image_statistics=[], wrong_label_statistics=[]
-            )
 
-    most_wrong_picked_images = {}
-    most_wrong_classified_images = {}
+@router.get("/{short_name}/statistic", response_model=ImageSelectStatistic)
+def get_statistic_to_base_task(*, db: Session = Depends(get_db), short_name: str):
+    """
+    Returns the most wrongly selected images and the labels of the wrongly selected images per task question.
+    Only the first attempt of every user to a task is counted.
+    """
+    base_task = crud_base_task.get_by_short_name(db, short_name=short_name)
+    if base_task is None:
+        raise HTTPException(status_code=404, detail="Base task not found")
 
-    for task_statistic in task_statistics:
-        task = mapped_tasks[task_statistic.task_id]
-        if task.task_type == TaskType.IMAGE_SELECT:
-            for image_uuid in task_statistic.solution_data:
-                if not image_uuid in task.solution:
-                    image = next(
-                        (
-                            image
-                            for image in loaded_images
-                            if image["task_image_id"] == image_uuid
-                        ),
-                        None,
-                    )
-                    if image:
-                        if image["label"]:
-                            if task.task_question in most_wrong_classified_images:
-                                if (
-                                    image["label"]
-                                    in most_wrong_classified_images[task.task_question]
-                                ):
-                                    most_wrong_classified_images[task.task_question][
-                                        image["label"]
-                                    ] += 1
-                                else:
-                                    most_wrong_classified_images[task.task_question][
-                                        image["label"]
-                                    ] = 1
-                            else:
-                                most_wrong_classified_images[task.task_question] = {}
-                                most_wrong_classified_images[task.task_question][
-                                    image["label"]
-                                ] = 1
-                    if image_uuid in most_wrong_picked_images:
-                        most_wrong_picked_images[image_uuid] += 1
-                    else:
-                        most_wrong_picked_images[image_uuid] = 1
+    errors = crud_image_select_error.get_to_base_task(db, base_task_id=base_task.id)
 
-    most_wrong_picked_images = dict(
-        sorted(most_wrong_picked_images.items(), key=lambda elem: elem[1], reverse=True)
-    )
-    most_wrong_picked_images_sorted = {
-        key: most_wrong_picked_images[key]
-        for key in list(most_wrong_picked_images)[0:5]
-    }
+    wrong_images = Counter()
+    for task_image_id, _, amount in errors:
+        wrong_images[task_image_id] += amount
+    images = load_task_images(list(wrong_images))
 
     result_images = []
-    if len(most_wrong_picked_images_sorted.keys()) > 0:
-        for key in most_wrong_picked_images_sorted.keys():
-            image = next(
-                (image for image in loaded_images if image["task_image_id"] == key),
-                None,
-            )
-            if image:
-                result_images.append(image)
-                image["amount"] = most_wrong_picked_images_sorted[
-                    image["task_image_id"]
-                ]
-
-    for item in most_wrong_classified_images:
-        most_wrong_classified_images[item] = dict(
-            sorted(
-                most_wrong_classified_images[item].items(),
-                key=lambda elem: elem[1],
-                reverse=True,
-            )
-        )
-
-    most_wrong_classified_images = dict(
-        sorted(
-            most_wrong_classified_images.items(),
-            key=lambda elem: list(elem[1].values())[0],
-            reverse=True,
-        )
-    )
-
-    most_wrong_classified_images = {
-        key: most_wrong_classified_images[key]
-        for key in list(most_wrong_classified_images)[0:5]
-    }
-
-    result_wrong_classified = []
-    for key, value in most_wrong_classified_images.items():
-        detail = []
-
-        for detail_key, detail_value in value.items():
-            detail.append(
-                WrongLabelDetailStatistic(label=detail_key, amount=detail_value)
-            )
-        wrong_label_statistic = WrongLabelStatistic(label=key, detail=detail)
-        result_wrong_classified.append(wrong_label_statistic)
+    for task_image_id, amount in wrong_images.most_common(5):
+        image = images.get(task_image_id)
+        if image:
+            result_images.append({**image, "amount": amount})
+
+    wrong_labels: Dict[str, Counter] = {}
+    for task_image_id, task_question, amount in errors:
+        image = images.get(task_image_id)
+        if image and image["label"]:
+            wrong_labels.setdefault(task_question, Counter())[image["label"]] += amount
+
+    # Questions with the most frequently confused label first
+    most_wrong_labels = sorted(
+        wrong_labels.items(),
+        key=lambda item: item[1].most_common(1)[0][1],
+        reverse=True,
+    )[0:5]
 
     return ImageSelectStatistic(
         wrong_image_statistics=parse_obj_as(List[WrongImageStatistic], result_images),
-        wrong_label_statistics=result_wrong_classified,
+        wrong_label_statistics=[
+            WrongLabelStatistic(
+                label=task_question,
+                detail=[
+                    WrongLabelDetailStatistic(label=label, amount=amount)
+                    for label, amount in labels.most_common()
+                ],
+            )
+            for task_question, labels in most_wrong_labels
+        ],
     )
@@ -1,22 +1,32 @@
 import time
-from typing import Any, List, Union
+from typing import Any, List, Optional, Union
 
 from app.api.deps import (
     check_if_user_can_access_course,
     get_current_active_superuser,
+    get_async_db,
     get_current_active_user,
     get_db,
 )
+from app.core.config import settings
+from app.core.export.statistic_exporter import statistic_exporter
 from app.crud.crud_base_task import crud_base_task
-from app.crud.crud_course import crud_course
-from app.crud.crud_task import crud_task
-from app.crud.crud_task_group import crud_task_group
+from app.crud.crud_course import async_crud_course, crud_course
+from app.crud.crud_progress_counter import (
+    async_crud_progress_counter,
+    crud_progress_counter,
+)
+from app.crud.crud_task import async_crud_task, crud_task
+from app.crud.crud_task_statistic import crud_task_statistic
 from app.crud.crud_user_solution import crud_user_solution
 from app.models.user import User
 from app.schemas.course import Course as CourseSchema
 from app.schemas.course import CourseAdmin, CourseAll, CourseCreate, CourseDetail
 from app.schemas.course import CourseUpdate
+from app.schemas.statistic import AnnotationStatusStatistic, DailyAttemptStatistic
+from app.schemas.user_solution import SolutionProgress, UserProgress
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.functions import user
 from app.utils.logger import logger
@@ -37,41 +47,36 @@ def get_all_courses(
 
 
 @router.get("/member", response_model=List[CourseSchema])
-def get_courses_of_user(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)
+async def get_courses_of_user(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
 ) -> Any:
-    courses = crud_course.get_multi_by_user(db, user_id=current_user.id)
-    for course in courses:
-        course_percentage_solved = crud_user_solution.get_solved_percentage_to_course(
-            db, user_id=current_user.id, course_id=course.id
-        )
+    courses = await async_crud_course.get_multi_by_user(db, user_id=current_user.id)
+    course_ids = [course.id for course in courses]
 
-        number_of_new_tasks = crud_task_group.has_new_task_multiple_task_groups(
-            db, current_user.id, [task_group.id for task_group in course.task_groups]
+    progress = await async_crud_progress_counter.get_progress_to_courses(
+        db, user_id=current_user.id, course_ids=course_ids
+    )
+    task_counts = await async_crud_course.get_task_counts(db, course_ids=course_ids)
+    courses_with_new_tasks = {
+        base_task.course_id
+        for base_task in await async_crud_task.get_base_tasks_with_new_tasks(
+            db, user_id=current_user.id, course_ids=course_ids
         )
+        if base_task.task_group_id is not None
+    }
 
-        # DB query is faster than loop over pydantic model??
-        task_count = crud_course.get_task_count(db, course_id=course.id)
-        # for task_group in course.task_groups:
-        #     for base_task in task_group.tasks:
-        #         task_count += len(base_task.tasks)
-
-        has_new_task = True if len(number_of_new_tasks) > 0 else False
+    for course in courses:
+        course_progress = progress.courses.get(course.id, SolutionProgress())
+        task_count = task_counts.get(course.id, 0)
 
         if task_count:
-            course.percentage_solved = float(course_percentage_solved) / task_count
-
-        correct_count = crud_user_solution.get_amount_of_correct_solutions_to_course(
-            db=db, user_id=current_user.id, course_id=course.id
-        )
-        wrong_count = crud_user_solution.get_amount_of_wrong_solutions_to_course(
-            db=db, user_id=current_user.id, course_id=course.id
-        )
+            course.percentage_solved = course_progress.percentage_solved / task_count
 
-        course.correct_tasks = correct_count
-        course.wrong_tasks = wrong_count
+        course.correct_tasks = course_progress.correct_tasks
+        course.wrong_tasks = course_progress.wrong_tasks
         course.task_count = task_count
-        course.new_tasks = has_new_task
+        course.new_tasks = course.id in courses_with_new_tasks
     return courses
 
 
@@ -89,9 +94,11 @@ def get_owned_courses(
     """
     courses = crud_course.get_multi_by_owner(db=db, owner_id=current_user.id)
 
+    task_counts = crud_course.get_task_counts(
+        db, course_ids=[course.id for course in courses]
+    )
     for course in courses:
-        task_count = crud_course.get_task_count(db, course_id=course.id)
-        course.task_count = task_count
+        course.task_count = task_counts.get(course.id, 0)
     return courses
 
 
@@ -158,31 +165,40 @@ def get_specific_course(
     task_count = 0
     has_new_tasks = False
 
-    for task_group in course.task_groups:
-        if current_user.id != course.owner.id:
-            percentage = (
-                crud_user_solution.get_solved_percentage_to_task_group(
-                    db, user_id=current_user.id, task_group_id=task_group.id
-                )[0]
-                or 0.0
+    task_counts = crud_course.get_task_counts_to_base_tasks(db, course_id=course.id)
+    if current_user.id != course.owner.id:
+        progress = crud_progress_counter.get_progress_to_courses(
+            db, user_id=current_user.id, course_ids=[course.id]
+        )
+        base_tasks_with_new_tasks = {
+            base_task.id
+            for base_task in crud_task.get_base_tasks_with_new_tasks(
+                db, user_id=current_user.id, course_ids=[course.id]
             )
-        else:
-            percentage = 0.0
+        }
+    else:
+        progress = UserProgress()
+        base_tasks_with_new_tasks = set()
+
+    for task_group in course.task_groups:
+        task_group_progress = progress.task_groups.get(
+            task_group.id, SolutionProgress()
+        )
+        percentage = task_group_progress.percentage_solved
 
         base_task_count = 0
         task_group.new_tasks = 0
-        if current_user.id != course.owner.id:
-            ids = [group.id for group in task_group.tasks if group.enabled == True]
-            if crud_task.has_new_task_multiple_base_tasks(
-                db, user_id=current_user.id, base_task_ids=ids
-            ):
-                task_group.new_tasks += 1
-                has_new_tasks = True
+        if any(
+            base_task.enabled == True and base_task.id in base_tasks_with_new_tasks
+            for base_task in task_group.tasks
+        ):
+            task_group.new_tasks += 1
+            has_new_tasks = True
 
         for base_task in task_group.tasks:
             if not base_task.enabled and not current_user.is_superuser:
                 continue
-            base_task_count += len(base_task.tasks)
+            base_task_count += task_counts.get(base_task.id, 0)
             course_percentage_solved += float(percentage)
             if base_task_count:
                 task_group.percentage_solved = percentage / base_task_count
@@ -192,16 +208,8 @@ def get_specific_course(
         task_group.task_count = base_task_count
 
         if current_user.id != course.owner.id:
-            task_group.correct_tasks = (
-                crud_user_solution.get_amount_of_correct_solutions_to_task_group(
-                    db, user_id=current_user.id, task_group_id=task_group.id
-                )
-            )
-            task_group.wrong_tasks = (
-                crud_user_solution.get_amount_of_wrong_solutions_to_task_group(
-                    db, user_id=current_user.id, task_group_id=task_group.id
-                )
-            )
+            task_group.correct_tasks = task_group_progress.correct_tasks
+            task_group.wrong_tasks = task_group_progress.wrong_tasks
 
         if task_group.task_count is None:
             task_group.task_count = 0
@@ -247,9 +255,10 @@ def leave_course(
 ) -> Any:
     course = crud_course.get_by_short_name(db, short_name=short_name)
     crud_course.leave_course(db, course_id=course.id, user_id=current_user.id)
-    return crud_user_solution.remove_all_by_user_to_course(
+    crud_user_solution.remove_all_by_user_to_course(
         db, user_id=current_user.id, course_id=course.id
     )
+    return course
 
 
 @router.delete("/{short_name}", response_model=CourseSchema)
@@ -263,6 +272,9 @@ def delete_course(
     check_if_user_can_access_course(db, user_id=current_user.id, course_id=course.id)
 
     crud_user_solution.remove_all_to_course(db, course_id=course.id)
+    crud_task_statistic.remove_all_to_course(
+        db, course_id=course.id, chunk_size=settings.DELETE_CHUNK_SIZE
+    )
 
     for task_group in course.task_groups:
         for base_task in task_group.tasks:
@@ -304,3 +316,46 @@ def update_course(
 
     course = crud_course.update(db, db_obj=course, obj_in=obj_in)
     return course
+
+
+@router.get(
+    "/{short_name}/statistic/attempts", response_model=List[DailyAttemptStatistic]
+)
+def get_daily_attempts(
+    *,
+    db: Session = Depends(get_db),
+    short_name: str,
+    base_task_id: Optional[int] = None,
+    task_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    course = crud_course.get_by_short_name(db, short_name=short_name)
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    check_if_user_can_access_course(db, user_id=current_user.id, course_id=course.id)
+
+    return statistic_exporter.get_daily_attempts(
+        course_id=course.id, base_task_id=base_task_id, task_id=task_id
+    )
+
+
+@router.get(
+    "/{short_name}/statistic/annotations",
+    response_model=List[AnnotationStatusStatistic],
+)
+def get_annotation_statuses(
+    *,
+    db: Session = Depends(get_db),
+    short_name: str,
+    base_task_id: Optional[int] = None,
+    task_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    course = crud_course.get_by_short_name(db, short_name=short_name)
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    check_if_user_can_access_course(db, user_id=current_user.id, course_id=course.id)
+
+    return statistic_exporter.get_annotation_statuses(
+        course_id=course.id, base_task_id=base_task_id, task_id=task_id
+    )
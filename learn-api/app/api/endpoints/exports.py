@@ -0,0 +1,107 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from starlette.responses import StreamingResponse
+
+from app.api.deps import (
+    check_if_user_can_access_course,
+    get_current_active_superuser,
+    get_db,
+)
+from app.core.export.export_cache import ExportCache
+from app.core.export.export_helper import MEDIA_TYPES
+from app.models.user import User
+from app.schemas.export import ExportCreate, ExportFormat, ExportJob
+from app.worker.tasks import create_job_id, is_job_of_user
+from app.worker.tasks import export_user_solutions as export_user_solutions_job
+
+router = APIRouter()
+
+
+@router.post("", response_model=ExportJob)
+def create_export(
+    *,
+    db: Session = Depends(get_db),
+    export_in: ExportCreate,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Exports the user solutions of a task, base task or task group in the background worker.
+    If the solutions didn't change since the last export, the stored file can be downloaded right away.
+    Otherwise the user is notified on their channel once it is stored, the job can also be polled.
+    """
+    entity = ExportCache.get_entity(db, export_in.kind, export_in.entity_id)
+    if entity is None:
+        raise HTTPException(status_code=404, detail="Entity not found")
+
+    course_id = ExportCache.get_course_id(db, export_in.kind, entity)
+    check_if_user_can_access_course(db, user_id=current_user.id, course_id=course_id)
+
+    file_name = ExportCache.get_file_name(
+        db, export_in.kind, entity, export_in.export_format
+    )
+    if ExportCache.is_stored(ExportCache.get_object_name(course_id, file_name)):
+        return ExportJob(status="SUCCESS", course_id=course_id, file_name=file_name)
+
+    job = export_user_solutions_job.apply_async(
+        (
+            export_in.kind.value,
+            entity.id,
+            export_in.export_format.value,
+            course_id,
+            file_name,
+            current_user.id,
+        ),
+        task_id=create_job_id(current_user.id),
+    )
+    return ExportJob(
+        job_id=job.id, status=job.status, course_id=course_id, file_name=file_name
+    )
+
+
+@router.get("/job/{job_id}", response_model=ExportJob)
+def get_export_job(
+    *,
+    job_id: str,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    if not is_job_of_user(job_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job = export_user_solutions_job.AsyncResult(job_id)
+    export_job = ExportJob(job_id=job_id, status=job.status)
+    if job.successful():
+        result = job.result
+        export_job.course_id = result["course_id"]
+        export_job.file_name = result["file_name"]
+    return export_job
+
+
+@router.get(
+    "/{course_id}/{file_name}",
+    response_model=Any,
+    response_description="xlsx or csv",
+)
+def download_export(
+    *,
+    db: Session = Depends(get_db),
+    course_id: int,
+    file_name: str,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    check_if_user_can_access_course(db, user_id=current_user.id, course_id=course_id)
+
+    object_name = ExportCache.get_object_name(course_id, file_name)
+    extension = file_name.rsplit(".", 1)[-1]
+    if extension not in {export_format.value for export_format in ExportFormat} or (
+        not ExportCache.is_stored(object_name)
+    ):
+        raise HTTPException(status_code=404, detail="Export not found")
+
+    headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
+    return StreamingResponse(
+        ExportCache.read(object_name),
+        headers=headers,
+        media_type=MEDIA_TYPES[ExportFormat(extension)],
+    )
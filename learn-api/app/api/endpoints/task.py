@@ -15,6 +15,8 @@ from app.api.deps import (
     get_db,
 )
 from app.core.annotation_validator import AnnotationValidator
+from app.core.export.export_cache import ExportCache
+from app.core.export.export_helper import MEDIA_TYPES
 from app.core.export.task_exporter import TaskExporter
 from app.crud.crud_base_task import crud_base_task
 from app.crud.crud_course import crud_course
@@ -25,10 +27,15 @@ from app.crud.crud_task_hint import crud_task_hint
 from app.crud.crud_task_statistic import crud_task_statistic
 from app.crud.crud_user_solution import crud_user_solution
 from app.models.user import User
+from app.schemas.annotation_operation import (
+    AnnotationOperationResult,
+    TaskAnnotationOperation,
+    UserSolutionAnnotationOperation,
+)
+from app.schemas.export import ExportFormat, ExportKind
 from app.schemas.hint_image import HintImageCreate
 from app.schemas.polygon_data import (
     AnnotationData,
-    AnnotationType,
     InfoAnnotationData,
     OffsetLineData,
     OffsetPointData,
@@ -53,11 +60,12 @@ from app.schemas.user_solution import (
     UserSolutionWithUser,
     UserSolution,
 )
-from app.core.annotation_type import is_info_annotation
+from app.core.annotation_type import get_annotation_column
 from app.utils.minio_client import MinioClient, minio_client
 from app.utils.timer import Timer
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.datastructures import UploadFile
+from fastapi.encoders import jsonable_encoder
 from fastapi.params import File
 from sqlalchemy.orm import Session
 from starlette.responses import StreamingResponse
@@ -218,7 +226,9 @@ def delete_task(
 
         crud_user_solution.remove_all_by_task_id(db, task_id=task_id)
 
-        crud_task_statistic.remove_all_by_task_id(db, task_id=task_id)
+        crud_task_statistic.remove_all_by_task_id(
+            db, task_id=task_id, chunk_size=settings.DELETE_CHUNK_SIZE
+        )
 
         if task_to_delete.task_type == TaskType.IMAGE_SELECT:
             for image in task_to_delete.task_data:
@@ -275,10 +285,10 @@ def add_task_annotation(
     ],
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
-    task = crud_task.get(db, id=task_id)
+    base_task_id = crud_task.get_base_task_id(db, task_id=task_id)
 
     check_if_user_can_access_task(
-        db, user_id=current_user.id, base_task_id=task.base_task_id
+        db, user_id=current_user.id, base_task_id=base_task_id
     )
 
     # annotation_is_valid = check_if_annotation_is_valid(annotation)
@@ -288,32 +298,36 @@ def add_task_annotation(
     #         status_code=400,
     #         detail="Annotation is invalid"
     #     )
-    if annotation.type == AnnotationType.BASE:
-        if task.task_data is None:
-            data = [annotation]
-        else:
-            data = task.task_data
-            data.append(annotation)
-        crud_task.update(db, db_obj=task, obj_in=TaskUpdate(task_data=data))
-
-    elif is_info_annotation(annotation.type):
-        if task.info_annotations is None:
-            data = [annotation]
-        else:
-            data = task.info_annotations
-            data.append(annotation)
-        crud_task.update(db, db_obj=task, obj_in=TaskUpdate(info_annotations=data))
-
-    else:
-        if task.solution is None:
-            solution = [annotation]
-        else:
-            solution = task.solution
-            solution.append(annotation)
-        crud_task.update(db, db_obj=task, obj_in=TaskUpdate(solution=solution))
+    crud_task.append_annotation(
+        db,
+        task_id=task_id,
+        column=get_annotation_column(annotation.type),
+        annotation=jsonable_encoder(annotation, exclude_unset=True),
+    )
     return {"Status": "OK"}
 
 
+@router.post(
+    "/{task_id}/annotations/batch", response_model=List[AnnotationOperationResult]
+)
+def apply_task_annotation_operations(
+    *,
+    db: Session = Depends(get_db),
+    task_id: int,
+    operations: List[TaskAnnotationOperation],
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    base_task_id = crud_task.get_base_task_id(db, task_id=task_id)
+
+    check_if_user_can_access_task(
+        db, user_id=current_user.id, base_task_id=base_task_id
+    )
+
+    return crud_task.apply_annotation_operations(
+        db, task_id=task_id, operations=operations
+    )
+
+
 @router.get("/{task_id}/annotationGroup", response_model=List[AnnotationGroup])
 def get_annotation_groups(
     *,
@@ -330,8 +344,15 @@ def download_mask(
     *,
     db: Session = Depends(get_db),
     task_id: int,
+    downsample: int = 1,
     current_user: User = Depends(get_current_active_superuser),
 ):
+    """
+    Streams the solution of the task as PNG mask, downsample reduces the resolution of the mask.
+    """
+    if downsample < 1:
+        raise HTTPException(status_code=400, detail="Downsample has to be at least 1")
+
     task = crud_task.get(db, id=task_id)
     base_task = crud_base_task.get(db, id=task.base_task_id)
     slide_id = base_task.slide_id
@@ -353,9 +374,10 @@ def download_mask(
         parse_obj_as(List[AnnotationGroup], task.annotation_groups),
         slide_width,
         slide_height,
+        downsample=downsample,
     )
 
-    return Response(content=mask, media_type="image/png")
+    return StreamingResponse(mask, media_type="image/png")
 
 
 @router.get("/{task_id}/validate", response_model=Any)
@@ -399,50 +421,21 @@ def update_task_annotation(
     ],
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
-    task = crud_task.get(db, id=task_id)
+    base_task_id = crud_task.get_base_task_id(db, task_id=task_id)
 
     check_if_user_can_access_task(
-        db, user_id=current_user.id, base_task_id=task.base_task_id
+        db, user_id=current_user.id, base_task_id=base_task_id
     )
 
-    if annotation.type == AnnotationType.BASE:
-        old_annotation_index = next(
-            (
-                index
-                for (index, d) in enumerate(task.task_data)
-                if d["id"] == annotation_id
-            ),
-            None,
-        )
-        task.task_data[old_annotation_index] = annotation
-        task_data = task.task_data
-        crud_task.update(db, db_obj=task, obj_in=TaskUpdate(task_data=task_data))
-    elif is_info_annotation(annotation.type):
-        old_annotation_index = next(
-            (
-                index
-                for (index, d) in enumerate(task.info_annotations)
-                if d["id"] == annotation_id
-            ),
-            None,
-        )
-        task.info_annotations[old_annotation_index] = annotation
-        info_annotations = task.info_annotations
-        crud_task.update(
-            db, db_obj=task, obj_in=TaskUpdate(info_annotations=info_annotations)
-        )
-    else:
-        old_annotation_index = next(
-            (
-                index
-                for (index, d) in enumerate(task.solution)
-                if d["id"] == annotation_id
-            ),
-            None,
-        )
-        task.solution[old_annotation_index] = annotation
-        solution = task.solution
-        crud_task.update(db, db_obj=task, obj_in=TaskUpdate(solution=solution))
+    updated = crud_task.replace_annotation(
+        db,
+        task_id=task_id,
+        column=get_annotation_column(annotation.type),
+        annotation_id=annotation_id,
+        annotation=jsonable_encoder(annotation, exclude_unset=True),
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Annotation not found")
     return {"Status": "Ok"}
 
 
@@ -454,31 +447,12 @@ def delete_task_annotation(
     task_id: int,
     annotation_id: str,
 ) -> Any:
-    task = crud_task.get(db, id=task_id)
+    base_task_id = crud_task.get_base_task_id(db, task_id=task_id)
     check_if_user_can_access_task(
-        db, user_id=current_user.id, base_task_id=task.base_task_id
+        db, user_id=current_user.id, base_task_id=base_task_id
     )
 
-    solution = task.solution
-
-    if solution:
-        solution = [d for d in solution if d.get("id") != annotation_id]
-
-    task_data = task.task_data
-    if task_data:
-        task_data = [d for d in task_data if d.get("id") != annotation_id]
-
-    info_annotations = task.info_annotations
-    if info_annotations:
-        info_annotations = [d for d in info_annotations if d.get("id") != annotation_id]
-
-    crud_task.update(
-        db,
-        db_obj=task,
-        obj_in=TaskUpdate(
-            solution=solution, task_data=task_data, info_annotations=info_annotations
-        ),
-    )
+    crud_task.remove_annotation(db, task_id=task_id, annotation_id=annotation_id)
     return {"Status": "OK"}
 
 
@@ -527,6 +501,7 @@ def usersolutions(
     *,
     db: Session = Depends(get_db),
     task_id: int,
+    export_format: ExportFormat = ExportFormat.XLSX,
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
     task = crud_task.get(db, id=task_id)
@@ -535,11 +510,17 @@ def usersolutions(
         db, user_id=current_user.id, base_task_id=task.base_task_id
     )
 
-    output = TaskExporter.export_point_task_as_xlsx(db, task)
+    output = ExportCache.get_stored_export(db, ExportKind.TASK, task, export_format)
+    if output is None:
+        output = TaskExporter.export_point_task(db, task, export_format)
 
-    headers = {"Content-Disposition": 'attachment; filename="' + str(task.id) + '"'}
+    headers = {
+        "Content-Disposition": f'attachment; filename="{task.id}.{export_format.value}"'
+    }
 
-    return StreamingResponse(output, headers=headers)
+    return StreamingResponse(
+        output, headers=headers, media_type=MEDIA_TYPES[export_format]
+    )
 
 
 @router.post("/{task_id}/userSolution", response_model=Any)
@@ -553,11 +534,14 @@ def add_user_solution_annotation(
     user_solution = crud_user_solution.get_solution_to_task_and_user(
         db, task_id=task_id, user_id=current_user.id
     )
-    data = user_solution.solution_data
-    data.append(annotation_data)
+    if user_solution is None:
+        raise HTTPException(status_code=404, detail="User solution not found")
 
-    crud_user_solution.update(
-        db, db_obj=user_solution, obj_in=UserSolutionUpdate(solution_data=data)
+    crud_user_solution.add_annotation(
+        db,
+        user_id=current_user.id,
+        task_id=task_id,
+        annotation=jsonable_encoder(annotation_data, exclude_unset=True),
     )
     return {"status": "OK"}
 
@@ -574,26 +558,16 @@ def update_user_solution_annotation(
     timer = Timer()
     timer.start()
 
-    user_solution = crud_user_solution.get_solution_to_task_and_user(
-        db=db, user_id=current_user.id, task_id=task_id
-    )
-
-    old_annotation_index = next(
-        (
-            index
-            for (index, d) in enumerate(user_solution.solution_data)
-            if d["id"] == annotation_id
-        ),
-        None,
-    )
-
-    user_solution.solution_data[old_annotation_index] = annotation
-    crud_user_solution.update(
+    updated = crud_user_solution.update_annotation(
         db,
-        db_obj=user_solution,
-        obj_in=UserSolutionUpdate(solution_data=user_solution.solution_data),
+        user_id=current_user.id,
+        task_id=task_id,
+        annotation_id=annotation_id,
+        annotation=jsonable_encoder(annotation, exclude_unset=True),
     )
     timer.stop()
+    if not updated:
+        raise HTTPException(status_code=404, detail="Annotation not found")
 
     return {"Status", "Ok"}
 
@@ -605,22 +579,32 @@ def delete_user_solution_annotation(
     task_id: int,
     annotation_id: str,
     current_user: User = Depends(get_current_active_user),
+) -> Any:
+    crud_user_solution.remove_annotation(
+        db, user_id=current_user.id, task_id=task_id, annotation_id=annotation_id
+    )
+    return {"Status": "OK"}
+
+
+@router.post(
+    "/{task_id}/userSolution/batch", response_model=List[AnnotationOperationResult]
+)
+def apply_user_solution_annotation_operations(
+    *,
+    db: Session = Depends(get_db),
+    task_id: int,
+    operations: List[UserSolutionAnnotationOperation],
+    current_user: User = Depends(get_current_active_user),
 ) -> Any:
     user_solution = crud_user_solution.get_solution_to_task_and_user(
         db, task_id=task_id, user_id=current_user.id
     )
-    solution_data = user_solution.solution_data
-    if user_solution.solution_data:
-        solution_data = [d for d in solution_data if d.get("id") != annotation_id]
+    if user_solution is None:
+        raise HTTPException(status_code=404, detail="User solution not found")
 
-    # if len(solution_data) == 0:
-    #     delete_item = crud_user_solution.remove_by_user_id_and_task_id(db, user_id=current_user.id, task_id=task_id)
-    #     delete_item.solution_data = solution_data
-    #     return {"Status": "OK"}
-    crud_user_solution.update(
-        db, db_obj=user_solution, obj_in=UserSolutionUpdate(solution_data=solution_data)
+    return crud_user_solution.apply_annotation_operations(
+        db, user_id=current_user.id, task_id=task_id, operations=operations
     )
-    return {"Status": "OK"}
 
 
 @router.get("/{task_id}/userSolution", response_model=Any)
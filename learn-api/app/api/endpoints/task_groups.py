@@ -11,13 +11,19 @@ from app.api.deps import (
     get_current_active_user,
     get_db,
 )
+from app.core.config import settings
+from app.core.export.export_cache import ExportCache
+from app.core.export.export_helper import MEDIA_TYPES
 from app.core.export.task_exporter import TaskExporter
 from app.crud.crud_course import crud_course
+from app.crud.crud_progress_counter import crud_progress_counter
 from app.crud.crud_task import crud_task
 from app.crud.crud_task_group import crud_task_group
 from app.crud.crud_user_solution import crud_user_solution
 from app.models.user import User
+from app.schemas.export import ExportFormat, ExportKind
 from app.schemas.task_group import TaskGroup, TaskGroupCreate, TaskGroupDetail
+from app.schemas.user_solution import SolutionProgress
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
@@ -29,14 +35,17 @@ def get_task_groups_by_course(
     *,
     db: Session = Depends(get_db),
     course_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
 ):
     task_groups = crud_task_group.get_multi_by_course_id(db, course_id=course_id)
+    progress = crud_progress_counter.get_progress_to_courses(
+        db, user_id=current_user.id, course_ids=[course_id]
+    )
     percentage_solved = 0.0
     for task_group in task_groups:
-        percentage = crud_user_solution.get_solved_percentage_to_task_group(
-            db, user_id=current_user.id, task_group_id=task_group.id
-        )[0]
+        percentage = progress.task_groups.get(
+            task_group.id, SolutionProgress()
+        ).percentage_solved
         task_group_length = len(task_group.tasks)
         if percentage and task_group_length:
             percentage_solved += float(percentage)
@@ -51,7 +60,7 @@ def create_task_group(
     *,
     db: Session = Depends(get_db),
     task_group_in: TaskGroupCreate,
-    current_user: User = Depends(get_current_active_superuser)
+    current_user: User = Depends(get_current_active_superuser),
 ):
     check_if_user_can_access_course(
         db, user_id=current_user.id, course_id=task_group_in.course_id
@@ -71,7 +80,7 @@ def get_task_group(
     *,
     db: Session = Depends(get_db),
     short_name: str,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
 ) -> Any:
     task_group = crud_task_group.get_by_short_name(db, short_name=short_name)
 
@@ -96,20 +105,26 @@ def get_task_group(
     task_group_percentage = 0.0
     task_count = 0
 
+    progress = crud_progress_counter.get_progress_to_courses(
+        db, user_id=current_user.id, course_ids=[task_group.course_id]
+    )
+    base_tasks_with_new_tasks = {
+        base_task.id
+        for base_task in crud_task.get_base_tasks_with_new_tasks(
+            db, user_id=current_user.id, course_ids=[task_group.course_id]
+        )
+    }
+
     new_tasks = []
     for task in task_group.tasks:
         new_task_count = 0
 
         if not task.enabled and not current_user.is_superuser:
             continue
-        base_task_percentage = float(
-            crud_user_solution.get_solved_percentage_to_base_task(
-                db, user_id=current_user.id, base_task_id=task.id
-            )[0]
-            or 0.0
-        )
+        base_task_progress = progress.base_tasks.get(task.id, SolutionProgress())
+        base_task_percentage = base_task_progress.percentage_solved
 
-        if crud_task.has_new_task(db, user_id=current_user.id, base_task_id=task.id):
+        if task.id in base_tasks_with_new_tasks:
             new_task_count += 1
 
         task_group_percentage += base_task_percentage
@@ -122,16 +137,8 @@ def get_task_group(
             task.percentage_solved = base_task_percentage / len(task.tasks)
         else:
             task.percentage_solved = 0
-        task.correct_tasks = (
-            crud_user_solution.get_amount_of_correct_solutions_to_base_task(
-                db, user_id=current_user.id, base_task_id=task.id
-            )
-        )
-        task.wrong_tasks = (
-            crud_user_solution.get_amount_of_wrong_solutions_to_base_task(
-                db, user_id=current_user.id, base_task_id=task.id
-            )
-        )
+        task.correct_tasks = base_task_progress.correct_tasks
+        task.wrong_tasks = base_task_progress.wrong_tasks
 
         del task.tasks
         new_tasks.append(task)
@@ -152,15 +159,16 @@ def remove_task_group(
     *,
     db: Session = Depends(get_db),
     short_name: str,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
 ):
     task_group = crud_task_group.get_by_short_name(db, short_name=short_name)
 
     check_if_user_can_access_course(
         db, user_id=current_user.id, course_id=task_group.course_id
     )
-    for task in task_group.tasks:
-        crud_task_statistic.remove_all_by_base_task_id(db, base_task_id=task.id)
+    crud_task_statistic.remove_all_to_task_group(
+        db, task_group_id=task_group.id, chunk_size=settings.DELETE_CHUNK_SIZE
+    )
     crud_user_solution.remove_all_to_task_group(db, task_group_id=task_group.id)
     deleted_task_group = crud_task_group.remove(db, model_id=task_group.id)
     return deleted_task_group
@@ -175,7 +183,8 @@ def download_usersolutions(
     *,
     db: Session = Depends(get_db),
     short_name: str,
-    current_user: User = Depends(get_current_active_superuser)
+    export_format: ExportFormat = ExportFormat.XLSX,
+    current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
     task_group = crud_task_group.get_by_short_name(db, short_name=short_name)
 
@@ -183,13 +192,19 @@ def download_usersolutions(
         db, user_id=current_user.id, course_id=task_group.course_id
     )
 
-    output = TaskExporter.export_point_task_group_as_xlsx(db, task_group)
+    output = ExportCache.get_stored_export(
+        db, ExportKind.TASK_GROUP, task_group, export_format
+    )
+    if output is None:
+        output = TaskExporter.export_point_task_group(db, task_group, export_format)
 
     headers = {
-        "Content-Disposition": 'attachment; filename="' + task_group.short_name + '"'
+        "Content-Disposition": f'attachment; filename="{task_group.short_name}.{export_format.value}"'
     }
 
-    return StreamingResponse(output, headers=headers)
+    return StreamingResponse(
+        output, headers=headers, media_type=MEDIA_TYPES[export_format]
+    )
 
 
 @router.put("", response_model=TaskGroup)
@@ -197,7 +212,7 @@ def update_task_group(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_superuser),
-    obj_in: TaskGroupUpdate
+    obj_in: TaskGroupUpdate,
 ) -> TaskGroup:
     task_group = crud_task_group.get(db, id=obj_in.task_group_id)
 
@@ -1,4 +1,4 @@
-from typing import Any, List
+from typing import Any, Dict, List
 
 from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.encoders import jsonable_encoder
@@ -8,7 +8,10 @@ from sqlalchemy.orm import Session
 from app import models
 from app.api import deps
 from app.core.config import settings
+from app.core.metadata_cache import metadata_cache
 from app.crud.crud_user import crud_user
+from app.db.async_session import async_engine
+from app.db.session import engine
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
 
@@ -56,6 +59,27 @@ def create_admin_user(
     return user
 
 
+@router.get("/admin/cache", response_model=Dict[str, Dict[str, int]])
+def read_metadata_cache_stats(
+    current_user: models.user.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Hits and misses of the metadata cache of this process.
+    """
+    return metadata_cache.stats()
+
+
+@router.get("/admin/pool", response_model=Dict[str, Dict[str, float]])
+def read_connection_pool_stats(
+    current_user: models.user.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Usage of the sync and the async database connection pool of this process
+    and how long checkouts waited.
+    """
+    return {"sync": engine.pool.stats(), "async": async_engine.pool.stats()}
+
+
 @router.put("/me", response_model=UserSchema)
 def update_user_me(
     *,
@@ -115,7 +139,7 @@ def read_user_by_id(
     Get a specific user by id.
     """
     user = crud_user.get(db, id=user_id)
-    if user == current_user:
+    if user is not None and user.id == current_user.id:
         return user
     if not crud_user.is_superuser(current_user):
         raise HTTPException(
@@ -50,6 +50,7 @@ app.add_middleware(get_middleware())
 
 minio_client.create_bucket(MinioClient.hint_bucket)
 minio_client.create_bucket(MinioClient.task_bucket)
+minio_client.create_export_bucket()
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -0,0 +1,74 @@
+"""
+Compares building the geometries of annotations and calculating their validity, area and length
+one geometry at a time with the vectorized operations on geometry arrays.
+
+Run with: python -m app.benchmarks.geometry_benchmark
+"""
+
+from typing import Callable, List
+
+import shapely
+from shapely.geometry import LinearRing, LineString, Point
+
+from app.benchmarks.synthetic import (
+    line_solution,
+    line_user_solution,
+    point_solution,
+    point_user_solution,
+    polygon_solution,
+    polygon_user_solution,
+)
+from app.benchmarks.timing import measure
+from app.core.annotation_type import get_geometries_to_annotations
+from app.schemas.polygon_data import AnnotationData
+
+ANNOTATION_COUNTS = [100, 1000, 10000]
+SOLUTION_SIZE = 100
+
+ANNOTATION_TYPES = {
+    "point": (
+        lambda count: point_user_solution(point_solution(SOLUTION_SIZE), count),
+        lambda a: Point(a.coord.image[0].x, a.coord.image[0].y),
+    ),
+    "line": (
+        lambda count: line_user_solution(line_solution(SOLUTION_SIZE), count),
+        lambda a: LineString([p.x, p.y] for p in a.coord.image),
+    ),
+    "polygon": (
+        lambda count: polygon_user_solution(
+            polygon_solution(SOLUTION_SIZE), count, vertices=16
+        ),
+        lambda a: LinearRing([p.x, p.y] for p in a.coord.image),
+    ),
+}
+
+
+def per_object(
+    annotations: List[AnnotationData], build: Callable[[AnnotationData], object]
+) -> None:
+    for annotation in annotations:
+        geometry = build(annotation)
+        geometry.is_valid, geometry.area, geometry.length
+
+
+def vectorized(annotations: List[AnnotationData]) -> None:
+    geometries = get_geometries_to_annotations(annotations)
+    shapely.is_valid(geometries), shapely.area(geometries), shapely.length(geometries)
+
+
+def run() -> None:
+    print(
+        f"{'type':>8} {'annotations':>12} {'per object ms':>14} {'vectorized ms':>14} {'speedup':>8}"
+    )
+    for name, (generate, build) in ANNOTATION_TYPES.items():
+        for count in ANNOTATION_COUNTS:
+            annotations = generate(count)
+            former = measure(lambda: per_object(annotations, build))
+            current = measure(lambda: vectorized(annotations))
+            print(
+                f"{name:>8} {count:>12} {former:>14.1f} {current:>14.1f} {former / current:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,49 @@
+"""
+Compares the line matching on precomputed, indexed corridors with the former implementation
+which builds every corridor again for every user line.
+
+Run with: python -m app.benchmarks.line_benchmark
+"""
+
+from app.benchmarks import reference
+from app.benchmarks.synthetic import line_solution, line_user_solution
+from app.benchmarks.timing import measure
+from app.core.solver.annotation_analysis import AnnotationAnalysis
+from app.core.solver.solution_geometry import CompiledLineSolution
+
+SOLUTION_SIZES = [10, 100, 1000]
+USER_ANNOTATIONS = 50
+
+
+def run() -> None:
+    print(
+        f"{'solutions':>10} {'former ms':>12} {'indexed ms':>12} {'compile ms':>12} {'speedup':>8}"
+    )
+    for size in SOLUTION_SIZES:
+        solution = line_solution(size)
+        user_solution = line_user_solution(solution, USER_ANNOTATIONS)
+        compiled_solution = CompiledLineSolution(solution)
+
+        compile_time = measure(lambda: CompiledLineSolution(solution))
+        indexed = measure(
+            lambda: AnnotationAnalysis.check_line_in_line(
+                user_annotation_data=user_solution,
+                solution_annotation_data=solution,
+                compiled_solution=compiled_solution,
+            )
+        )
+        former = measure(
+            lambda: reference.check_line_in_line(
+                user_annotation_data=user_solution,
+                solution_annotation_data=solution,
+            ),
+            repeat=1,
+        )
+
+        print(
+            f"{size:>10} {former:>12.1f} {indexed:>12.1f} {compile_time:>12.1f} {former / indexed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,63 @@
+"""
+Compares parsing user solutions with the array based coordinates to the former list of point models.
+
+Run with: python -m app.benchmarks.parse_benchmark
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, parse_obj_as
+
+from app.benchmarks.synthetic import circle_points
+from app.benchmarks.timing import measure, peak_memory
+from app.schemas.polygon_data import AnnotationData, AnnotationType, Point
+
+VERTEX_COUNTS = [100, 2000, 20000]
+ANNOTATIONS = 100
+
+
+class PointCoord(BaseModel):
+    image: List[Point]
+
+
+class PointAnnotationData(BaseModel):
+    id: str
+    type: AnnotationType
+    color: str
+    coord: PointCoord
+    name: Optional[str]
+
+
+def run() -> None:
+    print(
+        f"{'vertices':>9} {'points ms':>10} {'array ms':>9} {'speedup':>8} {'points MiB':>11} {'array MiB':>10}"
+    )
+    for vertices in VERTEX_COUNTS:
+        image = [p.dict() for p in circle_points(0, 0, 100, vertices)]
+        solution_data = [
+            {
+                "id": f"user-{index}",
+                "type": int(AnnotationType.USER_SOLUTION),
+                "color": "#00FF00",
+                "name": "gland",
+                "coord": {"image": image},
+            }
+            for index in range(ANNOTATIONS)
+        ]
+
+        def parse_points():
+            return parse_obj_as(List[PointAnnotationData], solution_data)
+
+        def parse_array():
+            return parse_obj_as(List[AnnotationData], solution_data)
+
+        former = measure(parse_points)
+        current = measure(parse_array)
+        print(
+            f"{vertices:>9} {former:>10.1f} {current:>9.1f} {former / current:>7.1f}x"
+            f" {peak_memory(parse_points):>11.1f} {peak_memory(parse_array):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,41 @@
+"""
+Compares the vectorized point matching with the former pure Python implementation.
+
+Run with: python -m app.benchmarks.point_benchmark
+"""
+
+from app.benchmarks import reference
+from app.benchmarks.synthetic import point_solution, point_user_solution
+from app.benchmarks.timing import measure
+from app.core.solver.annotation_analysis import AnnotationAnalysis
+
+POINT_SIZES = [1000, 10000]
+
+
+def run() -> None:
+    print(f"{'points':>10} {'python ms':>12} {'vectorized ms':>15} {'speedup':>8}")
+    for size in POINT_SIZES:
+        solution = point_solution(size)
+        user_solution = point_user_solution(solution, size)
+
+        vectorized = measure(
+            lambda: AnnotationAnalysis.check_point_in_point(
+                user_annotation_data=user_solution,
+                solution_annotation_data=solution,
+            )
+        )
+        python = measure(
+            lambda: reference.check_point_in_point(
+                user_annotation_data=user_solution,
+                solution_annotation_data=solution,
+            ),
+            repeat=1,
+        )
+
+        print(
+            f"{size:>10} {python:>12.1f} {vectorized:>15.1f} {python / vectorized:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,299 @@
+"""
+Times Solver.solve end to end and per stage on synthetic tasks of every kind at several scales.
+The results are written to a JSON file, which can be compared with the file of a previous run
+to detect latency regressions of the analysis or the feedback generation.
+
+Run with: python -m app.benchmarks.solver_benchmark --output solver_benchmark.json
+Compare:  python -m app.benchmarks.solver_benchmark --baseline main.json --tolerance 0.25
+
+The comparison exits with status 1 if any case got slower than the tolerance allows.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+
+from app.benchmarks.synthetic import (
+    image_select_solution,
+    image_select_user_solution,
+    line_solution,
+    line_user_solution,
+    point_solution,
+    point_user_solution,
+    polygon_solution,
+    polygon_user_solution,
+    rectangle_solution,
+    rectangle_user_solution,
+)
+from app.core.solver.solution_cache import CompiledSolution
+from app.core.solver.solver import Solver
+from app.schemas.polygon_data import AnnotationType
+from app.schemas.task import SolvableTask, TaskType
+from app.schemas.user_solution import UserSolutionData
+from app.utils.logger import logger
+from app.utils.timer import StageTimer
+
+RESULT_VERSION = 1
+SCALES = [10, 100, 1000]
+STAGES = ["parse", "analysis", "feedback"]
+
+
+def annotation_task(
+    annotation_type: AnnotationType, solution: List[Any], user_solution: List[Any]
+) -> Tuple[SolvableTask, UserSolutionData]:
+    """
+    Builds a drawing task with classes and a user solution to it.
+
+    :param annotation_type: Annotation type of the task
+    :param solution: The solution annotations
+    :param user_solution: The user annotations
+    :return: The task and the user solution
+    """
+    task = SolvableTask(
+        id=1,
+        task_type=TaskType.DRAWING_WITH_CLASS,
+        annotation_type=annotation_type,
+        min_correct=len(solution),
+        knowledge_level=0,
+        can_be_solved=True,
+        solution=[annotation.dict() for annotation in solution],
+        solution_revision=0,
+    )
+    return task, UserSolutionData(
+        user_id="benchmark",
+        solution_data=[annotation.dict() for annotation in user_solution],
+    )
+
+
+def point_case(scale: int) -> Tuple[SolvableTask, UserSolutionData]:
+    solution = point_solution(scale)
+    return annotation_task(
+        AnnotationType.SOLUTION_POINT, solution, point_user_solution(solution, scale)
+    )
+
+
+def line_case(scale: int) -> Tuple[SolvableTask, UserSolutionData]:
+    solution = line_solution(scale)
+    return annotation_task(
+        AnnotationType.SOLUTION_LINE, solution, line_user_solution(solution, scale)
+    )
+
+
+def polygon_case(scale: int) -> Tuple[SolvableTask, UserSolutionData]:
+    solution = polygon_solution(scale)
+    return annotation_task(
+        AnnotationType.SOLUTION, solution, polygon_user_solution(solution, scale)
+    )
+
+
+def rectangle_case(scale: int) -> Tuple[SolvableTask, UserSolutionData]:
+    solution = rectangle_solution(scale)
+    return annotation_task(
+        AnnotationType.SOLUTION, solution, rectangle_user_solution(solution, scale)
+    )
+
+
+def image_select_case(scale: int) -> Tuple[SolvableTask, UserSolutionData]:
+    solution = image_select_solution(scale)
+    task = SolvableTask(
+        id=1,
+        task_type=TaskType.IMAGE_SELECT,
+        annotation_type=AnnotationType.SOLUTION,
+        min_correct=0,
+        knowledge_level=0,
+        can_be_solved=True,
+        solution=solution,
+        solution_revision=0,
+    )
+    return task, UserSolutionData(
+        user_id="benchmark",
+        solution_data=image_select_user_solution(solution, scale),
+    )
+
+
+CASES: Dict[str, Callable[[int], Tuple[SolvableTask, UserSolutionData]]] = {
+    "point": point_case,
+    "line": line_case,
+    "polygon": polygon_case,
+    "rectangle": rectangle_case,
+    "image_select": image_select_case,
+}
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    return {"median": statistics.median(timings), "min": min(timings)}
+
+
+def run_case(
+    task: SolvableTask, user_solution: UserSolutionData, repeat: int
+) -> Dict[str, Any]:
+    """
+    Solves the user solution repeatedly and collects the run times in milliseconds.
+    The solution is compiled once before, like it is cached by the API.
+
+    :param task: The task with the solution
+    :param user_solution: The user solution
+    :param repeat: How often the solution should be solved
+    :return: Median and minimum of the total and of every stage and the compile time
+    """
+    start = time.perf_counter()
+    CompiledSolution(task)
+    compile_time = (time.perf_counter() - start) * 1000
+
+    Solver.solve(user_solution=user_solution, task=task, force_solve=True)
+
+    totals = []
+    stages = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        stage_timer = StageTimer()
+        start = time.perf_counter()
+        Solver.solve(
+            user_solution=user_solution,
+            task=task,
+            force_solve=True,
+            stage_timer=stage_timer,
+        )
+        totals.append((time.perf_counter() - start) * 1000)
+        for stage in STAGES:
+            stages[stage].append(stage_timer.stages.get(stage, 0.0) * 1000)
+
+    return {
+        "compile_ms": compile_time,
+        "total_ms": summarize(totals),
+        "stages_ms": {stage: summarize(timings) for stage, timings in stages.items()},
+    }
+
+
+def run_benchmark(
+    *, kinds: List[str], scales: List[int], repeat: int
+) -> Dict[str, Any]:
+    """
+    Runs all cases and returns the results in the format of the result file.
+
+    :param kinds: Task kinds that should be benchmarked
+    :param scales: Numbers of solution and user annotations
+    :param repeat: How often every case is solved
+    :return: The results with a description of the environment
+    """
+    results = []
+    for kind in kinds:
+        for scale in scales:
+            task, user_solution = CASES[kind](scale)
+            # Compiled solutions are cached by the task id, so every case needs its own
+            task = task.copy(update={"id": len(results) + 1})
+            results.append(
+                {
+                    "name": f"{kind}-{scale}",
+                    "kind": kind,
+                    "scale": scale,
+                    **run_case(task, user_solution, repeat),
+                }
+            )
+    return {
+        "version": RESULT_VERSION,
+        "created": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "shapely": shapely.__version__,
+        },
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    *,
+    tolerance: float,
+    min_difference: float = 1.0,
+) -> List[str]:
+    """
+    Compares the median run times of all cases which are part of both results.
+    Differences below min_difference milliseconds are ignored as noise.
+
+    :param baseline: Results of the reference run
+    :param current: Results of the current run
+    :param tolerance: Allowed relative slowdown, e.g. 0.25 for 25%
+    :param min_difference: Allowed absolute slowdown in milliseconds
+    :return: A description of every regression
+    """
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        reference = baseline_results.get(result["name"])
+        if reference is None:
+            continue
+
+        metrics = [("total", reference["total_ms"], result["total_ms"])] + [
+            (stage, reference["stages_ms"][stage], result["stages_ms"][stage])
+            for stage in STAGES
+            if stage in reference["stages_ms"] and stage in result["stages_ms"]
+        ]
+        for metric, before, after in metrics:
+            if (
+                after["median"] > before["median"] * (1 + tolerance)
+                and after["median"] - before["median"] > min_difference
+            ):
+                regressions.append(
+                    f"{result['name']} {metric}: {before['median']:.2f}ms -> {after['median']:.2f}ms"
+                )
+    return regressions
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    print(
+        f"{'case':>18} {'total ms':>10} {'parse ms':>10} {'analysis ms':>12} {'feedback ms':>12} {'compile ms':>11}"
+    )
+    for result in results["results"]:
+        stages = result["stages_ms"]
+        print(
+            f"{result['name']:>18} {result['total_ms']['median']:>10.2f}"
+            f" {stages['parse']['median']:>10.2f} {stages['analysis']['median']:>12.2f}"
+            f" {stages['feedback']['median']:>12.2f} {result['compile_ms']:>11.2f}"
+        )
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", default="solver_benchmark.json")
+    parser.add_argument("--baseline", help="Result file of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--kinds", nargs="+", choices=list(CASES), default=list(CASES))
+    arguments = parser.parse_args(arguments)
+
+    # The debug output of the solver would be measured as well
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    results = run_benchmark(
+        kinds=arguments.kinds, scales=arguments.scales, repeat=arguments.repeat
+    )
+    print_results(results)
+    with open(arguments.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if arguments.baseline is None:
+        return 0
+
+    with open(arguments.baseline) as file:
+        regressions = compare(json.load(file), results, tolerance=arguments.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
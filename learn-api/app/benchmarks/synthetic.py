@@ -0,0 +1,439 @@
+import math
+import random
+from typing import List
+
+from shapely.geometry import LineString
+
+from app.schemas.polygon_data import (
+    AnnotationCoord,
+    AnnotationData,
+    AnnotationType,
+    OffsetLineData,
+    OffsetPointData,
+    OffsetPolygonData,
+    OffsetRectangleData,
+    Point,
+    RectangleData,
+)
+
+
+def circle_points(
+    center_x: float, center_y: float, radius: float, vertices: int
+) -> List[Point]:
+    """
+    Returns a closed ring of points approximating a circle.
+
+    :param center_x: X coordinate of the center
+    :param center_y: Y coordinate of the center
+    :param radius: Radius of the circle
+    :param vertices: Number of distinct vertices
+    :return: The points of the ring
+    """
+    points = [
+        Point(
+            x=center_x + radius * math.cos(2 * math.pi * index / vertices),
+            y=center_y + radius * math.sin(2 * math.pi * index / vertices),
+        )
+        for index in range(vertices)
+    ]
+    return points + [points[0]]
+
+
+def grid_centers(count: int, spacing: float) -> List[Point]:
+    """
+    Returns count centers on a square grid.
+
+    :param count: Number of centers
+    :param spacing: Distance between two neighbouring centers
+    :return: The centers
+    """
+    columns = max(1, math.ceil(math.sqrt(count)))
+    return [
+        Point(x=(index % columns) * spacing, y=(index // columns) * spacing)
+        for index in range(count)
+    ]
+
+
+def polygon_solution(
+    count: int, *, radius: float = 100, vertices: int = 32, seed: int = 0
+) -> List[OffsetPolygonData]:
+    """
+    Generates solution polygons with an outer and inner offset on a grid.
+
+    :param count: Number of solution polygons
+    :param radius: Radius of every polygon
+    :param vertices: Vertices per polygon
+    :param seed: Seed of the random generator
+    :return: The solution annotations
+    """
+    generator = random.Random(seed)
+    solution = []
+    for index, center in enumerate(grid_centers(count, radius * 4)):
+        size = radius * generator.uniform(0.8, 1.2)
+        solution.append(
+            OffsetPolygonData(
+                id=f"solution-{index}",
+                type=AnnotationType.SOLUTION,
+                color="#FF0000",
+                name="gland",
+                coord=AnnotationCoord(
+                    image=circle_points(center.x, center.y, size, vertices)
+                ),
+                outerPoints=AnnotationCoord(
+                    image=circle_points(center.x, center.y, size * 1.2, vertices)
+                ),
+                innerPoints=AnnotationCoord(
+                    image=circle_points(center.x, center.y, size * 0.8, vertices)
+                ),
+                outerOffset=size * 0.2,
+                innerOffset=size * 0.2,
+                changedManual=False,
+            )
+        )
+    return solution
+
+
+def polygon_user_solution(
+    solution: List[OffsetPolygonData],
+    count: int,
+    *,
+    vertices: int = 32,
+    seed: int = 0,
+) -> List[AnnotationData]:
+    """
+    Generates user polygons around randomly picked solution polygons.
+    The polygons are jittered so that some of them leave the solution corridor.
+
+    :param solution: The solution annotations to draw around
+    :param count: Number of user polygons
+    :param vertices: Vertices per polygon
+    :param seed: Seed of the random generator
+    :return: The user annotations
+    """
+    generator = random.Random(seed)
+    user_solution = []
+    for index in range(count):
+        target = generator.choice(solution)
+        center_x = sum(p.x for p in target.coord.image[:-1]) / (
+            len(target.coord.image) - 1
+        )
+        center_y = sum(p.y for p in target.coord.image[:-1]) / (
+            len(target.coord.image) - 1
+        )
+        radius = math.hypot(
+            target.coord.image[0].x - center_x, target.coord.image[0].y - center_y
+        )
+        user_solution.append(
+            AnnotationData(
+                id=f"user-{index}",
+                type=AnnotationType.USER_SOLUTION,
+                color="#00FF00",
+                name=generator.choice(["gland", "tumour"]),
+                coord=AnnotationCoord(
+                    image=circle_points(
+                        center_x + generator.uniform(-0.3, 0.3) * radius,
+                        center_y + generator.uniform(-0.3, 0.3) * radius,
+                        radius * generator.uniform(0.9, 1.1),
+                        vertices,
+                    )
+                ),
+            )
+        )
+    return user_solution
+
+
+def point_solution(
+    count: int, *, radius: float = 20, spacing: float = 60, seed: int = 0
+) -> List[OffsetPointData]:
+    """
+    Generates solution points on a slightly jittered grid, e.g. nuclei of a cell counting task.
+
+    :param count: Number of solution points
+    :param radius: Radius in which a user point counts as hit
+    :param spacing: Distance between two neighbouring points
+    :param seed: Seed of the random generator
+    :return: The solution annotations
+    """
+    generator = random.Random(seed)
+    return [
+        OffsetPointData(
+            id=f"solution-{index}",
+            type=AnnotationType.SOLUTION_POINT,
+            color="#FF0000",
+            name="nucleus",
+            coord=AnnotationCoord(
+                image=[
+                    Point(
+                        x=center.x + generator.uniform(-5, 5),
+                        y=center.y + generator.uniform(-5, 5),
+                    )
+                ]
+            ),
+            offsetImageRadius=radius * generator.uniform(0.8, 1.2),
+            offsetRadius=radius,
+        )
+        for index, center in enumerate(grid_centers(count, spacing))
+    ]
+
+
+def point_user_solution(
+    solution: List[OffsetPointData], count: int, *, seed: int = 0
+) -> List[AnnotationData]:
+    """
+    Generates user clicks around randomly picked solution points.
+
+    :param solution: The solution annotations to click around
+    :param count: Number of user points
+    :param seed: Seed of the random generator
+    :return: The user annotations
+    """
+    generator = random.Random(seed)
+    user_solution = []
+    for index in range(count):
+        target = generator.choice(solution)
+        spread = target.offsetImageRadius * 1.5
+        user_solution.append(
+            AnnotationData(
+                id=f"user-{index}",
+                type=AnnotationType.USER_SOLUTION_POINT,
+                color="#00FF00",
+                name=generator.choice(["nucleus", "mitosis", None]),
+                coord=AnnotationCoord(
+                    image=[
+                        Point(
+                            x=target.coord.image[0].x
+                            + generator.uniform(-spread, spread),
+                            y=target.coord.image[0].y
+                            + generator.uniform(-spread, spread),
+                        )
+                    ]
+                ),
+            )
+        )
+    return user_solution
+
+
+def line_solution(
+    count: int,
+    *,
+    length: float = 200,
+    offset: float = 15,
+    vertices: int = 16,
+    seed: int = 0,
+) -> List[OffsetLineData]:
+    """
+    Generates wavy solution lines with a buffered corridor on a grid, e.g. borders of a tissue layer.
+
+    :param count: Number of solution lines
+    :param length: Horizontal extent of every line
+    :param offset: Distance of the corridor to the line
+    :param vertices: Vertices per line
+    :param seed: Seed of the random generator
+    :return: The solution annotations
+    """
+    generator = random.Random(seed)
+    solution = []
+    for index, center in enumerate(grid_centers(count, length * 1.5)):
+        amplitude = length * generator.uniform(0.05, 0.15)
+        phase = generator.uniform(0, 2 * math.pi)
+        points = [
+            Point(
+                x=center.x - length / 2 + length * step / (vertices - 1),
+                y=center.y
+                + amplitude * math.sin(phase + 2 * math.pi * step / (vertices - 1)),
+            )
+            for step in range(vertices)
+        ]
+        corridor = LineString([p.x, p.y] for p in points).buffer(offset)
+        solution.append(
+            OffsetLineData(
+                id=f"solution-{index}",
+                type=AnnotationType.SOLUTION_LINE,
+                color="#FF0000",
+                name="border",
+                coord=AnnotationCoord(image=points),
+                outerPoints=AnnotationCoord(
+                    image=[Point(x=x, y=y) for x, y in corridor.exterior.coords]
+                ),
+                offsetRadius=offset,
+                changedManual=False,
+            )
+        )
+    return solution
+
+
+def line_user_solution(
+    solution: List[OffsetLineData],
+    count: int,
+    *,
+    shift: float = 40,
+    jitter: float = 3,
+    seed: int = 0,
+) -> List[AnnotationData]:
+    """
+    Generates user lines tracing randomly picked solution lines.
+    Every line is shifted as a whole so that some lines leave the solution corridor.
+
+    :param solution: The solution annotations to trace
+    :param count: Number of user lines
+    :param shift: Maximum displacement of a line
+    :param jitter: Maximum displacement of a single vertex
+    :param seed: Seed of the random generator
+    :return: The user annotations
+    """
+    generator = random.Random(seed)
+    user_solution = []
+    for index in range(count):
+        target = generator.choice(solution)
+        shift_x = generator.uniform(-shift, shift)
+        shift_y = generator.uniform(-shift, shift)
+        user_solution.append(
+            AnnotationData(
+                id=f"user-{index}",
+                type=AnnotationType.USER_SOLUTION_LINE,
+                color="#00FF00",
+                name=generator.choice(["border", "vessel", None]),
+                coord=AnnotationCoord(
+                    image=[
+                        Point(
+                            x=p.x + shift_x + generator.uniform(-jitter, jitter),
+                            y=p.y + shift_y + generator.uniform(-jitter, jitter),
+                        )
+                        for p in target.coord.image
+                    ]
+                ),
+            )
+        )
+    return user_solution
+
+
+def rectangle_ring(left: float, top: float, right: float, bottom: float) -> List[Point]:
+    """
+    Returns the closed ring of an axis aligned rectangle.
+
+    :param left: Smallest x coordinate
+    :param top: Smallest y coordinate
+    :param right: Largest x coordinate
+    :param bottom: Largest y coordinate
+    :return: The points of the ring
+    """
+    return [
+        Point(x=left, y=top),
+        Point(x=right, y=top),
+        Point(x=right, y=bottom),
+        Point(x=left, y=bottom),
+        Point(x=left, y=top),
+    ]
+
+
+def rectangle_solution(
+    count: int, *, size: float = 150, seed: int = 0
+) -> List[OffsetRectangleData]:
+    """
+    Generates solution rectangles with an outer and inner offset on a grid.
+
+    :param count: Number of solution rectangles
+    :param size: Edge length of every rectangle
+    :param seed: Seed of the random generator
+    :return: The solution annotations
+    """
+    generator = random.Random(seed)
+    solution = []
+    for index, center in enumerate(grid_centers(count, size * 2)):
+        width = size * generator.uniform(0.8, 1.2)
+        height = size * generator.uniform(0.8, 1.2)
+        offset = size * 0.1
+        left, top = center.x - width / 2, center.y - height / 2
+        right, bottom = left + width, top + height
+        solution.append(
+            OffsetRectangleData(
+                id=f"solution-{index}",
+                type=AnnotationType.SOLUTION_RECT,
+                color="#FF0000",
+                name="region",
+                coord=AnnotationCoord(
+                    image=[Point(x=left, y=top), Point(x=right, y=bottom)]
+                ),
+                width=width,
+                height=height,
+                outerPoints=AnnotationCoord(
+                    image=rectangle_ring(
+                        left - offset, top - offset, right + offset, bottom + offset
+                    )
+                ),
+                innerPoints=AnnotationCoord(
+                    image=rectangle_ring(
+                        left + offset, top + offset, right - offset, bottom - offset
+                    )
+                ),
+                outerOffset=offset,
+                innerOffset=offset,
+                changedManual=False,
+            )
+        )
+    return solution
+
+
+def rectangle_user_solution(
+    solution: List[OffsetRectangleData], count: int, *, seed: int = 0
+) -> List[RectangleData]:
+    """
+    Generates user rectangles around randomly picked solution rectangles.
+    The corners are jittered so that some of them leave the solution corridor.
+
+    :param solution: The solution annotations to draw around
+    :param count: Number of user rectangles
+    :param seed: Seed of the random generator
+    :return: The user annotations
+    """
+    generator = random.Random(seed)
+    user_solution = []
+    for index in range(count):
+        target = generator.choice(solution)
+        spread = target.outerOffset * 1.5
+        corners = [
+            Point(
+                x=p.x + generator.uniform(-spread, spread),
+                y=p.y + generator.uniform(-spread, spread),
+            )
+            for p in target.coord.image
+        ]
+        user_solution.append(
+            RectangleData(
+                id=f"user-{index}",
+                type=AnnotationType.USER_SOLUTION_RECT,
+                color="#00FF00",
+                name=generator.choice(["region", "artifact", None]),
+                coord=AnnotationCoord(image=corners),
+                width=corners[1].x - corners[0].x,
+                height=corners[1].y - corners[0].y,
+            )
+        )
+    return user_solution
+
+
+def image_select_solution(count: int, *, seed: int = 0) -> List[str]:
+    """
+    Generates the indices of the correct images of an image select task with twice as many images.
+
+    :param count: Number of correct images
+    :param seed: Seed of the random generator
+    :return: The indices of the correct images
+    """
+    generator = random.Random(seed)
+    return [str(index) for index in sorted(generator.sample(range(count * 2), count))]
+
+
+def image_select_user_solution(
+    solution: List[str], count: int, *, seed: int = 0
+) -> List[str]:
+    """
+    Generates a user selection of images, some of them are not part of the solution.
+
+    :param solution: The indices of the correct images
+    :param count: Number of selected images
+    :param seed: Seed of the random generator
+    :return: The indices of the selected images
+    """
+    generator = random.Random(seed)
+    return [str(index) for index in generator.sample(range(len(solution) * 2), count)]
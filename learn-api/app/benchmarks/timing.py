@@ -0,0 +1,34 @@
+import time
+import tracemalloc
+from typing import Callable
+
+
+def measure(function: Callable[[], object], repeat: int = 3) -> float:
+    """
+    Returns the best run time of the function in milliseconds.
+
+    :param function: Function to measure
+    :param repeat: How often the function should be run
+    :return: The best run time
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def peak_memory(function: Callable[[], object]) -> float:
+    """
+    Returns the peak memory allocated by the function in MiB.
+
+    :param function: Function to measure
+    :return: The peak memory
+    """
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / 2**20
@@ -1,4 +1,7 @@
-from typing import Union, List
+import math
+import struct
+import zlib
+from typing import Iterator, List, Union
 
 import cv2.cv2
 import imutils
@@ -12,6 +15,15 @@ from app.schemas.task import AnnotationGroup
 from app.utils.logger import logger
 from app.utils.timer import Timer
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Every row of a PNG starts with its filter type, the rows of a mask are stored unfiltered
+PNG_FILTER_NONE = b"\x00"
+# Masks are mostly empty and compress well with the fastest level
+MASK_COMPRESSION = 1
+MASK_STRIP_BYTES = 16 * 1024 * 1024
+# Compressed rows are collected until an IDAT chunk of this size can be streamed
+MASK_CHUNK_BYTES = 64 * 1024
+
 
 def extract_annotations_from_image(
     file_name: str, file_contents: Union[bytes, str]
@@ -48,7 +60,7 @@ def extract_annotations_from_image(
             img_mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE
         )
         found_contours = imutils.grab_contours(found_contours)
-        (found_contours, _) = contours.sort_contours(found_contours)
+        found_contours, _ = contours.sort_contours(found_contours)
         annotations = []
         for contour in found_contours:
             size = cv2.contourArea(contour)
@@ -86,46 +98,96 @@ def extract_annotations_from_image(
     )
 
 
+def png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """
+    Creates a chunk of a PNG file
+
+    :param chunk_type: Type of the chunk, e.g. IDAT
+    :param data: Content of the chunk
+    :return: The chunk with its length and checksum
+    """
+    return (
+        struct.pack(">I", len(data))
+        + chunk_type
+        + data
+        + struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+    )
+
+
 def create_mask_from_annotations(
     annotations: List[OffsetPolygonData],
     annotation_groups: List[AnnotationGroup],
     slide_width: int,
     slide_height: int,
-):
-    logger.debug(slide_width)
-    logger.debug(slide_height)
-    logger.debug(annotation_groups)
-    annotations_to_group: List[OffsetPolygonData] = []
-
-    # for group in annotation_groups:
-    #     annotations_to_group.append(
-    #         [annotation for annotation in annotations if annotation.name == group.name]
-    #     )
+    downsample: int = 1,
+    strip_bytes: int = MASK_STRIP_BYTES,
+) -> Iterator[bytes]:
+    """
+    Renders the annotations as PNG mask, every annotation is filled with the color of its group.
+    The mask is rendered in horizontal strips which are compressed and streamed one after another,
+    so only a single strip is in memory instead of the whole slide. Only the annotations which
+    intersect a strip are drawn into it, edges crossing a strip border may move by a pixel.
+
+    :param annotations: Annotations of the task solution
+    :param annotation_groups: Groups of the annotations with their color
+    :param slide_width: Width of the slide at full resolution
+    :param slide_height: Height of the slide at full resolution
+    :param downsample: Factor by which the mask is smaller than the slide
+    :param strip_bytes: Maximum size of a rendered strip
+    :return: The chunks of the PNG file
+    """
     timer = Timer()
     timer.start()
-    # logger.info("Creating base image")
-    mask_base = np.zeros((slide_height, slide_width, 3), dtype=np.uint8)
-    # logger.info(timer.checkpoint_time())
-    # logger.info(f"Creating base image done in {timer.checkpoint_time()}s")
-    # logger.info("Going over annotations")
-    for index, annotation in enumerate(annotations):
-        points = annotation.coord.image
-        group = next(
-            group for group in annotation_groups if group.name == annotation.name
+    width = max(1, math.ceil(slide_width / downsample))
+    height = max(1, math.ceil(slide_height / downsample))
+    strip_height = max(1, min(height, strip_bytes // (width * 3)))
+
+    colors = {
+        group.name: tuple(
+            int(group.color.lstrip("#")[i : i + 2], 16) for i in (0, 2, 4)
         )
-        # prefix = f"[{index}/{len(annotations)}]"
-        # logger.info(f"{prefix} Parsing points array")
-        parsed_points = []
-        for point in points:
-            parsed_points.append([int(point.x), int(point.y)])
-        # logger.info(f"{prefix} Done parsing in {timer.checkpoint_time()}s")
-        np_points = np.array(parsed_points, dtype=np.int32)
-        # logger.info(f"{prefix} Done creating numpy array in {timer.checkpoint_time()}s")
-        color = tuple(int(group.color.lstrip("#")[i : i + 2], 16) for i in (0, 2, 4))
-        mask_base = cv2.fillPoly(mask_base, pts=[np_points], color=color[::-1])
-        # logger.info(f"{prefix} Done creating polygon in {timer.checkpoint_time()}s")
-
-    _, mask = cv2.imencode(".png", mask_base)
-    logger.info(f"Done encoding image in {timer.checkpoint_time()}s")
+        for group in annotation_groups
+    }
+    polygons = []
+    for annotation in annotations:
+        if annotation.name not in colors:
+            logger.warning(f"Annotation {annotation.id} has no annotation group")
+            continue
+        points = (annotation.coord.image.array / downsample).astype(np.int32)
+        if len(points) > 0:
+            polygons.append((points, colors[annotation.name]))
+    top = np.array([points[:, 1].min() for points, _ in polygons], dtype=np.int64)
+    bottom = np.array([points[:, 1].max() for points, _ in polygons], dtype=np.int64)
+
+    yield PNG_SIGNATURE + png_chunk(
+        b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    )
+
+    compressor = zlib.compressobj(MASK_COMPRESSION)
+    strip = np.zeros((strip_height, width, 3), dtype=np.uint8)
+    buffer = bytearray()
+    drawn = False
+    for strip_top in range(0, height, strip_height):
+        rows = min(strip_height, height - strip_top)
+        if drawn:
+            strip.fill(0)
+        # Polygons are drawn in their original order, later annotations cover earlier ones
+        intersecting = np.nonzero((top < strip_top + rows) & (bottom >= strip_top))[0]
+        for index in intersecting:
+            points, color = polygons[index]
+            cv2.fillPoly(strip, pts=[points], color=color, offset=(0, -strip_top))
+        drawn = len(intersecting) > 0
+
+        for row in range(rows):
+            buffer += compressor.compress(PNG_FILTER_NONE)
+            buffer += compressor.compress(strip[row])
+        if len(buffer) >= MASK_CHUNK_BYTES:
+            yield png_chunk(b"IDAT", bytes(buffer))
+            buffer.clear()
+
+    buffer += compressor.flush()
+    yield png_chunk(b"IDAT", bytes(buffer)) + png_chunk(b"IEND", b"")
     timer.stop()
-    return mask.tobytes()
+    logger.info(
+        f"Rendered mask of {len(polygons)} annotations with {width}x{height}px in {timer.total_run_time}s"
+    )
@@ -1,4 +1,7 @@
-from shapely.geometry import LinearRing, LineString, Point
+from typing import List, Tuple
+
+import numpy as np
+import shapely
 from shapely.geometry.base import BaseGeometry
 
 from app.schemas.polygon_data import AnnotationType, AnnotationData
@@ -12,6 +15,20 @@ def is_info_annotation(annotation_type: AnnotationType) -> bool:
     )
 
 
+def get_annotation_column(annotation_type: AnnotationType) -> str:
+    """
+    Returns the JSON array of the task in which annotations of the type are stored
+
+    :param annotation_type: Type of the annotation
+    :return: Name of the task column
+    """
+    if annotation_type == AnnotationType.BASE:
+        return "task_data"
+    if is_info_annotation(annotation_type):
+        return "info_annotations"
+    return "solution"
+
+
 def is_polygon(annotation_type: AnnotationType) -> bool:
     return (
         annotation_type == AnnotationType.SOLUTION
@@ -28,12 +45,64 @@ def is_line(annotation_type: AnnotationType) -> bool:
     )
 
 
+def points_to_array(annotations: List[AnnotationData]) -> np.ndarray:
+    """
+    Returns the first coordinate of every annotation as array of shape (n, 2)
+
+    :param annotations: The point annotations
+    :return: The coordinates
+    """
+    return np.array(
+        [a.coord.image.array[0] for a in annotations], dtype=np.float64
+    ).reshape(-1, 2)
+
+
+def get_coordinates(annotations: List[AnnotationData]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the image coordinates of all annotations in one array together with the position
+    of the annotation of every coordinate, as expected by the shapely geometry constructors.
+
+    :param annotations: The annotations
+    :return: Array of shape (n, 2) with the coordinates and the annotation positions
+    """
+    arrays = [a.coord.image.array for a in annotations]
+    indices = np.repeat(np.arange(len(arrays)), [len(array) for array in arrays])
+    if len(arrays) == 0:
+        return np.empty((0, 2), dtype=np.float64), indices
+    return np.concatenate(arrays), indices
+
+
+def get_geometries_to_annotations(annotations: List[AnnotationData]) -> np.ndarray:
+    """
+    Builds the geometries of all annotations at once.
+    Polygons are built as rings, lines as line strings and everything else as point of the first coordinate.
+
+    :param annotations: The annotations
+    :return: Array with the geometry of every annotation
+    """
+    geometries = np.empty(len(annotations), dtype=object)
+    polygon_indices = [i for i, a in enumerate(annotations) if is_polygon(a.type)]
+    line_indices = [i for i, a in enumerate(annotations) if is_line(a.type)]
+    point_indices = [
+        i
+        for i, a in enumerate(annotations)
+        if not is_polygon(a.type) and not is_line(a.type)
+    ]
+
+    if len(polygon_indices) > 0:
+        coordinates, indices = get_coordinates(
+            [annotations[i] for i in polygon_indices]
+        )
+        geometries[polygon_indices] = shapely.linearrings(coordinates, indices=indices)
+    if len(line_indices) > 0:
+        coordinates, indices = get_coordinates([annotations[i] for i in line_indices])
+        geometries[line_indices] = shapely.linestrings(coordinates, indices=indices)
+    if len(point_indices) > 0:
+        geometries[point_indices] = shapely.points(
+            points_to_array([annotations[i] for i in point_indices])
+        )
+    return geometries
+
+
 def get_geometry_to_annotation_type(annotation_data: AnnotationData) -> BaseGeometry:
-    if is_polygon(annotation_data.type):
-        annotation = LinearRing([p.x, p.y] for p in annotation_data.coord.image)
-    elif is_line(annotation_data.type):
-        annotation = LineString([p.x, p.y] for p in annotation_data.coord.image)
-    else:
-        coord = annotation_data.coord.image[0]
-        annotation = Point(coord.x, coord.y)
-    return annotation
+    return get_geometries_to_annotations([annotation_data])[0]
@@ -1,10 +1,15 @@
 from enum import IntEnum
 from typing import Optional, Any, List
 
+import shapely
 from pydantic import BaseModel
 from shapely.geometry import LineString, LinearRing, Polygon
 
-from app.core.annotation_type import is_info_annotation, get_geometry_to_annotation_type
+from app.core.annotation_type import (
+    is_info_annotation,
+    get_geometry_to_annotation_type,
+    get_geometries_to_annotations,
+)
 from app.schemas.polygon_data import AnnotationData, AnnotationType
 from app.schemas.task import TaskType
 from app.utils.logger import logger
@@ -25,9 +30,9 @@ class AnnotationValidator:
     def check_if_annotation_is_valid(annotation_data: AnnotationData) -> Optional[bool]:
         annotation = None
         if annotation_data.type == AnnotationType.SOLUTION_LINE:
-            annotation = LineString([p.x, p.y] for p in annotation_data.coord.image)
+            annotation = LineString(annotation_data.coord.image.array)
         if annotation_data.type == AnnotationType.SOLUTION:
-            annotation = LinearRing([p.x, p.y] for p in annotation_data.coord.image)
+            annotation = LinearRing(annotation_data.coord.image.array)
 
         if annotation is not None:
             return annotation.is_valid
@@ -48,11 +53,12 @@ class AnnotationValidator:
         annotations: List[AnnotationData], task_type: TaskType
     ) -> List[ValidationResult]:
         validation_results = []
-        for annotation in annotations:
+        geometry_is_valid = shapely.is_valid(get_geometries_to_annotations(annotations))
+        for annotation, is_valid in zip(annotations, geometry_is_valid):
             annotation_type = annotation.type
             validation_result_types: List[ValidationResultType] = []
 
-            if not AnnotationValidator.is_geometry_valid(annotation):
+            if not is_valid:
                 validation_result_types.append(ValidationResultType.INVALID_GEOMETRY)
             if task_type == TaskType.DRAWING_WITH_CLASS:
                 if annotation_type == AnnotationType.BASE:
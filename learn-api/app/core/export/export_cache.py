@@ -0,0 +1,213 @@
+import hashlib
+import json
+import tempfile
+from typing import Any, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.export.export_helper import CHUNK_SIZE, MEDIA_TYPES
+from app.core.export.task_exporter import TaskExporter
+from app.crud.crud_base_task import crud_base_task
+from app.crud.crud_task import crud_task
+from app.crud.crud_task_group import crud_task_group
+from app.crud.crud_user_solution import crud_user_solution
+from app.schemas.export import ExportFormat, ExportKind
+from app.utils.minio_client import MinioClient, minio_client
+
+# Has to be increased whenever the content of the exports changes, so stored exports aren't used anymore
+EXPORT_VERSION = 1
+
+
+class ExportCache:
+    """
+    Exports of user solutions are stored in the export bucket of MinIO.
+    The file name is a hash of everything the export is built from, so changed solutions or tasks
+    lead to a new file, while repeated exports of unchanged solutions download the stored file.
+    Changed names of users are only part of new exports once a solution changes.
+    """
+
+    @staticmethod
+    def get_entity(db: Session, kind: ExportKind, entity_id: int) -> Any:
+        """
+        Returns the task, base task or task group whose user solutions are exported
+
+        :param db: DB-Session
+        :param kind: What is exported
+        :param entity_id: Id of the task, base task or task group
+        :return: The found entity or None
+        """
+        if kind == ExportKind.TASK:
+            return crud_task.get(db, id=entity_id)
+        if kind == ExportKind.BASE_TASK:
+            return crud_base_task.get(db, id=entity_id)
+        return crud_task_group.get(db, id=entity_id)
+
+    @staticmethod
+    def get_course_id(db: Session, kind: ExportKind, entity: Any) -> int:
+        """
+        Returns the course of the exported entity
+
+        :param db: DB-Session
+        :param kind: What is exported
+        :param entity: The task, base task or task group
+        :return: Id of the course
+        """
+        if kind == ExportKind.TASK:
+            return crud_base_task.get_course_id(db, base_task_id=entity.base_task_id)
+        return entity.course_id
+
+    @staticmethod
+    def get_file_name(
+        db: Session, kind: ExportKind, entity: Any, export_format: ExportFormat
+    ) -> str:
+        """
+        Returns the file name of the export, which changes whenever the exported data changes.
+        Only the names of the tasks and the latest change of the annotations are read.
+
+        :param db: DB-Session
+        :param kind: What is exported
+        :param entity: The task, base task or task group
+        :param export_format: Format of the file
+        :return: The file name
+        """
+        if kind == ExportKind.TASK:
+            base_tasks = [crud_base_task.get(db, id=entity.base_task_id)]
+            tasks = [entity]
+        elif kind == ExportKind.BASE_TASK:
+            base_tasks = [entity]
+            tasks = list(entity.tasks)
+        else:
+            base_tasks = list(entity.tasks)
+            tasks = [task for base_task in base_tasks for task in base_task.tasks]
+
+        if kind == ExportKind.TASK_GROUP:
+            task_group = entity
+        else:
+            task_group = crud_task_group.get(db, id=base_tasks[0].task_group_id)
+
+        inputs = {
+            "version": EXPORT_VERSION,
+            "kind": kind.value,
+            "id": entity.id,
+            "format": export_format.value,
+            "task_group": task_group.name if task_group else None,
+            "base_tasks": [
+                [base_task.id, base_task.name, base_task.slide_id]
+                for base_task in base_tasks
+            ],
+            "tasks": [
+                [task.id, task.task_type, task.annotation_type, task.task_question]
+                for task in tasks
+            ],
+            "annotations": crud_user_solution.get_annotation_changes_to_tasks(
+                db, task_ids=[task.id for task in tasks]
+            ),
+        }
+        digest = hashlib.sha256(
+            json.dumps(inputs, default=str).encode("utf-8")
+        ).hexdigest()
+        return f"{kind.value}-{entity.id}-{digest[:32]}.{export_format.value}"
+
+    @staticmethod
+    def get_object_name(course_id: int, file_name: str) -> str:
+        """
+        Exports are stored by course, so access to them can be checked like access to the course
+
+        :param course_id: Id of the course
+        :param file_name: File name of the export
+        :return: Name of the object in the export bucket
+        """
+        return f"{course_id}/{file_name}"
+
+    @staticmethod
+    def is_stored(object_name: str) -> bool:
+        """
+        Checks if the export was already stored
+
+        :param object_name: Name of the object in the export bucket
+        :return: If the object exists
+        """
+        return minio_client.object_exists(object_name, MinioClient.export_bucket)
+
+    @staticmethod
+    def export(
+        db: Session, kind: ExportKind, entity: Any, export_format: ExportFormat
+    ) -> Iterator[bytes]:
+        """
+        Creates the export of the user solutions
+
+        :param db: DB-Session
+        :param kind: What is exported
+        :param entity: The task, base task or task group
+        :param export_format: Format of the file
+        :return: The chunks of the file
+        """
+        if kind == ExportKind.TASK:
+            return TaskExporter.export_point_task(db, entity, export_format)
+        if kind == ExportKind.BASE_TASK:
+            return TaskExporter.export_point_base_task(db, entity, export_format)
+        return TaskExporter.export_point_task_group(db, entity, export_format)
+
+    @staticmethod
+    def store(
+        db: Session,
+        kind: ExportKind,
+        entity: Any,
+        export_format: ExportFormat,
+        object_name: str,
+    ) -> None:
+        """
+        Creates the export in a temporary file and uploads it to the export bucket
+
+        :param db: DB-Session
+        :param kind: What is exported
+        :param entity: The task, base task or task group
+        :param export_format: Format of the file
+        :param object_name: Name of the object in the export bucket
+        """
+        with tempfile.NamedTemporaryFile() as file:
+            for chunk in ExportCache.export(db, kind, entity, export_format):
+                file.write(chunk)
+            file.flush()
+            minio_client.create_object(
+                object_name,
+                file.name,
+                MEDIA_TYPES[export_format],
+                bucket_name=MinioClient.export_bucket,
+            )
+
+    @staticmethod
+    def read(object_name: str) -> Iterator[bytes]:
+        """
+        Downloads the stored export in chunks
+
+        :param object_name: Name of the object in the export bucket
+        :return: The chunks of the file
+        """
+        response = minio_client.get_object(object_name, MinioClient.export_bucket)
+        try:
+            yield from response.stream(CHUNK_SIZE)
+        finally:
+            response.close()
+            response.release_conn()
+
+    @staticmethod
+    def get_stored_export(
+        db: Session, kind: ExportKind, entity: Any, export_format: ExportFormat
+    ) -> Optional[Iterator[bytes]]:
+        """
+        Returns the stored export if the exported data didn't change since it was created
+
+        :param db: DB-Session
+        :param kind: What is exported
+        :param entity: The task, base task or task group
+        :param export_format: Format of the file
+        :return: The chunks of the stored file or None
+        """
+        object_name = ExportCache.get_object_name(
+            ExportCache.get_course_id(db, kind, entity),
+            ExportCache.get_file_name(db, kind, entity, export_format),
+        )
+        if not ExportCache.is_stored(object_name):
+            return None
+        return ExportCache.read(object_name)
@@ -1,11 +1,25 @@
-from io import BytesIO
-from typing import Type, Tuple
+import csv
+import tempfile
+from io import BytesIO, StringIO
+from typing import Any, Iterable, Iterator, Sequence, Type, Tuple
 
 import xlsxwriter
 from pydantic import BaseModel
 from xlsxwriter import Workbook
 from xlsxwriter.worksheet import Worksheet
 
+from app.schemas.export import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ExportFormat.CSV: "text/csv",
+}
+
+# Size of the chunks sent to the client
+CHUNK_SIZE = 64 * 1024
+# Rows written to the CSV buffer before it is sent
+CSV_CHUNK_ROWS = 1000
+
 
 class ExportHelper:
     @staticmethod
@@ -31,3 +45,70 @@ class ExportHelper:
         workbook = xlsxwriter.Workbook(output)
         worksheet = workbook.add_worksheet()
         return workbook, worksheet, output
+
+    @staticmethod
+    def stream_rows(
+        rows: Iterable[Sequence[Any]],
+        model: Type[BaseModel],
+        export_format: ExportFormat,
+    ) -> Iterator[bytes]:
+        """
+        Writes the rows in the given format and returns the file in chunks.
+        The rows are consumed lazily, so they can come straight from a database cursor.
+
+        :param rows: The values of every row in the order of the fields of the model
+        :param model: Model which field represent the column names
+        :param export_format: Format of the file
+        :return: The chunks of the file
+        """
+        if export_format == ExportFormat.CSV:
+            return ExportHelper.stream_csv(rows, model)
+        return ExportHelper.stream_xlsx(rows, model)
+
+    @staticmethod
+    def stream_xlsx(
+        rows: Iterable[Sequence[Any]], model: Type[BaseModel]
+    ) -> Iterator[bytes]:
+        """
+        Writes the rows to a worksheet in constant memory mode, every finished row is flushed
+        to a temporary file. The workbook is assembled in a temporary file as well and sent in chunks.
+
+        :param rows: The values of every row in the order of the fields of the model
+        :param model: Model which field represent the column names
+        :return: The chunks of the xlsx file
+        """
+        with tempfile.TemporaryFile() as output:
+            workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+            worksheet = workbook.add_worksheet()
+            worksheet.write_row(0, 0, list(model.__fields__))
+            for row_index, row in enumerate(rows, start=1):
+                worksheet.write_row(row_index, 0, row)
+            workbook.close()
+
+            output.seek(0)
+            chunk = output.read(CHUNK_SIZE)
+            while chunk:
+                yield chunk
+                chunk = output.read(CHUNK_SIZE)
+
+    @staticmethod
+    def stream_csv(
+        rows: Iterable[Sequence[Any]], model: Type[BaseModel]
+    ) -> Iterator[bytes]:
+        """
+        Writes the rows as CSV and sends them while the next rows are read.
+
+        :param rows: The values of every row in the order of the fields of the model
+        :param model: Model which field represent the column names
+        :return: The chunks of the csv file
+        """
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(model.__fields__)
+        for row_index, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if row_index % CSV_CHUNK_ROWS == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,341 @@
+import itertools
+import json
+import os
+import posixpath
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from pyarrow import fs
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.crud_task_statistic import crud_task_statistic
+from app.schemas.statistic import AnnotationStatusStatistic, DailyAttemptStatistic
+from app.utils.logger import logger
+
+ATTEMPTS = "attempts"
+ANNOTATION_RESULTS = "annotation_results"
+# Files starting with an underscore are ignored when the datasets are read
+WATERMARK_FILE = "_watermark.json"
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("course_id", pa.int32()), ("solved_day", pa.string())]),
+    flavor="hive",
+)
+ATTEMPT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("user_id", pa.string()),
+        ("task_id", pa.int32()),
+        ("base_task_id", pa.int32()),
+        ("course_id", pa.int32()),
+        ("solved_day", pa.string()),
+        ("solved_date", pa.timestamp("us")),
+        ("percentage_solved", pa.float64()),
+        ("task_status", pa.int32()),
+        ("annotations", pa.int32()),
+    ]
+)
+ANNOTATION_RESULT_SCHEMA = pa.schema(
+    [
+        ("statistic_id", pa.int64()),
+        ("user_id", pa.string()),
+        ("task_id", pa.int32()),
+        ("base_task_id", pa.int32()),
+        ("course_id", pa.int32()),
+        ("solved_day", pa.string()),
+        ("solved_date", pa.timestamp("us")),
+        ("position", pa.int32()),
+        ("annotation_id", pa.string()),
+        ("image", pa.int32()),
+        ("status", pa.int32()),
+        ("percentage", pa.float64()),
+    ]
+)
+
+
+def load_json(value: Any) -> Any:
+    # Older statistics may contain the JSON encoded as a string
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def flatten_statistics(
+    statistics: List[Any],
+) -> Tuple[Dict[str, List[Any]], Dict[str, List[Any]]]:
+    """
+    Converts task statistics to the columns of the attempts and of the results of every annotation.
+
+    :param statistics: Rows returned by crud_task_statistic.get_multi_after_id
+    :return: The columns of the attempts and the columns of the annotation results
+    """
+    attempts = {name: [] for name in ATTEMPT_SCHEMA.names}
+    results = {name: [] for name in ANNOTATION_RESULT_SCHEMA.names}
+    for statistic in statistics:
+        solution_data = load_json(statistic.solution_data)
+        task_result = load_json(statistic.task_result) or {}
+        shared = {
+            "user_id": statistic.user_id,
+            "task_id": statistic.task_id,
+            "base_task_id": statistic.base_task_id,
+            "course_id": statistic.course_id,
+            "solved_day": statistic.solved_date.date().isoformat(),
+            "solved_date": statistic.solved_date,
+        }
+
+        for name, value in shared.items():
+            attempts[name].append(value)
+        attempts["id"].append(statistic.id)
+        attempts["percentage_solved"].append(float(statistic.percentage_solved or 0))
+        attempts["task_status"].append(task_result.get("task_status"))
+        attempts["annotations"].append(
+            len(solution_data) if isinstance(solution_data, list) else 0
+        )
+
+        for position, detail in enumerate(task_result.get("result_detail") or []):
+            for name, value in shared.items():
+                results[name].append(value)
+            results["statistic_id"].append(statistic.id)
+            results["position"].append(position)
+            results["annotation_id"].append(
+                str(detail["id"]) if detail.get("id") is not None else None
+            )
+            results["image"].append(detail.get("image"))
+            results["status"].append(detail.get("status"))
+            results["percentage"].append(detail.get("percentage"))
+    return attempts, results
+
+
+class StatisticExporter:
+    """
+    Exports the task statistics incrementally to Parquet files, partitioned by course and day,
+    so learning curves can be analyzed without reading the statistics from the database.
+    Every attempt is a row of the attempts dataset, the feedback to every annotation of an attempt
+    is a row of the annotation results dataset. The id of the last exported statistic is stored as
+    watermark next to the datasets, every export continues from there.
+    """
+
+    def __init__(self, uri: str):
+        """
+        :param uri: Local directory or URI of the datasets, e.g. s3://bucket/statistics
+        """
+        self.uri = uri if "://" in uri else os.path.abspath(uri)
+        self.filesystem: Optional[fs.FileSystem] = None
+        self.path = ""
+
+    def get_filesystem(self) -> fs.FileSystem:
+        # Created on first use, as remote filesystems may connect to the server
+        if self.filesystem is None:
+            self.filesystem, self.path = fs.FileSystem.from_uri(self.uri)
+        return self.filesystem
+
+    def get_watermark(self) -> int:
+        """
+        Returns the id of the last exported statistic
+
+        :return: The id or 0 if nothing was exported yet
+        """
+        filesystem = self.get_filesystem()
+        path = posixpath.join(self.path, WATERMARK_FILE)
+        if filesystem.get_file_info(path).type == fs.FileType.NotFound:
+            return 0
+        with filesystem.open_input_stream(path) as file:
+            return json.loads(file.read())["last_id"]
+
+    def set_watermark(self, last_id: int) -> None:
+        """
+        Stores the id of the last exported statistic
+
+        :param last_id: Id of the statistic
+        """
+        filesystem = self.get_filesystem()
+        filesystem.create_dir(self.path, recursive=True)
+        with filesystem.open_output_stream(
+            posixpath.join(self.path, WATERMARK_FILE)
+        ) as file:
+            file.write(
+                json.dumps(
+                    {"last_id": last_id, "exported": datetime.now().isoformat()}
+                ).encode("utf-8")
+            )
+
+    def export(
+        self,
+        db: Session,
+        *,
+        batch_size: int = 10000,
+        lag: timedelta = timedelta(minutes=5),
+    ) -> int:
+        """
+        Exports all statistics which were created since the last export.
+        Statistics solved within the lag are left for the next export, so statistics
+        of transactions which weren't committed yet aren't skipped.
+
+        :param db: DB-Session
+        :param batch_size: Number of statistics written at once
+        :param lag: Minimum age of exported statistics
+        :return: Number of exported statistics
+        """
+        last_id = self.get_watermark()
+        solved_before = datetime.now() - lag
+        exported = 0
+        while True:
+            statistics = crud_task_statistic.get_multi_after_id(
+                db, last_id=last_id, limit=batch_size
+            )
+            # Stops at the first recent statistic, the next export continues from there
+            ready = list(
+                itertools.takewhile(
+                    lambda statistic: statistic.solved_date < solved_before,
+                    statistics,
+                )
+            )
+            if len(ready) > 0:
+                self.write(ready)
+                last_id = ready[-1].id
+                self.set_watermark(last_id)
+                exported += len(ready)
+                logger.info(f"Exported task statistics up to {last_id}")
+            if len(ready) < batch_size:
+                return exported
+
+    def write(self, statistics: List[Any]) -> None:
+        """
+        Writes the statistics to new files of both datasets.
+        The files are named by the ids of the statistics, so a repeated export of the same
+        statistics replaces the files instead of adding duplicates.
+
+        :param statistics: Rows returned by crud_task_statistic.get_multi_after_id
+        """
+        attempts, results = flatten_statistics(statistics)
+        basename = f"part-{statistics[0].id}-{statistics[-1].id}-{{i}}.parquet"
+        for name, columns, schema in [
+            (ATTEMPTS, attempts, ATTEMPT_SCHEMA),
+            (ANNOTATION_RESULTS, results, ANNOTATION_RESULT_SCHEMA),
+        ]:
+            table = pa.Table.from_pydict(columns, schema=schema)
+            if table.num_rows == 0:
+                continue
+            ds.write_dataset(
+                table,
+                posixpath.join(self.path, name),
+                format="parquet",
+                partitioning=PARTITIONING,
+                filesystem=self.get_filesystem(),
+                basename_template=basename,
+                existing_data_behavior="overwrite_or_ignore",
+            )
+
+    def clear(self) -> None:
+        """
+        Removes both datasets and the watermark, so the next export starts from the beginning
+        """
+        self.get_filesystem().delete_dir_contents(self.path, missing_dir_ok=True)
+
+    def get_dataset(self, name: str) -> Optional[ds.Dataset]:
+        filesystem = self.get_filesystem()
+        path = posixpath.join(self.path, name)
+        if filesystem.get_file_info(path).type == fs.FileType.NotFound:
+            return None
+        return ds.dataset(
+            path, format="parquet", partitioning=PARTITIONING, filesystem=filesystem
+        )
+
+    @staticmethod
+    def get_filter(
+        course_id: int, base_task_id: Optional[int], task_id: Optional[int]
+    ) -> ds.Expression:
+        expression = ds.field("course_id") == course_id
+        if base_task_id is not None:
+            expression = expression & (ds.field("base_task_id") == base_task_id)
+        if task_id is not None:
+            expression = expression & (ds.field("task_id") == task_id)
+        return expression
+
+    def get_daily_attempts(
+        self,
+        *,
+        course_id: int,
+        base_task_id: Optional[int] = None,
+        task_id: Optional[int] = None,
+    ) -> List[DailyAttemptStatistic]:
+        """
+        Returns the attempts, users, correct attempts and the average solved percentage per day.
+        Only the partitions of the course are read.
+
+        :param course_id: Id of the course
+        :param base_task_id: Only counts attempts to the base task
+        :param task_id: Only counts attempts to the task
+        :return: The statistic of every day with attempts, ordered by day
+        """
+        dataset = self.get_dataset(ATTEMPTS)
+        if dataset is None:
+            return []
+        table = dataset.to_table(
+            columns=["solved_day", "user_id", "percentage_solved"],
+            filter=self.get_filter(course_id, base_task_id, task_id),
+        )
+        table = table.append_column(
+            "correct",
+            pc.cast(pc.equal(table["percentage_solved"], 1.0), pa.int64()),
+        )
+        grouped = table.group_by("solved_day").aggregate(
+            [
+                ("user_id", "count"),
+                ("user_id", "count_distinct"),
+                ("correct", "sum"),
+                ("percentage_solved", "mean"),
+            ]
+        )
+        return sorted(
+            [
+                DailyAttemptStatistic(
+                    solved_day=row["solved_day"],
+                    attempts=row["user_id_count"],
+                    users=row["user_id_count_distinct"],
+                    correct_attempts=row["correct_sum"],
+                    average_percentage_solved=row["percentage_solved_mean"],
+                )
+                for row in grouped.to_pylist()
+            ],
+            key=lambda statistic: statistic.solved_day,
+        )
+
+    def get_annotation_statuses(
+        self,
+        *,
+        course_id: int,
+        base_task_id: Optional[int] = None,
+        task_id: Optional[int] = None,
+    ) -> List[AnnotationStatusStatistic]:
+        """
+        Returns how often the annotations of all attempts got every feedback status.
+
+        :param course_id: Id of the course
+        :param base_task_id: Only counts annotations of the base task
+        :param task_id: Only counts annotations of the task
+        :return: The amount of every status, the most frequent first
+        """
+        dataset = self.get_dataset(ANNOTATION_RESULTS)
+        if dataset is None:
+            return []
+        table = dataset.to_table(
+            columns=["status", "statistic_id"],
+            filter=self.get_filter(course_id, base_task_id, task_id),
+        )
+        grouped = table.group_by("status").aggregate([("statistic_id", "count")])
+        return sorted(
+            [
+                AnnotationStatusStatistic(
+                    status=row["status"], amount=row["statistic_id_count"]
+                )
+                for row in grouped.to_pylist()
+            ],
+            key=lambda statistic: statistic.amount,
+            reverse=True,
+        )
+
+
+statistic_exporter = StatisticExporter(settings.STATISTIC_PARQUET_URI)
@@ -0,0 +1,226 @@
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+
+class LocalCacheBackend:
+    """
+    Process wide LRU cache whose entries expire after a fixed time.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 4096,
+        ttl: float = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param max_size: Maximum number of cached entries
+        :param ttl: Seconds after which an entry is loaded again
+        :param clock: Returns the current time in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Returns the cached value to the key
+
+        :param key: Key of the entry
+        :return: If the entry was found and its value
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires <= self.clock():
+                del self.entries[key]
+                return False, None
+            self.entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Caches the value, the least recently used entry is dropped if the cache is full
+
+        :param key: Key of the entry
+        :param value: The value to cache
+        """
+        with self.lock:
+            self.entries[key] = (self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        """
+        Removes the entries to the keys
+
+        :param keys: Keys of the entries
+        """
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all entries
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+class RedisCacheBackend:
+    """
+    Cache shared by all processes, stored in a Redis compatible server.
+    Values are stored as JSON and expire after a fixed time.
+    If the server can't be reached, every lookup is a miss and the value is loaded from the database.
+    """
+
+    def __init__(self, url: str, ttl: float = 300, prefix: str = "learn-api:metadata:"):
+        """
+        :param url: URL of the server, e.g. redis://127.0.0.1:6379/0
+        :param ttl: Seconds after which an entry is loaded again
+        :param prefix: Prefix of all keys of the cache
+        """
+        # Only needed if the shared cache is configured
+        import redis
+
+        self.error = redis.RedisError
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        try:
+            value = self.client.get(self.prefix + key)
+        except self.error as error:
+            logger.warning(f"Metadata cache lookup failed: {error}")
+            return False, None
+        if value is None:
+            return False, None
+        return True, json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), ex=int(self.ttl))
+        except self.error as error:
+            logger.warning(f"Metadata cache update failed: {error}")
+
+    def delete(self, *keys: str) -> None:
+        if len(keys) == 0:
+            return
+        try:
+            self.client.delete(*[self.prefix + key for key in keys])
+        except self.error as error:
+            logger.warning(f"Metadata cache invalidation failed: {error}")
+
+    def clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + "*"))
+            if len(keys) > 0:
+                self.client.delete(*keys)
+        except self.error as error:
+            logger.warning(f"Metadata cache invalidation failed: {error}")
+
+
+class MetadataCache:
+    """
+    Read-through cache for small values that are looked up on almost every request and rarely change,
+    like the course of a base task or the owner of a course. Only JSON serializable values are cached,
+    never database entities, as those are bound to the session they were loaded with.
+    Values are grouped in namespaces, hits and misses are counted per namespace.
+    """
+
+    def __init__(self, backend: Any):
+        """
+        :param backend: Stores the values, LocalCacheBackend or RedisCacheBackend
+        """
+        self.backend = backend
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def get(self, namespace: str, key: Any, load: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value and loads it if it is missing or expired.
+        None is never cached, so entities which are created later are found.
+
+        :param namespace: Kind of the value, e.g. course_owner
+        :param key: Key of the value inside the namespace
+        :param load: Loads the value from the database
+        :return: The value
+        """
+        found, value = self.backend.get(f"{namespace}:{key}")
+        with self.lock:
+            if found:
+                self.hits[namespace] += 1
+            else:
+                self.misses[namespace] += 1
+        if found:
+            return value
+
+        value = load()
+        if value is not None:
+            self.backend.set(f"{namespace}:{key}", value)
+        return value
+
+    def invalidate(self, namespace: str, *keys: Any) -> None:
+        """
+        Removes the values, has to be called whenever they change in the database
+
+        :param namespace: Kind of the values
+        :param keys: Keys of the values inside the namespace
+        """
+        self.backend.delete(*[f"{namespace}:{key}" for key in keys])
+
+    def clear(self) -> None:
+        """
+        Removes all values
+        """
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the hits and misses since the process started
+
+        :return: Hits and misses by namespace
+        """
+        with self.lock:
+            return {
+                namespace: {
+                    "hits": self.hits[namespace],
+                    "misses": self.misses[namespace],
+                }
+                for namespace in sorted(set(self.hits) | set(self.misses))
+            }
+
+
+def create_metadata_cache(redis_url: Optional[str] = None) -> MetadataCache:
+    """
+    Creates the cache with the shared backend if a server is configured and a local one otherwise
+
+    :param redis_url: URL of the Redis compatible server
+    :return: The cache
+    """
+    if redis_url:
+        return MetadataCache(
+            RedisCacheBackend(redis_url, ttl=settings.METADATA_CACHE_TTL)
+        )
+    return MetadataCache(
+        LocalCacheBackend(
+            max_size=settings.METADATA_CACHE_SIZE, ttl=settings.METADATA_CACHE_TTL
+        )
+    )
+
+
+metadata_cache = create_metadata_cache(settings.METADATA_CACHE_REDIS_URL)
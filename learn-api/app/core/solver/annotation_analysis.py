@@ -1,5 +1,8 @@
 import math
-from typing import Dict, List, Tuple, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import shapely
 
 from app.schemas.polygon_data import (
     AnnotationData,
@@ -8,14 +11,23 @@ from app.schemas.polygon_data import (
     OffsetPointData,
     OffsetPolygonData,
     OffsetRectangleData,
-    Point,
     RectangleData,
 )
-from app.schemas.solver_result import LineResult, PointResult, PolygonResult
-from app.utils.timer import Timer
-from app.utils.utils import get_path_length
-from shapely.errors import TopologicalError
-from shapely.geometry import LinearRing, LineString, Polygon
+from app.core.annotation_type import get_coordinates, points_to_array
+from app.core.solver.annotation_results import AnnotationResultCache, annotation_hash
+from app.core.solver.solution_geometry import (
+    CompiledLineSolution,
+    CompiledPointSolution,
+    CompiledPolygonSolution,
+)
+from app.schemas.solver_result import (
+    AnnotationOutcome,
+    LineResult,
+    PointResult,
+    PolygonResult,
+)
+from shapely.errors import GEOSException
+from shapely.geometry import LineString, Polygon
 
 
 class AnnotationAnalysis:
@@ -24,6 +36,7 @@ class AnnotationAnalysis:
         *,
         user_annotation_data: List[AnnotationData],
         solution_annotation_data: List[OffsetPointData],
+        compiled_solution: Optional[CompiledPointSolution] = None,
     ) -> Tuple[Dict[str, List[PointResult]], List[str]]:
         """
         Test every point in the user annotation with the solution points and generates a solve result.
@@ -31,38 +44,49 @@ class AnnotationAnalysis:
 
         :param user_annotation_data: The point annotations of the user
         :param solution_annotation_data: The point annotations of the solution
+        :param compiled_solution: Already built arrays of the solution annotations
         :return: The solve result
         """
         correct_point_ids = {}
-        no_match_ids = []
-        for user_annotation in user_annotation_data:
-            no_match_ids.append(user_annotation.id)
-            for solution_annotation in solution_annotation_data:
-                if solution_annotation.id not in correct_point_ids:
-                    correct_point_ids[solution_annotation.id] = []
-                user_point = user_annotation.coord.image[0]
-                solution_point = solution_annotation.coord.image[0]
-                radius = solution_annotation.offsetImageRadius
-                distance = (user_point.x - solution_point.x) ** 2 + (
-                    user_point.y - solution_point.y
-                ) ** 2
-
-                if distance < radius**2:
-                    result = PointResult(
-                        id=user_annotation.id,
-                        distance=math.sqrt(distance),
-                        name_matches=False,
-                    )
-                    if user_annotation.name and solution_annotation.name:
-                        result.name_matches = (
-                            user_annotation.name == solution_annotation.name
-                        )
-                    else:
-                        result.name_matches = False
+        if len(user_annotation_data) == 0:
+            return correct_point_ids, []
+
+        if compiled_solution is None:
+            compiled_solution = CompiledPointSolution(solution_annotation_data)
+
+        for solution_annotation in compiled_solution.annotations:
+            if solution_annotation.id not in correct_point_ids:
+                correct_point_ids[solution_annotation.id] = []
+
+        user_indices, solution_indices, squared_distances = compiled_solution.match(
+            points_to_array(user_annotation_data)
+        )
+
+        matched = np.zeros(len(user_annotation_data), dtype=bool)
+        matched[user_indices] = True
+
+        for user_index, solution_index, distance in zip(
+            user_indices.tolist(), solution_indices.tolist(), squared_distances.tolist()
+        ):
+            user_annotation = user_annotation_data[user_index]
+            solution_annotation = compiled_solution.annotations[solution_index]
+            correct_point_ids[solution_annotation.id].append(
+                PointResult(
+                    id=user_annotation.id,
+                    distance=math.sqrt(distance),
+                    name_matches=bool(
+                        user_annotation.name
+                        and solution_annotation.name
+                        and user_annotation.name == solution_annotation.name
+                    ),
+                )
+            )
 
-                    correct_point_ids.get(solution_annotation.id).append(result)
-                    if user_annotation.id in no_match_ids:
-                        no_match_ids.remove(user_annotation.id)
+        no_match_ids = [
+            user_annotation.id
+            for user_annotation, is_matched in zip(user_annotation_data, matched)
+            if not is_matched
+        ]
 
         return correct_point_ids, no_match_ids
 
@@ -71,6 +95,8 @@ class AnnotationAnalysis:
         *,
         user_annotation_data: List[AnnotationData],
         solution_annotation_data: List[OffsetLineData],
+        compiled_solution: Optional[CompiledLineSolution] = None,
+        annotation_results: Optional[AnnotationResultCache] = None,
     ) -> Tuple[Dict[str, List[LineResult]], List[str]]:
         """
         Test every line in the user annotation with the solution lines and generates a solve result.
@@ -78,73 +104,138 @@ class AnnotationAnalysis:
 
         :param user_annotation_data: The line annotations of the user
         :param solution_annotation_data: The line annotations of the solution
+        :param compiled_solution: Already built corridors of the solution annotations
+        :param annotation_results: Results of the previous solve, only changed annotations are checked again
         :return: The solve result
         """
-        correct_line_ids = {}
-        no_match_ids = []
-
-        for user_annotation in user_annotation_data:
-            user_line_string = LineString(
-                [p.x, p.y] for p in user_annotation.coord.image
-            )
-            no_match_ids.append(user_annotation.id)
-            for solution_annotation in solution_annotation_data:
-                if solution_annotation.id not in correct_line_ids:
-                    correct_line_ids[solution_annotation.id] = []
-
-                solution_polygon = Polygon(
-                    [p.x, p.y] for p in solution_annotation.outerPoints.image
-                )
-                percentage_length_difference = (
-                    user_line_string.length
-                    / get_path_length(solution_annotation.coord.image)
-                )
-                difference = user_line_string.difference(
-                    solution_polygon
-                )  # Get those parts of line outside of polygon
-                lines_outside = []
-                if isinstance(difference, LineString):
-                    lines_outside.append(list(difference.coords))
-                else:
-                    for line in difference:
-                        lines_outside.append(list(line.coords))
-
-                annotation_result = LineResult(
-                    id=user_annotation.id,
-                    name_matches=False,
-                    percentage_outside=0.0,
-                    intersections=0,
-                    percentage_length_difference=percentage_length_difference,
-                    lines_outside=lines_outside,
-                )
+        if compiled_solution is None:
+            compiled_solution = CompiledLineSolution(solution_annotation_data)
+
+        outcomes = AnnotationAnalysis.__get_outcomes(
+            user_annotation_data=user_annotation_data,
+            annotation_results=annotation_results,
+            check_annotations=lambda user_annotations: AnnotationAnalysis.__check_lines(
+                user_annotations=user_annotations,
+                compiled_solution=compiled_solution,
+            ),
+        )
+        correct_line_ids, no_match_ids, _ = AnnotationAnalysis.__collect_outcomes(
+            user_annotation_data=user_annotation_data,
+            solution_ids=[
+                annotation.id for annotation in compiled_solution.annotations
+            ],
+            outcomes=outcomes,
+        )
+        return correct_line_ids, no_match_ids
 
-                AnnotationAnalysis.__check_name(
-                    user_annotation, solution_annotation, annotation_result
-                )
+    @staticmethod
+    def __check_lines(
+        *,
+        user_annotations: List[AnnotationData],
+        compiled_solution: CompiledLineSolution,
+    ) -> List[AnnotationOutcome]:
+        """
+        Tests the user lines against all solution lines.
+        The geometry operations run on arrays of all user/solution pairs at once.
 
-                if difference.is_empty:
-                    if user_annotation.id in no_match_ids:
-                        no_match_ids.remove(user_annotation.id)
-                    correct_line_ids[solution_annotation.id].append(annotation_result)
-                if not difference.is_empty and not difference.equals(user_line_string):
-                    annotation_result.percentage_outside = (
-                        difference.length / user_line_string.length
-                    )
-                    if isinstance(difference, LineString):
-                        annotation_result.intersections = 1
-                    else:
-                        annotation_result.intersections = len(difference)
-                    if user_annotation.id in no_match_ids:
-                        no_match_ids.remove(user_annotation.id)
-                    correct_line_ids[solution_annotation.id].append(annotation_result)
+        :param user_annotations: The line annotations of the user
+        :param compiled_solution: The prepared solution corridors
+        :return: The results in the order of the user annotations
+        """
+        if len(user_annotations) == 0:
+            return []
+
+        outcomes = [AnnotationOutcome(matches=[]) for _ in user_annotations]
+        coordinates, indices = get_coordinates(user_annotations)
+        user_lines = shapely.linestrings(coordinates, indices=indices)
+        user_lengths = shapely.length(user_lines)
+
+        # The difference of a self-intersecting line is noded and not always equal to the line
+        # even without any overlap, so these lines are still compared with every solution
+        is_simple = shapely.is_simple(user_lines)
+        simple_indices = np.flatnonzero(is_simple)
+
+        # Solutions whose bounding box does not touch the user line can not match
+        user_indices, solution_indices = compiled_solution.spatial_index.query_bulk(
+            user_lines[simple_indices]
+        )
+        user_indices = simple_indices[user_indices]
+
+        # A disjoint user line is its own difference and therefore never a match
+        is_prepared = compiled_solution.corridor_is_valid[solution_indices]
+        candidates = ~is_prepared
+        candidates[is_prepared] = shapely.intersects(
+            compiled_solution.corridors[solution_indices[is_prepared]],
+            user_lines[user_indices[is_prepared]],
+        )
+        user_indices = user_indices[candidates]
+        solution_indices = solution_indices[candidates]
+
+        complex_indices = np.flatnonzero(~is_simple)
+        solution_count = len(compiled_solution.annotations)
+        user_indices = np.concatenate(
+            [user_indices, np.repeat(complex_indices, solution_count)]
+        )
+        solution_indices = np.concatenate(
+            [solution_indices, np.tile(np.arange(solution_count), len(complex_indices))]
+        )
+        order = np.lexsort((solution_indices, user_indices))
+        user_indices = user_indices[order]
+        solution_indices = solution_indices[order]
+
+        # Get those parts of the lines outside of the polygons
+        differences = shapely.difference(
+            user_lines[user_indices], compiled_solution.corridors[solution_indices]
+        )
+        is_empty = shapely.is_empty(differences)
+        matches = is_empty | ~shapely.equals(differences, user_lines[user_indices])
+
+        for user_index, solution_index, difference, empty, length, count in zip(
+            user_indices[matches].tolist(),
+            solution_indices[matches].tolist(),
+            differences[matches],
+            is_empty[matches].tolist(),
+            shapely.length(differences[matches]).tolist(),
+            shapely.get_num_geometries(differences[matches]).tolist(),
+        ):
+            user_annotation = user_annotations[user_index]
+            solution_annotation = compiled_solution.annotations[solution_index]
+            user_length = float(user_lengths[user_index])
+
+            lines_outside = []
+            if isinstance(difference, LineString):
+                lines_outside.append(list(difference.coords))
+            else:
+                for line in difference.geoms:
+                    lines_outside.append(list(line.coords))
+
+            annotation_result = LineResult(
+                id=user_annotation.id,
+                name_matches=False,
+                percentage_outside=0.0 if empty else length / user_length,
+                intersections=0 if empty else count,
+                percentage_length_difference=user_length
+                / compiled_solution.path_lengths[solution_index],
+                lines_outside=lines_outside,
+            )
+            AnnotationAnalysis.__check_name(
+                user_annotation, solution_annotation, annotation_result
+            )
+            outcomes[user_index].matches.append(
+                (solution_annotation.id, annotation_result)
+            )
 
-        return correct_line_ids, no_match_ids
+        for outcome in outcomes:
+            outcome.no_match = len(outcome.matches) == 0
+        return outcomes
 
     @staticmethod
     def check_polygon_in_polygon(
         *,
         user_annotation_data: List[Union[RectangleData, AnnotationData]],
         solution_annotation_data: List[Union[OffsetRectangleData, OffsetPolygonData]],
+        compiled_solution: Optional[CompiledPolygonSolution] = None,
+        annotation_results: Optional[AnnotationResultCache] = None,
     ) -> Tuple[Dict[str, List[PolygonResult]], List[str], List[str]]:
         """
         Test every polygon in the user annotation with the solution polygons and generates a solve result.
@@ -152,141 +243,268 @@ class AnnotationAnalysis:
 
         :param user_annotation_data: The polygon annotations of the user
         :param solution_annotation_data: The polygon annotations of the solution
+        :param compiled_solution: Already built geometries of the solution annotations
+        :param annotation_results: Results of the previous solve, only changed annotations are checked again
         :return: The solve result
         """
-        correct_polygon_ids = {}
-        no_match_ids = []
-        invalid_ids = []
-        timer = Timer()
-        timer.start()
+        if compiled_solution is None:
+            compiled_solution = CompiledPolygonSolution(solution_annotation_data)
+
+        outcomes = AnnotationAnalysis.__get_outcomes(
+            user_annotation_data=user_annotation_data,
+            annotation_results=annotation_results,
+            check_annotations=lambda user_annotations: AnnotationAnalysis.__check_polygons(
+                user_annotations=user_annotations,
+                compiled_solution=compiled_solution,
+            ),
+        )
+        return AnnotationAnalysis.__collect_outcomes(
+            user_annotation_data=user_annotation_data,
+            solution_ids=[
+                annotation.id for annotation in compiled_solution.annotations
+            ],
+            outcomes=outcomes,
+        )
+
+    @staticmethod
+    def __get_user_rings(
+        user_annotations: List[Union[RectangleData, AnnotationData]],
+    ) -> np.ndarray:
+        """
+        Builds the rings of all user polygons, rectangles are spanned by their two corners.
 
-        for user_annotation in user_annotation_data:
+        :param user_annotations: The polygon annotations of the user
+        :return: Array with the ring of every user annotation
+        """
+        rings = []
+        for user_annotation in user_annotations:
+            coordinates = user_annotation.coord.image.array
             if user_annotation.type == AnnotationType.USER_SOLUTION_RECT:
-                p1 = user_annotation.coord.image[0]
-                p4 = user_annotation.coord.image[1]
+                p1 = coordinates[0]
+                p4 = coordinates[1]
 
-                p2 = Point(x=p1.x + (p4.x - p1.x), y=p1.y)
-                p3 = Point(x=p1.x, y=p1.y + (p4.y - p1.y))
-                user_polygon = LinearRing([p.x, p.y] for p in [p1, p3, p4, p2, p1])
-            else:
-                user_polygon = LinearRing(
-                    [p.x, p.y] for p in user_annotation.coord.image
-                )
+                p2 = [p1[0] + (p4[0] - p1[0]), p1[1]]
+                p3 = [p1[0], p1[1] + (p4[1] - p1[1])]
+                coordinates = np.array([p1, p3, p4, p2, p1], dtype=np.float64)
+            rings.append(coordinates)
 
-            if not user_polygon.is_valid:
-                invalid_ids.append(user_annotation.id)
-                continue
-            no_match_ids.append(user_annotation.id)
+        return shapely.linearrings(
+            np.concatenate(rings),
+            indices=np.repeat(np.arange(len(rings)), [len(ring) for ring in rings]),
+        )
 
-            for solution_annotation in solution_annotation_data:
-                time_before = timer.time_elapsed
+    @staticmethod
+    def __check_polygons(
+        *,
+        user_annotations: List[Union[RectangleData, AnnotationData]],
+        compiled_solution: CompiledPolygonSolution,
+    ) -> List[AnnotationOutcome]:
+        """
+        Tests the user polygons against all solution polygons.
+        The geometry operations run on arrays of all user/solution pairs at once.
 
-                if solution_annotation.id not in correct_polygon_ids:
-                    correct_polygon_ids[solution_annotation.id] = []
+        :param user_annotations: The polygon annotations of the user
+        :param compiled_solution: The prepared solution polygons
+        :return: The results in the order of the user annotations
+        """
+        if len(user_annotations) == 0:
+            return []
+
+        user_polygons = AnnotationAnalysis.__get_user_rings(user_annotations)
+        user_lengths = shapely.length(user_polygons)
+        user_areas = shapely.area(user_polygons)
+        is_valid = shapely.is_valid(user_polygons)
+
+        outcomes = [
+            (
+                AnnotationOutcome(matches=[])
+                if valid
+                else AnnotationOutcome(checked=False, invalid=1)
+            )
+            for valid in is_valid.tolist()
+        ]
+
+        # Solutions whose bounding box does not touch the user polygon can not match
+        valid_indices = np.flatnonzero(is_valid)
+        user_indices, solution_indices = compiled_solution.spatial_index.query_bulk(
+            user_polygons[valid_indices]
+        )
+        user_indices = valid_indices[user_indices]
+
+        # A disjoint user polygon is its own difference and therefore never a match
+        is_prepared = compiled_solution.hole_is_valid[solution_indices]
+        candidates = ~is_prepared
+        candidates[is_prepared] = shapely.intersects(
+            compiled_solution.holes[solution_indices[is_prepared]],
+            user_polygons[user_indices[is_prepared]],
+        )
+        user_indices = user_indices[candidates]
+        solution_indices = solution_indices[candidates]
+
+        differences, is_equal = AnnotationAnalysis.__get_hole_differences(
+            user_polygons[user_indices], compiled_solution.holes[solution_indices]
+        )
+        is_failed = shapely.is_missing(differences)
+        is_empty = shapely.is_empty(differences)
+        matches = ~is_failed & (is_empty | ~is_equal)
+
+        for user_index in user_indices[is_failed].tolist():
+            outcomes[user_index].invalid += 1
+
+        for user_index, solution_index, difference, empty, length, count in zip(
+            user_indices[matches].tolist(),
+            solution_indices[matches].tolist(),
+            differences[matches],
+            is_empty[matches].tolist(),
+            shapely.length(differences[matches]).tolist(),
+            shapely.get_num_geometries(differences[matches]).tolist(),
+        ):
+            user_annotation = user_annotations[user_index]
+            solution_annotation = compiled_solution.annotations[solution_index]
+            user_length = float(user_lengths[user_index])
+
+            lines_outside = []
+            if not empty:
+                if isinstance(difference, LineString):
+                    lines_outside.append(list(difference.coords))
+                elif isinstance(difference, Polygon):
+                    lines_outside.append(list(difference.exterior.coords))
+                else:
+                    for line in difference.geoms:
+                        lines_outside.append(list(line.coords))
 
-                solution_inner_polygon = Polygon(
-                    [p.x, p.y] for p in solution_annotation.innerPoints.image
-                )
-                solution_outer_polygon = Polygon(
-                    [p.x, p.y] for p in solution_annotation.outerPoints.image
-                )
+            annotation_result = PolygonResult(
+                id=user_annotation.id,
+                name_matches=False,
+                percentage_outside=0.0 if empty else length / user_length,
+                intersections=0 if empty else count,
+                percentage_length_difference=user_length
+                / compiled_solution.path_lengths[solution_index],
+                percentage_area_difference=float(user_areas[user_index])
+                / compiled_solution.areas[solution_index],
+                lines_outside=lines_outside,
+            )
+            AnnotationAnalysis.__check_name(
+                user_annotation, solution_annotation, annotation_result
+            )
+            outcomes[user_index].matches.append(
+                (solution_annotation.id, annotation_result)
+            )
 
-                if solution_inner_polygon.is_empty:
-                    polygon_hole = Polygon(solution_outer_polygon.exterior.coords)
-                else:
-                    polygon_hole = Polygon(
-                        solution_outer_polygon.exterior.coords,
-                        [solution_inner_polygon.exterior.coords],
-                    )
+        for outcome in outcomes:
+            if outcome.checked:
+                outcome.no_match = len(outcome.matches) == 0 and outcome.invalid == 0
+        return outcomes
 
-                percentage_length_difference = user_polygon.length / (
-                    get_path_length(solution_annotation.coord.image) if not 0 else 1
-                )
+    @staticmethod
+    def __get_hole_differences(
+        user_polygons: np.ndarray, holes: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the parts of the user polygons outside of the solution polygons and whether these
+        equal the whole user polygon. If the geometry operation fails for any pair, the pairs are
+        checked one by one and the failed pairs get no difference.
 
-                try:
-                    hole_difference = user_polygon.difference(polygon_hole)
-                    lines_outside = []
-                    if not hole_difference.is_empty:
-                        if isinstance(hole_difference, LineString):
-                            lines_outside.append(list(hole_difference.coords))
-
-                        elif isinstance(hole_difference, Polygon):
-                            lines_outside.append(list(hole_difference.exterior.coords))
-                        else:
-                            for line in hole_difference:
-                                lines_outside.append(list(line.coords))
-
-                    solution_area = 1
-
-                    if solution_annotation.type == AnnotationType.SOLUTION_RECT:
-                        p1 = solution_annotation.coord.image[0]
-                        p4 = solution_annotation.coord.image[1]
-
-                        p2 = Point(x=p1.x + (p4.x - p1.x), y=p1.y)
-                        p3 = Point(x=p1.x, y=p1.y + (p4.y - p1.y))
-
-                        solution_polygon = Polygon(
-                            [p.x, p.y] for p in [p1, p2, p3, p4, p1]
-                        )
-
-                        solution_polygon = solution_polygon.buffer(0)
-                        solution_area = solution_polygon.area
-
-                    else:
-                        solution_area = Polygon(
-                            [p.x, p.y] for p in solution_annotation.coord.image
-                        ).area
-
-                    if solution_area == 0:
-                        solution_area = 1
-
-                    annotation_result = PolygonResult(
-                        id=user_annotation.id,
-                        name_matches=False,
-                        percentage_outside=0.0,
-                        intersections=0,
-                        percentage_length_difference=percentage_length_difference,
-                        percentage_area_difference=user_polygon.area / solution_area,
-                        lines_outside=lines_outside,
-                    )
+        :param user_polygons: The rings of the user polygons
+        :param holes: The solution polygons of every pair
+        :return: The differences and if they equal the user polygons
+        """
+        try:
+            differences = shapely.difference(user_polygons, holes)
+            return differences, shapely.equals(differences, user_polygons)
+        except GEOSException:
+            pass
+
+        differences = np.empty(len(user_polygons), dtype=object)
+        is_equal = np.zeros(len(user_polygons), dtype=bool)
+        for i, (user_polygon, hole) in enumerate(zip(user_polygons, holes)):
+            try:
+                differences[i] = user_polygon.difference(hole)
+                is_equal[i] = differences[i].equals(user_polygon)
+            except GEOSException as e:
+                print(e)
+                differences[i] = None
+        return differences, is_equal
+
+    @staticmethod
+    def __get_outcomes(
+        *,
+        user_annotation_data: List[AnnotationData],
+        annotation_results: Optional[AnnotationResultCache],
+        check_annotations: Callable[[List[AnnotationData]], List[AnnotationOutcome]],
+    ) -> List[AnnotationOutcome]:
+        """
+        Returns the result of every user annotation.
+        Annotations which are unchanged since the previous solve reuse their stored result,
+        all others are checked together.
+
+        :param user_annotation_data: The annotations of the user
+        :param annotation_results: Results of the previous solve
+        :param check_annotations: Checks a list of user annotations
+        :return: The results in the order of the user annotations
+        """
+        if annotation_results is None:
+            return check_annotations(user_annotation_data)
+
+        outcomes: List[Optional[AnnotationOutcome]] = []
+        keys = []
+        missing = []
+        for index, user_annotation in enumerate(user_annotation_data):
+            key = annotation_hash(user_annotation)
+            outcome = annotation_results.get(key)
+            if outcome is None:
+                missing.append(index)
+            outcomes.append(outcome)
+            keys.append(key)
+
+        if len(missing) > 0:
+            checked = check_annotations([user_annotation_data[i] for i in missing])
+            for index, outcome in zip(missing, checked):
+                annotation_results.set(keys[index], outcome)
+                outcomes[index] = outcome
+        return outcomes
+
+    @staticmethod
+    def __collect_outcomes(
+        *,
+        user_annotation_data: List[AnnotationData],
+        solution_ids: List[str],
+        outcomes: List[AnnotationOutcome],
+    ) -> Tuple[Dict[str, List[Union[LineResult, PolygonResult]]], List[str], List[str]]:
+        """
+        Groups the results of the single user annotations by the solution annotations.
+
+        :param user_annotation_data: The annotations of the user
+        :param solution_ids: Ids of the solution annotations
+        :param outcomes: The results in the order of the user annotations
+        :return: Matches grouped by the solution annotation id, ids without a match and invalid ids
+        """
+        correct_ids = {}
+        no_match_ids = []
+        invalid_ids = []
+
+        for user_annotation, outcome in zip(user_annotation_data, outcomes):
+            invalid_ids.extend([user_annotation.id] * outcome.invalid)
+            if not outcome.checked:
+                continue
 
-                    AnnotationAnalysis.__check_name(
-                        user_annotation, solution_annotation, annotation_result
+            if len(correct_ids) == 0:
+                for solution_id in solution_ids:
+                    if solution_id not in correct_ids:
+                        correct_ids[solution_id] = []
+
+            for solution_id, annotation_result in outcome.matches:
+                # Stored results may belong to an identical annotation with another id
+                if annotation_result.id != user_annotation.id:
+                    annotation_result = annotation_result.copy(
+                        update={"id": user_annotation.id}
                     )
+                correct_ids[solution_id].append(annotation_result)
+
+            if outcome.no_match:
+                no_match_ids.append(user_annotation.id)
 
-                    if hole_difference.is_empty:
-                        if user_annotation.id in no_match_ids:
-                            no_match_ids.remove(user_annotation.id)
-                        correct_polygon_ids[solution_annotation.id].append(
-                            annotation_result
-                        )
-                    if not hole_difference.is_empty and not hole_difference.equals(
-                        user_polygon
-                    ):
-                        annotation_result.percentage_outside = (
-                            hole_difference.length / user_polygon.length
-                        )
-                        if isinstance(hole_difference, LineString) or isinstance(
-                            hole_difference, Polygon
-                        ):
-                            annotation_result.intersections = 1
-                        else:
-                            annotation_result.intersections = len(hole_difference)
-                        if user_annotation.id in no_match_ids:
-                            no_match_ids.remove(user_annotation.id)
-                        correct_polygon_ids[solution_annotation.id].append(
-                            annotation_result
-                        )
-
-                except TopologicalError as e:
-                    print(e)
-
-                    if user_annotation.id in no_match_ids:
-                        no_match_ids.remove(user_annotation.id)
-                    invalid_ids.append(user_annotation.id)
-        timer.stop()
-
-        return correct_polygon_ids, no_match_ids, invalid_ids
+        return correct_ids, no_match_ids, invalid_ids
 
     @staticmethod
     def __check_name(
@@ -0,0 +1,83 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.schemas.polygon_data import AnnotationData
+from app.schemas.solver_result import AnnotationOutcome
+
+# Has to be increased whenever the analysis produces different results for the same input
+ANALYSIS_VERSION = 2
+
+
+def annotation_hash(annotation: AnnotationData) -> str:
+    """
+    Returns a hash over everything of the annotation the analysis depends on
+
+    :param annotation: The user annotation
+    :return: The content hash
+    """
+    content = hashlib.sha1(f"{int(annotation.type)}:{annotation.name}".encode("utf-8"))
+    content.update(annotation.coord.image.array.tobytes())
+    return content.hexdigest()
+
+
+class AnnotationResultCache:
+    """
+    Analysis results of the user annotations of one user solution from the previous solve.
+    Results are keyed by the content hash of the annotation, so only added or changed annotations
+    have to be checked again. The results are only valid for the solution revision they were created with.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]], *, solution_revision: int):
+        """
+        :param data: The stored results of the user solution
+        :param solution_revision: The current solution revision of the task
+        """
+        self.solution_revision = solution_revision
+        self.stored: Dict[str, Any] = {}
+        if (
+            data is not None
+            and data.get("version") == ANALYSIS_VERSION
+            and data.get("solution_revision") == solution_revision
+        ):
+            self.stored = data.get("annotations", {})
+        self.used: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[AnnotationOutcome]:
+        """
+        Returns the stored result to the annotation hash
+
+        :param key: Content hash of the annotation
+        :return: The stored result or None if the annotation was not checked before
+        """
+        data = self.stored.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used[key] = data
+        return AnnotationOutcome.parse_obj(data)
+
+    def set(self, key: str, outcome: AnnotationOutcome) -> None:
+        """
+        Stores the result to the annotation hash
+
+        :param key: Content hash of the annotation
+        :param outcome: Result of the annotation
+        """
+        self.used[key] = outcome.dict()
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Returns the results of all annotations of the last solve, results of removed annotations are dropped
+
+        :return: The results which should be stored with the user solution
+        """
+        return {
+            "version": ANALYSIS_VERSION,
+            "solution_revision": self.solution_revision,
+            "annotations": self.used,
+        }
@@ -0,0 +1,100 @@
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple
+
+from app.core.solver.solver import Solver
+from app.schemas.task import SolvableTask, TaskFeedback
+from app.schemas.user_solution import UserSolutionData
+
+# Upper bound of user solutions sent to a worker at once, keeps the progress fine-grained
+MAX_CHUNK_SIZE = 50
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Returns the process pool of the solver and creates it on first use.
+    The workers are spawned instead of forked because the API process runs several threads.
+
+    :param max_workers: Number of worker processes
+    :return: The process pool
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != max_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_workers = max_workers
+        return _pool
+
+
+def solve_chunk(
+    task: SolvableTask, user_solutions: List[UserSolutionData]
+) -> List[Tuple[UserSolutionData, TaskFeedback]]:
+    """
+    Solves the user solutions to the task.
+    The compiled task solution is cached by the worker and reused for all following chunks.
+
+    :param task: The task with the solution
+    :param user_solutions: The user solutions that should be solved
+    :return: The user solutions with their feedback
+    """
+    return [
+        (
+            user_solution,
+            Solver.solve(user_solution=user_solution, task=task, force_solve=True),
+        )
+        for user_solution in user_solutions
+    ]
+
+
+class BulkSolver:
+    @staticmethod
+    def solve(
+        *,
+        task: SolvableTask,
+        user_solutions: List[UserSolutionData],
+        max_workers: int,
+    ) -> Iterator[List[Tuple[UserSolutionData, TaskFeedback]]]:
+        """
+        Solves all user solutions to the task in parallel and yields the results chunk by chunk
+        in the order the chunks are finished.
+
+        :param task: The task with the solution
+        :param user_solutions: The user solutions that should be solved
+        :param max_workers: Number of worker processes, with one or less everything is solved in this process
+        :return: Iterator over the solved chunks
+        """
+        if len(user_solutions) == 0:
+            return
+
+        chunk_size = max(
+            1,
+            min(
+                MAX_CHUNK_SIZE,
+                math.ceil(len(user_solutions) / (max(max_workers, 1) * 4)),
+            ),
+        )
+        chunks = [
+            user_solutions[i : i + chunk_size]
+            for i in range(0, len(user_solutions), chunk_size)
+        ]
+
+        if max_workers <= 1:
+            for chunk in chunks:
+                yield solve_chunk(task, chunk)
+            return
+
+        pool = get_process_pool(max_workers)
+        futures = [pool.submit(solve_chunk, task, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Union
+
+from pydantic import parse_obj_as
+
+from app.core.solver.solution_geometry import (
+    CompiledLineSolution,
+    CompiledPointSolution,
+    CompiledPolygonSolution,
+)
+from app.schemas.polygon_data import (
+    AnnotationType,
+    OffsetLineData,
+    OffsetPointData,
+    OffsetPolygonData,
+    OffsetRectangleData,
+)
+from app.schemas.task import TaskType
+
+
+class CompiledSolution:
+    """
+    Parsed solution of a task together with all geometries the solver needs for it
+    """
+
+    def __init__(self, task: Any):
+        """
+        Parses the solution of the task and builds its geometries
+
+        :param task: The task with the solution
+        """
+        self.task_id = task.id
+        self.revision = getattr(task, "solution_revision", None)
+        self.annotations: Optional[
+            List[
+                Union[
+                    OffsetPointData,
+                    OffsetLineData,
+                    OffsetRectangleData,
+                    OffsetPolygonData,
+                ]
+            ]
+        ] = None
+        self.points: Optional[CompiledPointSolution] = None
+        self.lines: Optional[CompiledLineSolution] = None
+        self.polygons: Optional[CompiledPolygonSolution] = None
+
+        if task.solution is None or task.task_type == TaskType.IMAGE_SELECT:
+            return
+
+        if task.annotation_type == AnnotationType.SOLUTION_POINT:
+            self.annotations = parse_obj_as(List[OffsetPointData], task.solution)
+            self.points = CompiledPointSolution(self.annotations)
+
+        if task.annotation_type == AnnotationType.SOLUTION_LINE:
+            self.annotations = parse_obj_as(List[OffsetLineData], task.solution)
+            self.lines = CompiledLineSolution(self.annotations)
+
+        if task.annotation_type == AnnotationType.SOLUTION:
+            self.annotations = parse_obj_as(
+                List[Union[OffsetRectangleData, OffsetPolygonData]], task.solution
+            )
+            self.polygons = CompiledPolygonSolution(self.annotations)
+
+
+class SolutionCache:
+    """
+    Process wide LRU cache of compiled task solutions.
+    Entries are keyed by the task id and only used while their solution revision matches the task.
+    """
+
+    def __init__(self, max_size: int = 256):
+        """
+        :param max_size: Maximum number of cached task solutions
+        """
+        self.max_size = max_size
+        self.entries: "OrderedDict[int, CompiledSolution]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, task: Any) -> CompiledSolution:
+        """
+        Returns the compiled solution of the task and compiles it if it is missing or outdated.
+
+        :param task: The task with the solution
+        :return: The compiled solution
+        """
+        revision = getattr(task, "solution_revision", None)
+        if revision is None:
+            return CompiledSolution(task)
+
+        with self.lock:
+            compiled_solution = self.entries.get(task.id)
+            if compiled_solution is not None and compiled_solution.revision == revision:
+                self.entries.move_to_end(task.id)
+                return compiled_solution
+
+        compiled_solution = CompiledSolution(task)
+
+        with self.lock:
+            self.entries[task.id] = compiled_solution
+            self.entries.move_to_end(task.id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return compiled_solution
+
+    def invalidate(self, task_id: int) -> None:
+        """
+        Removes the compiled solution of the task
+
+        :param task_id: Id of the task
+        """
+        with self.lock:
+            self.entries.pop(task_id, None)
+
+    def clear(self) -> None:
+        """
+        Removes all compiled solutions
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+solution_cache = SolutionCache()
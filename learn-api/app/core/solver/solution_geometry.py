@@ -0,0 +1,189 @@
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import shapely
+from scipy.spatial import cKDTree
+from shapely.geometry import Polygon
+
+from app.core.annotation_type import points_to_array
+from app.core.solver.spatial_index import SpatialIndex
+from app.schemas.polygon_data import (
+    AnnotationType,
+    OffsetLineData,
+    OffsetPointData,
+    OffsetPolygonData,
+    OffsetRectangleData,
+    Point,
+)
+from app.utils.utils import get_path_length
+
+
+class CompiledPointSolution:
+    """
+    Coordinates and radii of all solution points of a task as NumPy arrays
+    """
+
+    # Up to this many user/solution pairs the full distance matrix is cheaper than a KD-tree
+    BROADCAST_LIMIT = 250_000
+
+    def __init__(self, annotations: List[OffsetPointData]):
+        """
+        Collects the solution points and their squared radii
+
+        :param annotations: The solution annotations
+        """
+        self.annotations = annotations
+        self.coordinates = points_to_array(annotations)
+        self.squared_radii = (
+            np.array([a.offsetImageRadius for a in annotations], dtype=np.float64) ** 2
+        )
+        self.max_radius = (
+            float(np.sqrt(self.squared_radii.max())) if len(annotations) > 0 else 0.0
+        )
+        self.tree: Optional[cKDTree] = None
+
+    def match(self, user_coordinates: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Returns all user/solution pairs where the user point lies inside the solution radius.
+        The pairs are ordered by solution and then by user point.
+
+        :param user_coordinates: Array of shape (n, 2) with the user points
+        :return: User positions, solution positions and squared distances of the pairs
+        """
+        if len(user_coordinates) == 0 or len(self.annotations) == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty, np.empty(0, dtype=np.float64)
+
+        if len(user_coordinates) * len(self.annotations) <= self.BROADCAST_LIMIT:
+            delta = user_coordinates[:, np.newaxis, :] - self.coordinates[np.newaxis]
+            squared_distances = delta[..., 0] ** 2 + delta[..., 1] ** 2
+            solution_indices, user_indices = np.nonzero(
+                (squared_distances < self.squared_radii[np.newaxis]).T
+            )
+            return (
+                user_indices,
+                solution_indices,
+                squared_distances[user_indices, solution_indices],
+            )
+
+        if self.tree is None:
+            self.tree = cKDTree(self.coordinates)
+
+        # The tree only narrows down the candidates, the exact test uses the radius of every solution
+        candidates = self.tree.query_ball_point(
+            user_coordinates, r=self.max_radius * (1 + 1e-9) + 1e-9
+        )
+        counts = np.fromiter((len(c) for c in candidates), dtype=np.intp)
+        user_indices = np.repeat(np.arange(len(user_coordinates)), counts)
+        solution_indices = (
+            np.concatenate([np.asarray(c, dtype=np.intp) for c in candidates])
+            if counts.sum() > 0
+            else np.empty(0, dtype=np.intp)
+        )
+
+        delta = user_coordinates[user_indices] - self.coordinates[solution_indices]
+        squared_distances = delta[:, 0] ** 2 + delta[:, 1] ** 2
+        inside = squared_distances < self.squared_radii[solution_indices]
+
+        user_indices = user_indices[inside]
+        solution_indices = solution_indices[inside]
+        squared_distances = squared_distances[inside]
+
+        order = np.lexsort((user_indices, solution_indices))
+        return user_indices[order], solution_indices[order], squared_distances[order]
+
+
+class CompiledLineSolution:
+    """
+    Corridors and path lengths of all solution lines of a task together with a spatial index over them.
+    These only depend on the solution and can therefore be reused for every user annotation.
+    """
+
+    def __init__(self, annotations: List[OffsetLineData]):
+        """
+        Builds the corridors of all solution annotations and indexes them
+
+        :param annotations: The solution annotations
+        """
+        self.annotations = annotations
+        self.corridors = np.array(
+            [Polygon(a.outerPoints.image.array) for a in annotations],
+            dtype=object,
+        )
+
+        # Predicates of invalid polygons are unreliable, so only valid corridors are prepared
+        self.corridor_is_valid = shapely.is_valid(self.corridors)
+        shapely.prepare(self.corridors[self.corridor_is_valid])
+
+        self.path_lengths = [get_path_length(a.coord.image) for a in annotations]
+        self.spatial_index = SpatialIndex(self.corridors)
+
+
+def get_polygon_hole(
+    annotation: Union[OffsetRectangleData, OffsetPolygonData],
+) -> Polygon:
+    """
+    Builds the area between the outer and the inner offset polygon of the solution annotation
+
+    :param annotation: The solution annotation
+    :return: The holed polygon
+    """
+    inner_polygon = Polygon(annotation.innerPoints.image.array)
+    outer_polygon = Polygon(annotation.outerPoints.image.array)
+
+    if inner_polygon.is_empty:
+        return Polygon(outer_polygon.exterior.coords)
+    return Polygon(
+        outer_polygon.exterior.coords,
+        [inner_polygon.exterior.coords],
+    )
+
+
+def get_solution_polygon(
+    annotation: Union[OffsetRectangleData, OffsetPolygonData],
+) -> Polygon:
+    """
+    Builds the polygon of the solution annotation itself
+
+    :param annotation: The solution annotation
+    :return: The polygon
+    """
+    if annotation.type == AnnotationType.SOLUTION_RECT:
+        p1 = annotation.coord.image[0]
+        p4 = annotation.coord.image[1]
+
+        p2 = Point(x=p1.x + (p4.x - p1.x), y=p1.y)
+        p3 = Point(x=p1.x, y=p1.y + (p4.y - p1.y))
+
+        return Polygon([p.x, p.y] for p in [p1, p2, p3, p4, p1]).buffer(0)
+    return Polygon(annotation.coord.image.array)
+
+
+class CompiledPolygonSolution:
+    """
+    Holed polygons, areas and path lengths of all solution polygons of a task together with
+    a spatial index over them. These only depend on the solution and can therefore be reused
+    for every user annotation.
+    """
+
+    def __init__(
+        self, annotations: List[Union[OffsetRectangleData, OffsetPolygonData]]
+    ):
+        """
+        Builds the geometries of all solution annotations and indexes them
+
+        :param annotations: The solution annotations
+        """
+        self.annotations = annotations
+        self.holes = np.array([get_polygon_hole(a) for a in annotations], dtype=object)
+
+        # Predicates of invalid polygons are unreliable, so only valid holes are prepared
+        self.hole_is_valid = shapely.is_valid(self.holes)
+        shapely.prepare(self.holes[self.hole_is_valid])
+
+        self.path_lengths = [get_path_length(a.coord.image) for a in annotations]
+        areas = shapely.area(
+            np.array([get_solution_polygon(a) for a in annotations], dtype=object)
+        )
+        self.areas = [area if area != 0 else 1 for area in areas.tolist()]
+        self.spatial_index = SpatialIndex(self.holes)
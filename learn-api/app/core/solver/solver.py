@@ -1,29 +1,28 @@
-from typing import List, Union
+from typing import List, Optional, Union
 
 from pydantic import parse_obj_as
 
 from app.core.solver.annotation_analysis import AnnotationAnalysis
+from app.core.solver.annotation_results import AnnotationResultCache
 from app.core.solver.feeback_generator import FeedbackGenerator
 from app.core.solver.select_images_analysis import SelectImagesAnalysis
-from app.schemas.polygon_data import (
-    AnnotationData,
-    AnnotationType,
-    OffsetLineData,
-    OffsetPointData,
-    OffsetPolygonData,
-    OffsetRectangleData,
-    RectangleData,
-)
+from app.core.solver.solution_cache import solution_cache
+from app.schemas.polygon_data import AnnotationData, AnnotationType, RectangleData
 from app.schemas.task import Task, TaskFeedback, TaskStatus, TaskType
 from app.schemas.user_solution import UserSolution
 from app.utils.logger import logger
-from app.utils.timer import Timer
+from app.utils.timer import StageTimer, Timer
 
 
 class Solver:
     @staticmethod
     def solve(
-        *, user_solution: UserSolution, task: Task, force_solve=False
+        *,
+        user_solution: UserSolution,
+        task: Task,
+        force_solve=False,
+        annotation_results: Optional[AnnotationResultCache] = None,
+        stage_timer: Optional[StageTimer] = None,
     ) -> TaskFeedback:
         """
         Solves the given user solution to the task and generates feedback for it
@@ -31,10 +30,15 @@ class Solver:
         :param user_solution: The solution that should be solved
         :param task: The task with the solution
         :param force_solve: If the user solution should definitely be solved
+        :param annotation_results: Results of the previous solve, filled with the results of this solve
+        :param stage_timer: Receives the run times of the parse, analysis and feedback stages
         :return: The resulting feedback for the
         """
         current_timer = Timer()
         current_timer.start()
+        if stage_timer is None:
+            stage_timer = StageTimer()
+        stage_timer.start()
 
         task_result = TaskFeedback(task_id=task.id)
         task_result.result_detail = []
@@ -66,6 +70,7 @@ class Solver:
             correct_images, wrong_images = SelectImagesAnalysis.check_select_images(
                 task_solution=solution_data, user_solution=user_solution_data
             )
+            stage_timer.lap("analysis")
 
             task_result = FeedbackGenerator.generate_image_select_feedback(
                 task_feedback=task_result,
@@ -73,6 +78,7 @@ class Solver:
                 wrong_image_indices=wrong_images,
                 solution_data=solution_data,
             )
+            stage_timer.lap("feedback")
         else:
             min_correct = (
                 task.min_correct if task.task_type == 0 else len(task.solution)
@@ -96,14 +102,17 @@ class Solver:
                 List[Union[RectangleData, AnnotationData]], user_solution_data
             )
 
+            compiled_solution = solution_cache.get(task)
+            parsed_task_solution = compiled_solution.annotations
+            stage_timer.lap("parse")
+
             if task_annotation_type == AnnotationType.SOLUTION_POINT:
-                parsed_task_solution = parse_obj_as(
-                    List[OffsetPointData], task_solution
-                )
                 solve_result = AnnotationAnalysis.check_point_in_point(
                     user_annotation_data=parsed_user_solution,
                     solution_annotation_data=parsed_task_solution,
+                    compiled_solution=compiled_solution.points,
                 )
+                stage_timer.lap("analysis")
 
                 task_result = FeedbackGenerator.generate_point_feedback(
                     solve_result=solve_result,
@@ -112,13 +121,16 @@ class Solver:
                     check_name=should_check_name,
                     knowledge_level=task.knowledge_level,
                 )
+                stage_timer.lap("feedback")
 
             if task_annotation_type == AnnotationType.SOLUTION_LINE:
-                parsed_task_solution = parse_obj_as(List[OffsetLineData], task_solution)
                 solve_result = AnnotationAnalysis.check_line_in_line(
                     user_annotation_data=parsed_user_solution,
                     solution_annotation_data=parsed_task_solution,
+                    compiled_solution=compiled_solution.lines,
+                    annotation_results=annotation_results,
                 )
+                stage_timer.lap("analysis")
                 task_result = FeedbackGenerator.generate_line_feedback(
                     solve_result=solve_result,
                     task_result=task_result,
@@ -126,15 +138,16 @@ class Solver:
                     check_name=should_check_name,
                     knowledge_level=task.knowledge_level,
                 )
+                stage_timer.lap("feedback")
 
             if task_annotation_type == AnnotationType.SOLUTION:
-                parsed_task_solution = parse_obj_as(
-                    List[Union[OffsetRectangleData, OffsetPolygonData]], task_solution
-                )
                 solve_result = AnnotationAnalysis.check_polygon_in_polygon(
                     user_annotation_data=parsed_user_solution,
                     solution_annotation_data=parsed_task_solution,
+                    compiled_solution=compiled_solution.polygons,
+                    annotation_results=annotation_results,
                 )
+                stage_timer.lap("analysis")
                 task_result = FeedbackGenerator.generate_polygon_feedback(
                     solve_result=solve_result,
                     task_result=task_result,
@@ -142,7 +155,10 @@ class Solver:
                     check_name=should_check_name,
                     knowledge_level=task.knowledge_level,
                 )
+                stage_timer.lap("feedback")
 
         current_timer.stop()
-        logger.debug(f"Solver needed {current_timer.total_run_time * 1000}ms")
+        logger.debug(
+            f"Solver needed {current_timer.total_run_time * 1000}ms, stages: {stage_timer.stages}"
+        )
         return task_result
@@ -0,0 +1,47 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from shapely.geometry.base import BaseGeometry
+from shapely.strtree import STRtree
+
+
+class SpatialIndex:
+    """
+    STRtree over a list of geometries which returns the positions of all geometries
+    whose bounding box intersects the bounding box of a query geometry.
+    """
+
+    def __init__(self, geometries: Sequence[BaseGeometry]):
+        """
+        Builds the index for the given geometries
+
+        :param geometries: The geometries that should be indexed
+        """
+        self.size = len(geometries)
+        self.tree = STRtree(np.asarray(geometries, dtype=object))
+
+    def query(self, geometry: BaseGeometry) -> List[int]:
+        """
+        Returns the positions of all candidate geometries in ascending order.
+        Only the bounding boxes are compared, so the candidates still have to be checked exactly.
+
+        :param geometry: The geometry to search candidates for
+        :return: Positions of the candidate geometries
+        """
+        return sorted(self.tree.query(geometry).tolist())
+
+    def query_bulk(self, geometries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns all pairs of query geometry and candidate geometry whose bounding boxes intersect.
+        The pairs are ordered by the query geometry and then by the candidate.
+
+        :param geometries: Array of the geometries to search candidates for
+        :return: Positions of the query geometries and of the candidates
+        """
+        if len(geometries) == 0 or self.size == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+
+        query_indices, tree_indices = self.tree.query(geometries)
+        order = np.lexsort((tree_indices, query_indices))
+        return query_indices[order], tree_indices[order]
@@ -0,0 +1,90 @@
+import datetime
+
+from sqlalchemy.orm import Session
+
+from app.core.solver.annotation_results import AnnotationResultCache
+from app.core.solver.solver import Solver
+from app.crud.crud_base_task import crud_base_task
+from app.crud.crud_image_select_error import crud_image_select_error
+from app.crud.crud_task_statistic import crud_task_statistic
+from app.crud.crud_user_solution import crud_user_solution
+from app.models.task import Task
+from app.schemas.task import TaskFeedback, TaskStatus
+from app.schemas.task_statistic import TaskStatisticCreate
+from app.schemas.user_solution import UserSolutionCreate, UserSolutionUpdate
+
+
+class UserSolutionSolver:
+    @staticmethod
+    def solve(
+        db: Session, *, task: Task, user_id: str, force_solve: bool = False
+    ) -> TaskFeedback:
+        """
+        Solves the solution of the user to the task and saves the result and a task statistic.
+        An empty solution is created if the user has none yet.
+
+        :param db: DB-Session
+        :param task: The task with the solution
+        :param user_id: Id of the user
+        :param force_solve: If the user solution should definitely be solved
+        :return: The resulting feedback
+        """
+        user_solution = crud_user_solution.get_solution_to_task_and_user(
+            db, task_id=task.id, user_id=user_id
+        )
+        if user_solution is None:
+            base_task = crud_base_task.get(db=db, id=task.base_task_id)
+            user_solution = crud_user_solution.create(
+                db=db,
+                obj_in=UserSolutionCreate(
+                    task_id=task.id,
+                    user_id=user_id,
+                    base_task_id=task.base_task_id,
+                    task_group_id=base_task.task_group_id,
+                    course_id=base_task.course_id,
+                    solution_data=[],
+                    percentage_solved=0.0,
+                ),
+            )
+        annotation_results = AnnotationResultCache(
+            user_solution.annotation_results, solution_revision=task.solution_revision
+        )
+        task_result = Solver.solve(
+            user_solution=user_solution,
+            task=task,
+            force_solve=force_solve,
+            annotation_results=annotation_results,
+        )
+
+        solution_update = UserSolutionUpdate(
+            task_result=task_result, annotation_results=annotation_results.to_json()
+        )
+        if task_result.task_status == TaskStatus.CORRECT:
+            solution_update.percentage_solved = 1.0
+        else:
+            crud_user_solution.increment_failed_attempts(
+                db, user_id=user_id, task_id=task.id
+            )
+            solution_update.percentage_solved = 0.0
+        crud_user_solution.update(db, db_obj=user_solution, obj_in=solution_update)
+
+        # Committed together with the task statistic
+        crud_image_select_error.add_first_attempts(
+            db,
+            task=task,
+            solutions=[(user_id, user_solution.solution_data)],
+            commit=False,
+        )
+        crud_task_statistic.create(
+            db,
+            obj_in=TaskStatisticCreate(
+                user_id=user_id,
+                task_id=task.id,
+                base_task_id=user_solution.base_task_id,
+                solved_date=datetime.datetime.now(),
+                percentage_solved=solution_update.percentage_solved,
+                solution_data=user_solution.solution_data,
+                task_result=task_result,
+            ),
+        )
+        return task_result
@@ -0,0 +1,37 @@
+from typing import Any, Generic, List, Optional, Type
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import ModelType
+
+
+class AsyncCRUDBase(Generic[ModelType]):
+    def __init__(self, model: Type[ModelType]):
+        """
+        CRUD object with default methods to read entities with an async session.
+        Relationships can't be loaded lazily in async code, so every query has to load
+        the relationships the caller needs eagerly.
+
+        :param model: A SQLAlchemy model class
+        """
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """
+        General method to get an Entity by Id.
+
+        :param db: Async DB-Session
+        :param id: The id of the model
+        :return: The found Entity or None
+        """
+        return await db.get(self.model, id)
+
+    async def get_multi(self, db: AsyncSession) -> List[ModelType]:
+        """
+        Returns all Entities in DB.
+
+        :param db: Async DB-Session
+        :return: All found Entities
+        """
+        return (await db.execute(select(self.model))).scalars().all()
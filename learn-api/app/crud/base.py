@@ -3,9 +3,13 @@ from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from app.db.base_class import Base
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import inspect, tuple_
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
 
+from app.utils.logger import logger
+from app.utils.timer import Timer
+
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
@@ -61,7 +65,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: Session,
         *,
         db_obj: ModelType,
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
     ) -> ModelType:
         """
         Updates the given entity.
@@ -97,3 +101,42 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.delete(obj)
         db.commit()
         return obj
+
+    def remove_where(
+        self, db: Session, *criteria: Any, chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Removes all entities matching the criteria with DELETE statements, without loading them.
+        Without a chunk size everything is removed in one transaction. With a chunk size every chunk
+        is removed and committed on its own, so locks are only held shortly.
+
+        :param db: DB-Session
+        :param criteria: Filter criteria of the entities
+        :param chunk_size: Maximum number of entities removed per transaction
+        :return: The number of removed entities
+        """
+        timer = Timer()
+        timer.start()
+        if chunk_size is None:
+            removed = (
+                db.query(self.model).filter(*criteria).delete(synchronize_session=False)
+            )
+            db.commit()
+        else:
+            primary_key = inspect(self.model).primary_key
+            removed = 0
+            while True:
+                keys = db.query(*primary_key).filter(*criteria).limit(chunk_size).all()
+                if len(keys) == 0:
+                    break
+                removed += (
+                    db.query(self.model)
+                    .filter(tuple_(*primary_key).in_(keys))
+                    .delete(synchronize_session=False)
+                )
+                db.commit()
+        timer.stop()
+        logger.info(
+            f"Removed {removed} rows of {self.model.__tablename__} in {timer.total_run_time * 1000:.0f}ms"
+        )
+        return removed
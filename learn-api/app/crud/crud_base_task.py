@@ -1,13 +1,63 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from sqlalchemy.orm import Session
 
+from app.core.metadata_cache import metadata_cache
 from app.crud.base import CRUDBase
 from app.models.base_task import BaseTask
 from app.schemas.base_task import BaseTaskUpdate, BaseTaskCreate
 
+COURSE_ID_CACHE = "base_task_course_id"
+
 
 class CRUDBaseTask(CRUDBase[BaseTask, BaseTaskCreate, BaseTaskUpdate]):
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: BaseTask,
+        obj_in: Union[BaseTaskUpdate, Dict[str, Any]]
+    ) -> BaseTask:
+        """
+        Updates the given base task and removes its cached course.
+
+        :param db: DB-Session
+        :param db_obj: The base task to be updated
+        :param obj_in: Object containing the properties that should be updated
+        :return: The updated base task
+        """
+        base_task = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        metadata_cache.invalidate(COURSE_ID_CACHE, base_task.id)
+        return base_task
+
+    def remove(self, db: Session, *, model_id: int) -> BaseTask:
+        """
+        Removes the base task and its cached course.
+
+        :param db: DB-Session
+        :param model_id: Id of the base task that should be deleted
+        :return: The deleted base task
+        """
+        base_task = super().remove(db, model_id=model_id)
+        metadata_cache.invalidate(COURSE_ID_CACHE, model_id)
+        return base_task
+
+    def get_course_id(self, db: Session, *, base_task_id: int) -> Optional[int]:
+        """
+        Returns the id of the course of the base task, the id is cached for the access checks.
+
+        :param db: DB-Session
+        :param base_task_id: Id of the base task
+        :return: Id of the course or None if the base task does not exist
+        """
+        return metadata_cache.get(
+            COURSE_ID_CACHE,
+            base_task_id,
+            lambda: db.query(self.model.course_id)
+            .filter(self.model.id == base_task_id)
+            .scalar(),
+        )
+
     def get_multi_by_task_group(
         self, db: Session, *, task_group_id: int
     ) -> List[BaseTask]:
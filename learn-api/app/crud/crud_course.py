@@ -1,14 +1,19 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
+from app.core.metadata_cache import metadata_cache
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
 from app.models.base_task import BaseTask
 from app.models.course import Course
 from app.models.course_members import CourseMembers
 from app.models.task import Task
+from app.models.task_group import TaskGroup
+from app.models.user import User
 from app.schemas.course import CourseAdmin, CourseCreate, CourseDetail, CourseUpdate
 
 
@@ -19,7 +24,51 @@ def set_member_status(*, courses: List[Course], user_id: str) -> None:
                 course.is_member = True
 
 
+OWNER_ID_CACHE = "course_owner_id"
+MEMBER_CACHE = "course_member"
+
+
 class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Course,
+        obj_in: Union[CourseUpdate, Dict[str, Any]],
+    ) -> Course:
+        """
+        Updates the given course and removes its cached owner.
+
+        :param db: DB-Session
+        :param db_obj: The course to be updated
+        :param obj_in: Object containing the properties that should be updated
+        :return: The updated course
+        """
+        course = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        metadata_cache.invalidate(OWNER_ID_CACHE, course.id)
+        return course
+
+    def remove(self, db: Session, *, model_id: int) -> Course:
+        """
+        Removes the course together with its cached owner and memberships.
+
+        :param db: DB-Session
+        :param model_id: Id of the course that should be deleted
+        :return: The deleted course
+        """
+        member_ids = [
+            user_id
+            for user_id, in db.query(CourseMembers.user_id).filter(
+                CourseMembers.course_id == model_id
+            )
+        ]
+        course = super().remove(db, model_id=model_id)
+        metadata_cache.invalidate(OWNER_ID_CACHE, model_id)
+        metadata_cache.invalidate(
+            MEMBER_CACHE, *[f"{model_id}:{user_id}" for user_id in member_ids]
+        )
+        return course
+
     def create_with_owner(
         self, db: Session, *, obj_in: CourseCreate, owner_id: int
     ) -> Course:
@@ -69,6 +118,7 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        metadata_cache.invalidate(MEMBER_CACHE, f"{course.id}:{user_id}")
         return course
 
     def leave_course(self, db: Session, *, course_id: int, user_id: str) -> None:
@@ -80,13 +130,14 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
         :param user_id: Id of the user
         """
         membership = (
-            db.query(self.model)
-            .filter(self.model.course_id == course_id)
-            .filter(self.model.user_id == user_id)
+            db.query(CourseMembers)
+            .filter(CourseMembers.course_id == course_id)
+            .filter(CourseMembers.user_id == user_id)
             .first()
         )
         db.delete(membership)
         db.commit()
+        metadata_cache.invalidate(MEMBER_CACHE, f"{course_id}:{user_id}")
 
     def get_multi_by_owner(self, db: Session, *, owner_id: int) -> List[CourseAdmin]:
         """
@@ -111,7 +162,13 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
         :param user_id: id of the user
         :return: All Courses where user is member
         """
-        return db.query(self.model).join(self.model.members).filter_by(id=user_id).all()
+        return (
+            db.query(self.model)
+            .join(self.model.members)
+            .filter_by(id=user_id)
+            .options(selectinload(self.model.owner))
+            .all()
+        )
 
     def get_by_short_name(self, db: Session, *, short_name: str) -> CourseDetail:
         """
@@ -122,7 +179,12 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
         :return: Course to the shortname
         """
 
-        return db.query(self.model).filter(Course.short_name == short_name).first()
+        return (
+            db.query(self.model)
+            .filter(Course.short_name == short_name)
+            .options(selectinload(Course.task_groups).selectinload(TaskGroup.tasks))
+            .first()
+        )
 
     def get_by_name(self, db: Session, *, name: str) -> Course:
         """
@@ -162,22 +224,47 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
         :param user_id: Id of the user
         :return: Not Member and Owner
         """
-        course = self.get(db, id=course_id)
-        is_member = False
-        for member in course.members:
-            if member.id == user_id:
-                is_member = True
-
-        is_owner = course.owner.id == user_id
+        is_member = self.is_member(db, course_id=course_id, user_id=user_id)
+        is_owner = self.get_owner_id(db, course_id=course_id) == user_id
         return is_member is False and is_owner is False
 
     def user_is_course_owner(self, db, *, course_id: int, user_id: str) -> bool:
-        course = self.get(db, id=course_id)
+        return self.get_owner_id(db, course_id=course_id) == user_id
 
-        # if not course:
-        #     return False
+    def get_owner_id(self, db: Session, *, course_id: int) -> Optional[str]:
+        """
+        Returns the id of the owner of the course, the id is cached for the access checks.
 
-        return course.owner_id == user_id
+        :param db: DB-Session
+        :param course_id: Id of the Course
+        :return: Id of the owner or None if the course does not exist
+        """
+        return metadata_cache.get(
+            OWNER_ID_CACHE,
+            course_id,
+            lambda: db.query(self.model.owner_id)
+            .filter(self.model.id == course_id)
+            .scalar(),
+        )
+
+    def is_member(self, db: Session, *, course_id: int, user_id: str) -> bool:
+        """
+        Checks if the user is member of the course, the membership is cached for the access checks.
+
+        :param db: DB-Session
+        :param course_id: Id of the Course
+        :param user_id: Id of the user
+        :return: If the user is member
+        """
+        return metadata_cache.get(
+            MEMBER_CACHE,
+            f"{course_id}:{user_id}",
+            lambda: db.query(CourseMembers.user_id)
+            .filter(CourseMembers.course_id == course_id)
+            .filter(CourseMembers.user_id == user_id)
+            .first()
+            is not None,
+        )
 
     def get_members(self, db: Session, *, course_id: int) -> List:
         return self.get(db, id=course_id).members
@@ -193,5 +280,80 @@ class CRUDCourse(CRUDBase[Course, CourseCreate, CourseUpdate]):
         )
         return result
 
+    def get_task_counts(self, db: Session, *, course_ids: List[int]) -> Dict[int, int]:
+        """
+        Returns the number of tasks of every given course with a single query.
+
+        :param db: DB-Session
+        :param course_ids: Ids of the courses
+        :return: Number of tasks by course id, courses without tasks are missing
+        """
+        return dict(
+            db.query(BaseTask.course_id, func.count(Task.id))
+            .join(Task, Task.base_task_id == BaseTask.id)
+            .filter(BaseTask.course_id.in_(course_ids))
+            .group_by(BaseTask.course_id)
+            .all()
+        )
+
+    def get_task_counts_to_base_tasks(
+        self, db: Session, *, course_id: int
+    ) -> Dict[int, int]:
+        """
+        Returns the number of tasks of every base task of the course with a single query.
+
+        :param db: DB-Session
+        :param course_id: Id of the course
+        :return: Number of tasks by base task id, base tasks without tasks are missing
+        """
+        return dict(
+            db.query(BaseTask.id, func.count(Task.id))
+            .join(Task, Task.base_task_id == BaseTask.id)
+            .filter(BaseTask.course_id == course_id)
+            .group_by(BaseTask.id)
+            .all()
+        )
+
 
 crud_course = CRUDCourse(Course)
+
+
+class AsyncCRUDCourse(AsyncCRUDBase[Course]):
+    async def get_multi_by_user(
+        self, db: AsyncSession, *, user_id: str
+    ) -> List[Course]:
+        """
+        Returns all Courses where the user is a member, with their owners.
+
+        :param db: Async DB-Session
+        :param user_id: id of the user
+        :return: All Courses where user is member
+        """
+        result = await db.execute(
+            select(self.model)
+            .join(self.model.members)
+            .where(User.id == user_id)
+            .options(selectinload(self.model.owner))
+        )
+        return result.scalars().all()
+
+    async def get_task_counts(
+        self, db: AsyncSession, *, course_ids: List[int]
+    ) -> Dict[int, int]:
+        """
+        Returns the number of tasks of every given course with a single query.
+
+        :param db: Async DB-Session
+        :param course_ids: Ids of the courses
+        :return: Number of tasks by course id, courses without tasks are missing
+        """
+        result = await db.execute(
+            select(BaseTask.course_id, func.count(Task.id))
+            .join(Task, Task.base_task_id == BaseTask.id)
+            .where(BaseTask.course_id.in_(course_ids))
+            .group_by(BaseTask.course_id)
+        )
+        return dict(result.all())
+
+
+async_crud_course = AsyncCRUDCourse(Course)
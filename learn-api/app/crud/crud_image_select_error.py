@@ -0,0 +1,180 @@
+from collections import Counter
+from typing import Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.crud.crud_task_statistic import crud_task_statistic
+from app.models.image_select_error import ImageSelectError
+from app.models.task import Task
+from app.models.task_statistic import TaskStatistic
+from app.schemas.statistic import ImageSelectErrorCount
+from app.schemas.task import TaskType
+
+
+def count_selected_images(solutions: Iterable[Optional[List[str]]]) -> Counter:
+    """
+    Counts how often every image was selected.
+    All selections are counted, so the counters stay valid if the task solution changes.
+
+    :param solutions: The selected images of every counted solution
+    :return: The amount of selections per image
+    """
+    selected_images = Counter()
+    for solution_data in solutions:
+        selected_images.update(solution_data or [])
+    return selected_images
+
+
+class CRUDImageSelectError(
+    CRUDBase[ImageSelectError, ImageSelectErrorCount, ImageSelectErrorCount]
+):
+    def get_to_base_task(self, db: Session, *, base_task_id: int) -> List[Any]:
+        """
+        Returns the counters of the wrongly selected images of all image select tasks
+        of the base task.
+        Images of the current task solution are left out, so changed solutions are respected.
+
+        :param db: DB-Session
+        :param base_task_id: Id of the base task
+        :return: The image id, the question of the task and the amount of every counter
+        """
+        tasks = {
+            task_id: (task_question, set(solution or []))
+            for task_id, task_question, solution in db.query(
+                Task.id, Task.task_question, Task.solution
+            )
+            .filter(Task.base_task_id == base_task_id)
+            .filter(Task.task_type == TaskType.IMAGE_SELECT)
+        }
+        counters = db.query(
+            self.model.task_id, self.model.task_image_id, self.model.amount
+        ).filter(self.model.base_task_id == base_task_id)
+        return [
+            (task_image_id, tasks[task_id][0], amount)
+            for task_id, task_image_id, amount in counters
+            if task_id in tasks and task_image_id not in tasks[task_id][1]
+        ]
+
+    def add_first_attempts(
+        self,
+        db: Session,
+        *,
+        task: Task,
+        solutions: List[Tuple[str, Optional[List[str]]]],
+        commit: bool = True,
+    ) -> None:
+        """
+        Adds the selected images of solutions that are the first attempt of their user to the task.
+        Has to be called before the task statistics of the solutions are created.
+
+        :param db: DB-Session
+        :param task: The solved task
+        :param solutions: Id of the user and the selected images of every solved solution
+        :param commit: If the changes should be committed
+        """
+        if task.task_type != TaskType.IMAGE_SELECT or len(solutions) == 0:
+            return
+
+        solved_before = {
+            user_id
+            for user_id, in db.query(TaskStatistic.user_id)
+            .filter(TaskStatistic.task_id == task.id)
+            .filter(TaskStatistic.user_id.in_([user_id for user_id, _ in solutions]))
+            .distinct()
+        }
+        selected_images = count_selected_images(
+            [
+                solution_data
+                for user_id, solution_data in solutions
+                if user_id not in solved_before
+            ]
+        )
+        self.add_counts(db, task=task, selected_images=selected_images)
+        if commit:
+            db.commit()
+
+    def add_counts(self, db: Session, *, task: Task, selected_images: Counter) -> None:
+        """
+        Increases the counters of the task with a single statement
+
+        :param db: DB-Session
+        :param task: The image select task
+        :param selected_images: The amount of selections per image
+        """
+        if len(selected_images) == 0:
+            return
+        statement = mysql_insert(self.model).values(
+            [
+                {
+                    "task_id": task.id,
+                    "task_image_id": task_image_id,
+                    "base_task_id": task.base_task_id,
+                    "amount": amount,
+                }
+                for task_image_id, amount in selected_images.items()
+            ]
+        )
+        statement = statement.on_duplicate_key_update(
+            amount=self.model.amount + statement.inserted.amount
+        )
+        db.execute(statement)
+
+    def rebuild(self, db: Session, *, base_task_id: int, commit: bool = True) -> None:
+        """
+        Counts the selected images again from the first task statistic of every user to every task.
+        Used to fill the counters initially and after task statistics were changed directly.
+
+        :param db: DB-Session
+        :param base_task_id: Id of the base task
+        :param commit: If the changes should be committed
+        """
+        db.execute(delete(self.model).where(self.model.base_task_id == base_task_id))
+
+        tasks = (
+            db.query(Task)
+            .filter(Task.base_task_id == base_task_id)
+            .filter(Task.task_type == TaskType.IMAGE_SELECT)
+            .all()
+        )
+        if len(tasks) > 0:
+            (
+                task_statistics,
+                _,
+            ) = crud_task_statistic.get_oldest_task_statistics_to_base_task_id(
+                db, base_task_id=base_task_id
+            )
+            for task in tasks:
+                self.add_counts(
+                    db,
+                    task=task,
+                    selected_images=count_selected_images(
+                        [
+                            task_statistic.solution_data
+                            for task_statistic in task_statistics
+                            if task_statistic.task_id == task.id
+                        ]
+                    ),
+                )
+        if commit:
+            db.commit()
+
+    def get_base_task_ids(self, db: Session) -> List[int]:
+        """
+        Returns all base tasks with image select tasks
+
+        :param db: DB-Session
+        :return: Ids of the base tasks
+        """
+        return [
+            base_task_id
+            for base_task_id, in db.query(func.distinct(Task.base_task_id))
+            .filter(Task.task_type == TaskType.IMAGE_SELECT)
+            .filter(Task.base_task_id.isnot(None))
+            .all()
+        ]
+
+
+crud_image_select_error = CRUDImageSelectError(ImageSelectError)
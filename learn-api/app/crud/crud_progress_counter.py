@@ -0,0 +1,267 @@
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, case, delete, func, insert, literal, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud.async_base import AsyncCRUDBase
+from app.crud.base import CRUDBase
+from app.models.progress_counter import ProgressCounter
+from app.models.user_solution import UserSolution
+from app.schemas.user_solution import ProgressScope, SolutionProgress, UserProgress
+
+# Columns of a user solution the counters depend on
+COUNTED_COLUMNS = [
+    "user_id",
+    "course_id",
+    "task_group_id",
+    "base_task_id",
+    "percentage_solved",
+    "task_result",
+]
+
+SCOPE_COLUMNS = {
+    ProgressScope.COURSE: UserSolution.course_id,
+    ProgressScope.TASK_GROUP: UserSolution.task_group_id,
+    ProgressScope.BASE_TASK: UserSolution.base_task_id,
+}
+
+
+def get_solution_progress(values: Dict[str, Any]) -> SolutionProgress:
+    """
+    Returns what a single user solution adds to the counters.
+    Has to count like the aggregation in CRUDProgressCounter.rebuild.
+
+    :param values: The counted columns of the user solution
+    :return: The solved percentage and if the solution is correct or wrong
+    """
+    percentage_solved = round(float(values.get("percentage_solved") or 0.0), 2)
+    task_result = jsonable_encoder(values.get("task_result"))
+    # Same as JSON_LENGTH, a missing task result has no length
+    if task_result is None:
+        result_length = None
+    elif isinstance(task_result, (list, dict)):
+        result_length = len(task_result)
+    else:
+        result_length = 1
+    correct = percentage_solved == 1.0
+    wrong = not correct and result_length is not None and result_length != 1
+    return SolutionProgress(
+        percentage_solved=percentage_solved,
+        correct_tasks=int(correct),
+        wrong_tasks=int(wrong),
+    )
+
+
+def get_user_progress(counters: List[ProgressCounter]) -> UserProgress:
+    """
+    Groups the counters of a user by their scope.
+
+    :param counters: The counters of the user
+    :return: The progress per course, task group and base task
+    """
+    progress = UserProgress()
+    progress_by_scope = {
+        ProgressScope.COURSE: progress.courses,
+        ProgressScope.TASK_GROUP: progress.task_groups,
+        ProgressScope.BASE_TASK: progress.base_tasks,
+    }
+    for counter in counters:
+        progress_by_scope[ProgressScope(counter.scope)][counter.scope_id] = (
+            SolutionProgress(
+                percentage_solved=float(counter.percentage_solved),
+                correct_tasks=counter.correct_tasks,
+                wrong_tasks=counter.wrong_tasks,
+            )
+        )
+    return progress
+
+
+class CRUDProgressCounter(
+    CRUDBase[ProgressCounter, SolutionProgress, SolutionProgress]
+):
+    def get_progress_to_courses(
+        self, db: Session, *, user_id: str, course_ids: List[int]
+    ) -> UserProgress:
+        """
+        Returns the solved percentage and the amount of correct and wrong solutions of the user
+        to the given courses and to all of their task groups and base tasks.
+
+        :param db: DB-Session
+        :param user_id: id of the user
+        :param course_ids: ids of the courses
+        :return: The progress per course, task group and base task
+        """
+        if len(course_ids) == 0:
+            return UserProgress()
+
+        return get_user_progress(
+            db.query(self.model)
+            .filter(self.model.user_id == user_id)
+            .filter(self.model.course_id.in_(course_ids))
+            .all()
+        )
+
+    def update_counters(
+        self,
+        db: Session,
+        *,
+        removed: List[Dict[str, Any]],
+        added: List[Dict[str, Any]],
+        commit: bool = True,
+    ) -> None:
+        """
+        Changes the counters of the users for removed and added user solutions with a single statement.
+        An updated user solution is removed with its old values and added with its new values.
+
+        :param db: DB-Session
+        :param removed: The counted columns of the removed user solutions
+        :param added: The counted columns of the added user solutions
+        :param commit: If the changes should be committed
+        """
+        changes: Dict[tuple, Dict[str, Any]] = {}
+        for sign, solutions in [(-1, removed), (1, added)]:
+            for values in solutions:
+                # The counters are grouped by the course, older solutions may have none
+                if values.get("course_id") is None:
+                    continue
+                progress = get_solution_progress(values)
+                for scope, column in SCOPE_COLUMNS.items():
+                    scope_id = values.get(column.key)
+                    if scope_id is None:
+                        continue
+                    change = changes.setdefault(
+                        (values["user_id"], scope, scope_id),
+                        {
+                            "user_id": values["user_id"],
+                            "scope": int(scope),
+                            "scope_id": scope_id,
+                            "course_id": values["course_id"],
+                            "percentage_solved": 0.0,
+                            "correct_tasks": 0,
+                            "wrong_tasks": 0,
+                        },
+                    )
+                    change["percentage_solved"] = round(
+                        change["percentage_solved"] + sign * progress.percentage_solved,
+                        2,
+                    )
+                    change["correct_tasks"] += sign * progress.correct_tasks
+                    change["wrong_tasks"] += sign * progress.wrong_tasks
+
+        # Solving again mostly leaves the counters as they are
+        rows = [
+            change
+            for change in changes.values()
+            if change["percentage_solved"] != 0
+            or change["correct_tasks"] != 0
+            or change["wrong_tasks"] != 0
+        ]
+        if len(rows) > 0:
+            statement = mysql_insert(self.model).values(rows)
+            statement = statement.on_duplicate_key_update(
+                percentage_solved=self.model.percentage_solved
+                + statement.inserted.percentage_solved,
+                correct_tasks=self.model.correct_tasks
+                + statement.inserted.correct_tasks,
+                wrong_tasks=self.model.wrong_tasks + statement.inserted.wrong_tasks,
+            )
+            db.execute(statement)
+        if commit:
+            db.commit()
+
+    def rebuild(
+        self,
+        db: Session,
+        *,
+        course_id: Optional[int] = None,
+        user_id: Optional[str] = None,
+        commit: bool = True,
+    ) -> None:
+        """
+        Calculates the counters again from the user solutions.
+        Used after user solutions were deleted in bulk and to fill the counters initially.
+
+        :param db: DB-Session
+        :param course_id: Only rebuilds the counters to the course
+        :param user_id: Only rebuilds the counters of the user
+        :param commit: If the changes should be committed
+        """
+        criteria = []
+        solution_criteria = [UserSolution.course_id.isnot(None)]
+        if course_id is not None:
+            criteria.append(self.model.course_id == course_id)
+            solution_criteria.append(UserSolution.course_id == course_id)
+        if user_id is not None:
+            criteria.append(self.model.user_id == user_id)
+            solution_criteria.append(UserSolution.user_id == user_id)
+
+        db.execute(delete(self.model).where(*criteria))
+
+        correct = UserSolution.percentage_solved == 1.00
+        wrong = and_(
+            func.JSON_LENGTH(UserSolution.task_result) != 1,
+            UserSolution.percentage_solved != 1.00,
+        )
+        for scope, column in SCOPE_COLUMNS.items():
+            counters = (
+                select(
+                    UserSolution.user_id,
+                    literal(int(scope)),
+                    column,
+                    UserSolution.course_id,
+                    func.coalesce(func.sum(UserSolution.percentage_solved), 0),
+                    func.sum(case((correct, 1), else_=0)),
+                    func.sum(case((wrong, 1), else_=0)),
+                )
+                .where(column.isnot(None), *solution_criteria)
+                .group_by(UserSolution.user_id, column, UserSolution.course_id)
+            )
+            db.execute(
+                insert(self.model).from_select(
+                    [
+                        "user_id",
+                        "scope",
+                        "scope_id",
+                        "course_id",
+                        "percentage_solved",
+                        "correct_tasks",
+                        "wrong_tasks",
+                    ],
+                    counters,
+                )
+            )
+        if commit:
+            db.commit()
+
+
+crud_progress_counter = CRUDProgressCounter(ProgressCounter)
+
+
+class AsyncCRUDProgressCounter(AsyncCRUDBase[ProgressCounter]):
+    async def get_progress_to_courses(
+        self, db: AsyncSession, *, user_id: str, course_ids: List[int]
+    ) -> UserProgress:
+        """
+        Returns the solved percentage and the amount of correct and wrong solutions of the user
+        to the given courses and to all of their task groups and base tasks.
+
+        :param db: Async DB-Session
+        :param user_id: id of the user
+        :param course_ids: ids of the courses
+        :return: The progress per course, task group and base task
+        """
+        if len(course_ids) == 0:
+            return UserProgress()
+
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.user_id == user_id)
+            .where(self.model.course_id.in_(course_ids))
+        )
+        return get_user_progress(result.scalars().all())
+
+
+async_crud_progress_counter = AsyncCRUDProgressCounter(ProgressCounter)
@@ -1,15 +1,307 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import JSON, Column, cast, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
+from app.core.annotation_type import get_annotation_column
+from app.core.metadata_cache import metadata_cache
+from app.core.solver.solution_cache import solution_cache
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
+from app.models.base_task import BaseTask
 from app.models.new_task import NewTask
 from app.models.task import Task
+from app.schemas.annotation_operation import (
+    AnnotationOperation,
+    AnnotationOperationResult,
+    AnnotationOperationType,
+)
 from app.schemas.questionnaire import Questionnaire
 from app.schemas.task import TaskCreate, TaskUpdate
 
+# JSON arrays of the task which contain annotations
+ANNOTATION_COLUMNS = ["solution", "task_data", "info_annotations"]
+
+# Columns the compiled solution depends on, changing one of them raises the solution revision
+SOLUTION_REVISION_COLUMNS = ["solution", "annotation_type", "task_type"]
+
+BASE_TASK_ID_CACHE = "task_base_task_id"
+
+
+def get_annotation_path(array: Column, annotation_id: str) -> ColumnElement:
+    """
+    Returns an expression for the path of the annotation with the given id inside a JSON array,
+    e.g. '$[3]', or NULL if the array has no such annotation.
+
+    :param array: Column with the JSON array
+    :param annotation_id: Id of the annotation
+    :return: The path expression
+    """
+    # JSON_SEARCH compares like LIKE, so the wildcards have to be escaped
+    pattern = (
+        annotation_id.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+    # The found path is the one of the id, e.g. '$[3].id'
+    id_path = func.json_unquote(
+        func.json_search(array, "one", pattern, None, "$[*].id")
+    )
+    return func.substring_index(id_path, ".", 1)
+
 
 class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
+    def update(
+        self, db: Session, *, db_obj: Task, obj_in: Union[TaskUpdate, Dict[str, Any]]
+    ) -> Task:
+        """
+        Updates the given task.
+        Raises the solution revision if the solution, the annotation type or the task type changes,
+        so cached solutions and stored annotation results of all processes are compiled again.
+
+        :param db: DB-Session
+        :param db_obj: The task to be updated
+        :param obj_in: Object containing the properties that should be updated
+        :return: The updated task
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if any(column in update_data for column in SOLUTION_REVISION_COLUMNS):
+            update_data["solution_revision"] = (db_obj.solution_revision or 0) + 1
+        task = super().update(db, db_obj=db_obj, obj_in=update_data)
+        solution_cache.invalidate(task.id)
+        metadata_cache.invalidate(BASE_TASK_ID_CACHE, task.id)
+        return task
+
+    def remove(self, db: Session, *, model_id: int) -> Task:
+        """
+        Removes the task and its cached solution and metadata.
+
+        :param db: DB-Session
+        :param model_id: Id of the task that should be deleted
+        :return: The deleted task
+        """
+        task = super().remove(db, model_id=model_id)
+        solution_cache.invalidate(model_id)
+        metadata_cache.invalidate(BASE_TASK_ID_CACHE, model_id)
+        return task
+
+    def get_base_task_id(self, db: Session, *, task_id: int) -> Optional[int]:
+        """
+        Returns the id of the base task of the task without loading the annotations of the task.
+        The id is cached, as it is needed for the access check of most task endpoints.
+
+        :param db: DB-Session
+        :param task_id: Id of the task
+        :return: Id of the base task or None if the task does not exist
+        """
+        return metadata_cache.get(
+            BASE_TASK_ID_CACHE,
+            task_id,
+            lambda: db.query(self.model.base_task_id)
+            .filter(self.model.id == task_id)
+            .scalar(),
+        )
+
+    def append_annotation(
+        self,
+        db: Session,
+        *,
+        task_id: int,
+        column: str,
+        annotation: Dict[str, Any],
+        commit: bool = True
+    ) -> None:
+        """
+        Appends an annotation to a JSON array of the task inside the database,
+        so the other annotations do not have to be loaded and written again.
+
+        :param db: DB-Session
+        :param task_id: Id of the task
+        :param column: Name of the JSON array, one of ANNOTATION_COLUMNS
+        :param annotation: The new annotation
+        :param commit: If the change should be committed
+        """
+        array = getattr(self.model, column)
+        value = cast(annotation, JSON)
+        self.__update_annotations(
+            db,
+            task_id=task_id,
+            values=[
+                (
+                    array,
+                    func.if_(
+                        func.coalesce(func.json_type(array), "NULL") == "ARRAY",
+                        func.json_array_append(array, "$", value),
+                        func.json_array(value),
+                    ),
+                )
+            ],
+            solution_changed=column == "solution",
+        )
+        if commit:
+            self.__commit_annotations(db, task_id=task_id)
+
+    def replace_annotation(
+        self,
+        db: Session,
+        *,
+        task_id: int,
+        column: str,
+        annotation_id: str,
+        annotation: Dict[str, Any],
+        commit: bool = True
+    ) -> bool:
+        """
+        Replaces the annotation with the given id in a JSON array of the task inside the database.
+
+        :param db: DB-Session
+        :param task_id: Id of the task
+        :param column: Name of the JSON array, one of ANNOTATION_COLUMNS
+        :param annotation_id: Id of the annotation
+        :param annotation: The new annotation
+        :param commit: If the change should be committed
+        :return: If an annotation with the id was found
+        """
+        array = getattr(self.model, column)
+        path = get_annotation_path(array, annotation_id)
+        updated = self.__update_annotations(
+            db,
+            task_id=task_id,
+            values=[(array, func.json_replace(array, path, cast(annotation, JSON)))],
+            solution_changed=column == "solution",
+            condition=path.isnot(None),
+        )
+        if commit:
+            self.__commit_annotations(db, task_id=task_id)
+        return updated
+
+    def remove_annotation(
+        self, db: Session, *, task_id: int, annotation_id: str, commit: bool = True
+    ) -> bool:
+        """
+        Removes all annotations with the given id from all JSON arrays of the task inside the database.
+
+        :param db: DB-Session
+        :param task_id: Id of the task
+        :param annotation_id: Id of the annotation
+        :param commit: If the change should be committed
+        :return: If an annotation with the id was found
+        """
+        values = []
+        paths = []
+        for column in ANNOTATION_COLUMNS:
+            array = getattr(self.model, column)
+            path = get_annotation_path(array, annotation_id)
+            paths.append(path)
+            if column == "solution":
+                values.append(
+                    (
+                        self.model.solution_revision,
+                        self.model.solution_revision + func.if_(path.is_(None), 0, 1),
+                    )
+                )
+            values.append(
+                (array, func.if_(path.is_(None), array, func.json_remove(array, path)))
+            )
+        # JSON_SEARCH only finds the first annotation with the id,
+        # so the statement is repeated until no array contains the id anymore
+        removed = False
+        while self.__update_annotations(
+            db,
+            task_id=task_id,
+            values=values,
+            condition=or_(*[path.isnot(None) for path in paths]),
+        ):
+            removed = True
+        if commit:
+            self.__commit_annotations(db, task_id=task_id)
+        return removed
+
+    def apply_annotation_operations(
+        self, db: Session, *, task_id: int, operations: List[AnnotationOperation]
+    ) -> List[AnnotationOperationResult]:
+        """
+        Adds, updates and removes annotations of the task in the given order within a single transaction.
+
+        :param db: DB-Session
+        :param task_id: Id of the task
+        :param operations: The operations that should be applied
+        :return: The result of every operation
+        """
+        results = []
+        for operation in operations:
+            found = True
+            if operation.operation == AnnotationOperationType.ADD:
+                self.append_annotation(
+                    db,
+                    task_id=task_id,
+                    column=get_annotation_column(operation.annotation.type),
+                    annotation=jsonable_encoder(
+                        operation.annotation, exclude_unset=True
+                    ),
+                    commit=False,
+                )
+            elif operation.operation == AnnotationOperationType.UPDATE:
+                found = self.replace_annotation(
+                    db,
+                    task_id=task_id,
+                    column=get_annotation_column(operation.annotation.type),
+                    annotation_id=operation.annotation_id,
+                    annotation=jsonable_encoder(
+                        operation.annotation, exclude_unset=True
+                    ),
+                    commit=False,
+                )
+            else:
+                found = self.remove_annotation(
+                    db,
+                    task_id=task_id,
+                    annotation_id=operation.annotation_id,
+                    commit=False,
+                )
+            results.append(
+                AnnotationOperationResult(
+                    annotation_id=operation.annotation_id,
+                    status_code=200 if found else 404,
+                )
+            )
+        self.__commit_annotations(db, task_id=task_id)
+        return results
+
+    def __update_annotations(
+        self,
+        db: Session,
+        *,
+        task_id: int,
+        values: List[Tuple[Column, Any]],
+        solution_changed: bool = False,
+        condition: ColumnElement = None
+    ) -> bool:
+        if solution_changed:
+            values = [
+                (self.model.solution_revision, self.model.solution_revision + 1)
+            ] + values
+        statement = update(self.model).where(self.model.id == task_id)
+        if condition is not None:
+            statement = statement.where(condition)
+        # MySQL evaluates the assignments from left to right and later ones see the new values,
+        # so the solution revision has to be computed before the solution is changed
+        result = db.execute(
+            statement.ordered_values(*values).execution_options(
+                synchronize_session=False
+            )
+        )
+        return result.rowcount > 0
+
+    @staticmethod
+    def __commit_annotations(db: Session, *, task_id: int) -> None:
+        db.commit()
+        solution_cache.invalidate(task_id)
+
     def has_new_task(self, db: Session, user_id: str, base_task_id: int) -> bool:
         """
         Check if the base task has new tasks for the given user
@@ -46,6 +338,26 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         )
         return True if result is not None else False
 
+    def get_base_tasks_with_new_tasks(
+        self, db: Session, *, user_id: str, course_ids: List[int]
+    ) -> List[BaseTask]:
+        """
+        Returns all base tasks of the given courses which have new tasks for the user
+
+        :param db: DB-Session
+        :param user_id: ID of the user
+        :param course_ids: IDs of the courses
+        :return: The base tasks with new tasks
+        """
+        return (
+            db.query(BaseTask)
+            .join(NewTask, NewTask.base_task_id == BaseTask.id)
+            .filter(NewTask.user_id == user_id)
+            .filter(BaseTask.course_id.in_(course_ids))
+            .distinct()
+            .all()
+        )
+
     def create_new_task(self, db: Session, user_id: str, base_task_id: int) -> NewTask:
         """
         Creates a new Entity which indicates that the given user has new tasks
@@ -98,3 +410,28 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
 
 
 crud_task = CRUDTask(Task)
+
+
+class AsyncCRUDTask(AsyncCRUDBase[Task]):
+    async def get_base_tasks_with_new_tasks(
+        self, db: AsyncSession, *, user_id: str, course_ids: List[int]
+    ) -> List[BaseTask]:
+        """
+        Returns all base tasks of the given courses which have new tasks for the user
+
+        :param db: Async DB-Session
+        :param user_id: ID of the user
+        :param course_ids: IDs of the courses
+        :return: The base tasks with new tasks
+        """
+        result = await db.execute(
+            select(BaseTask)
+            .join(NewTask, NewTask.base_task_id == BaseTask.id)
+            .where(NewTask.user_id == user_id)
+            .where(BaseTask.course_id.in_(course_ids))
+            .distinct()
+        )
+        return result.scalars().all()
+
+
+async_crud_task = AsyncCRUDTask(Task)
@@ -1,8 +1,10 @@
 from typing import List
 
-from sqlalchemy import asc
-from sqlalchemy.orm import Session
+from sqlalchemy import asc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
 from app.models.task_hint import TaskHint
 from app.schemas.task_hint import TaskHintCreate, TaskHintUpdate
@@ -34,3 +36,28 @@ class CRUDTaskHint(CRUDBase[TaskHint, TaskHintCreate, TaskHintUpdate]):
 
 
 crud_task_hint = CRUDTaskHint(TaskHint)
+
+
+class AsyncCRUDTaskHint(AsyncCRUDBase[TaskHint]):
+    async def get_hints_by_task(
+        self, db: AsyncSession, task_id: int, mistakes: int
+    ) -> List[TaskHint]:
+        """
+        Returns all hints that should be shown for the given mistake amount, with their images
+
+        :param db: Async DB-Session
+        :param task_id: Id of the task
+        :param mistakes: Amount of mistakes
+        :return: All found hints
+        """
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.task_id == task_id)
+            .where(self.model.needed_mistakes <= mistakes)
+            .order_by(asc(self.model.needed_mistakes))
+            .options(selectinload(self.model.images))
+        )
+        return result.scalars().all()
+
+
+async_crud_task_hint = AsyncCRUDTaskHint(TaskHint)
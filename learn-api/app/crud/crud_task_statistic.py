@@ -1,10 +1,12 @@
 import json
-from typing import List
+from typing import Any, List, Optional
 
-from sqlalchemy import text
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
+from app.models.base_task import BaseTask
 from app.models.task_statistic import TaskStatistic
 from app.schemas.task_statistic import (
     TaskStatisticCreate,
@@ -26,15 +28,13 @@ class CRUDTaskStatistic(
         :param base_task_id: Id of the base task
         :return: All found task statistics and task ids
         """
-        sql = text(
-            """SELECT ts.* FROM taskstatistic as ts
+        sql = text("""SELECT ts.* FROM taskstatistic as ts
          join (SELECT user_id, task_id, min(solved_date) as smallest_date
                FROM taskstatistic
                where base_task_id = :base_task_id
                GROUP BY task_id, user_id) as smallest
               on ts.user_id = smallest.user_id and ts.task_id = smallest.task_id and
-                 ts.solved_date = smallest.smallest_date;"""
-        )
+                 ts.solved_date = smallest.smallest_date;""")
         result = db.execute(sql, {"base_task_id": base_task_id}).fetchall()
         task_statistics = []
 
@@ -56,39 +56,119 @@ class CRUDTaskStatistic(
             task_ids.add(row[2])
         return task_statistics, task_ids
 
+    def get_multi_after_id(self, db: Session, *, last_id: int, limit: int) -> List[Any]:
+        """
+        Returns the next task statistics after the given id together with the course of their base task.
+        Used to export the statistics incrementally in the order they were created.
+
+        :param db: DB-Session
+        :param last_id: Id of the last statistic that was already read
+        :param limit: Maximum number of returned statistics
+        :return: The columns of the statistics and the course id, ordered by id
+        """
+        return (
+            db.query(
+                self.model.id,
+                self.model.user_id,
+                self.model.task_id,
+                self.model.base_task_id,
+                BaseTask.course_id,
+                self.model.solved_date,
+                self.model.percentage_solved,
+                self.model.solution_data,
+                self.model.task_result,
+            )
+            .join(BaseTask, BaseTask.id == self.model.base_task_id)
+            .filter(self.model.id > last_id)
+            .order_by(self.model.id)
+            .limit(limit)
+            .all()
+        )
+
+    def create_multi(self, db: Session, *, objs_in: List[TaskStatisticCreate]) -> None:
+        """
+        Inserts multiple task statistics with a single statement
+
+        :param db: DB-Session
+        :param objs_in: The task statistics that should be created
+        """
+        if len(objs_in) == 0:
+            return
+        db.bulk_insert_mappings(
+            self.model,
+            [
+                {
+                    **jsonable_encoder(obj_in, exclude={"solved_date"}),
+                    "solved_date": obj_in.solved_date,
+                }
+                for obj_in in objs_in
+            ],
+        )
+        db.commit()
+
     def remove_all_by_task_id(
-        self, db: Session, *, task_id: int
-    ) -> List[TaskStatistic]:
+        self, db: Session, *, task_id: int, chunk_size: Optional[int] = None
+    ) -> int:
         """
         Removes all task statistic to the given task
 
         :param db: DB-Session
         :param task_id: Id of the task
-        :return: The deleted task statistics
+        :param chunk_size: Maximum number of task statistics removed per transaction
+        :return: The number of deleted task statistics
         """
-        db_objs = db.query(self.model).filter(self.model.task_id == task_id).all()
-        for obj in db_objs:
-            db.delete(obj)
-            db.commit()
-        return db_objs
+        return self.remove_where(
+            db, self.model.task_id == task_id, chunk_size=chunk_size
+        )
 
     def remove_all_by_base_task_id(
-        self, db: Session, *, base_task_id: int
-    ) -> List[TaskStatistic]:
+        self, db: Session, *, base_task_id: int, chunk_size: Optional[int] = None
+    ) -> int:
         """
         Removes all task statistics to the given base task
 
         :param db: DB-Session
         :param base_task_id: Id of the base task
-        :return: The deleted task statistics
+        :param chunk_size: Maximum number of task statistics removed per transaction
+        :return: The number of deleted task statistics
+        """
+        return self.remove_where(
+            db, self.model.base_task_id == base_task_id, chunk_size=chunk_size
+        )
+
+    def remove_all_to_task_group(
+        self, db: Session, *, task_group_id: int, chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Removes all task statistics to the base tasks of the given task group
+
+        :param db: DB-Session
+        :param task_group_id: Id of the task group
+        :param chunk_size: Maximum number of task statistics removed per transaction
+        :return: The number of deleted task statistics
+        """
+        base_task_ids = select(BaseTask.id).where(
+            BaseTask.task_group_id == task_group_id
+        )
+        return self.remove_where(
+            db, self.model.base_task_id.in_(base_task_ids), chunk_size=chunk_size
+        )
+
+    def remove_all_to_course(
+        self, db: Session, *, course_id: int, chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Removes all task statistics to the base tasks of the given course
+
+        :param db: DB-Session
+        :param course_id: Id of the course
+        :param chunk_size: Maximum number of task statistics removed per transaction
+        :return: The number of deleted task statistics
         """
-        db_objs = (
-            db.query(self.model).filter(self.model.base_task_id == base_task_id).all()
+        base_task_ids = select(BaseTask.id).where(BaseTask.course_id == course_id)
+        return self.remove_where(
+            db, self.model.base_task_id.in_(base_task_ids), chunk_size=chunk_size
         )
-        for obj in db_objs:
-            db.delete(obj)
-            db.commit()
-        return db_objs
 
 
 crud_task_statistic = CRUDTaskStatistic(TaskStatistic)
@@ -3,6 +3,7 @@ from typing import Any, Dict, Optional, Union, List
 from sqlalchemy.orm import Session
 
 from app.core.security import get_password_hash, verify_password
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -88,3 +89,5 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
 
 crud_user = CRUDUser(User)
+
+async_crud_user = AsyncCRUDBase(User)
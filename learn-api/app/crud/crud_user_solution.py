@@ -1,20 +1,246 @@
-from typing import List, Tuple
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
-from sqlalchemy import and_, func
-from sqlalchemy.orm import Session
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import JSON, and_, bindparam, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, selectinload
+from sqlalchemy.sql.elements import ColumnElement
 
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
-from app.models.user_solution import UserSolution
+from app.crud.crud_progress_counter import COUNTED_COLUMNS, crud_progress_counter
+from app.models.user_solution import UserSolution, get_annotation_id
+from app.models.user_solution_annotation import UserSolutionAnnotation
+from app.schemas.annotation_operation import (
+    AnnotationOperation,
+    AnnotationOperationResult,
+    AnnotationOperationType,
+)
 from app.schemas.user import UserInDBBase
 from app.schemas.user_solution import (
     UserSolution as SchemaSolution,
 )
+from app.schemas.task import TaskFeedback, TaskStatus
 from app.schemas.user_solution import UserSolutionCreate, UserSolutionUpdate
 from app.models.user import User
 from app.utils.logger import logger
 
 
 class CRUDUserSolution(CRUDBase[UserSolution, UserSolutionCreate, UserSolutionUpdate]):
+    def create(self, db: Session, *, obj_in: UserSolutionCreate) -> UserSolution:
+        """
+        Creates a new user solution and adds it to the progress counters of the user.
+
+        :param db: DB-Session
+        :param obj_in: Object containing all properties for creating the new user solution
+        :return: The created user solution
+        """
+        crud_progress_counter.update_counters(
+            db, removed=[], added=[jsonable_encoder(obj_in)], commit=False
+        )
+        return super().create(db, obj_in=obj_in)
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: UserSolution,
+        obj_in: Union[UserSolutionUpdate, Dict[str, Any]]
+    ) -> UserSolution:
+        """
+        Updates the given user solution, the solution data is written to the annotation rows.
+
+        :param db: DB-Session
+        :param db_obj: The user solution to be updated
+        :param obj_in: Object containing the properties that should be updated
+        :return: The updated user solution
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if "solution_data" in update_data:
+            db_obj.solution_data = jsonable_encoder(update_data.pop("solution_data"))
+
+        previous = self.__get_counted_values(db_obj)
+        crud_progress_counter.update_counters(
+            db,
+            removed=[previous],
+            added=[
+                {
+                    **previous,
+                    **{
+                        key: value
+                        for key, value in update_data.items()
+                        if key in COUNTED_COLUMNS
+                    },
+                }
+            ],
+            commit=False,
+        )
+        return super().update(db, db_obj=db_obj, obj_in=update_data)
+
+    def add_annotation(
+        self,
+        db: Session,
+        *,
+        user_id: str,
+        task_id: int,
+        annotation: Dict[str, Any],
+        commit: bool = True
+    ) -> None:
+        """
+        Appends an annotation to the solution of the user without loading the other annotations.
+
+        :param db: DB-Session
+        :param user_id: Id of the user
+        :param task_id: Id of the task
+        :param annotation: The new annotation
+        :param commit: If the change should be committed
+        """
+        db.execute(
+            insert(UserSolutionAnnotation).values(
+                user_id=user_id,
+                task_id=task_id,
+                annotation_id=get_annotation_id(annotation),
+                data=annotation,
+            )
+        )
+        if commit:
+            db.commit()
+
+    def update_annotation(
+        self,
+        db: Session,
+        *,
+        user_id: str,
+        task_id: int,
+        annotation_id: str,
+        annotation: Dict[str, Any],
+        commit: bool = True
+    ) -> bool:
+        """
+        Replaces the annotation with the given id in the solution of the user.
+
+        :param db: DB-Session
+        :param user_id: Id of the user
+        :param task_id: Id of the task
+        :param annotation_id: Id of the annotation
+        :param annotation: The new annotation
+        :param commit: If the change should be committed
+        :return: If an annotation with the id was found
+        """
+        updated = self.__query_annotation(
+            db, user_id=user_id, task_id=task_id, annotation_id=annotation_id
+        ).update(
+            {
+                UserSolutionAnnotation.annotation_id: get_annotation_id(annotation),
+                UserSolutionAnnotation.data: annotation,
+            },
+            synchronize_session=False,
+        )
+        if commit:
+            db.commit()
+        return updated > 0
+
+    def remove_annotation(
+        self,
+        db: Session,
+        *,
+        user_id: str,
+        task_id: int,
+        annotation_id: str,
+        commit: bool = True
+    ) -> bool:
+        """
+        Removes the annotation with the given id from the solution of the user.
+
+        :param db: DB-Session
+        :param user_id: Id of the user
+        :param task_id: Id of the task
+        :param annotation_id: Id of the annotation
+        :param commit: If the change should be committed
+        :return: If an annotation with the id was found
+        """
+        removed = self.__query_annotation(
+            db, user_id=user_id, task_id=task_id, annotation_id=annotation_id
+        ).delete(synchronize_session=False)
+        if commit:
+            db.commit()
+        return removed > 0
+
+    def apply_annotation_operations(
+        self,
+        db: Session,
+        *,
+        user_id: str,
+        task_id: int,
+        operations: List[AnnotationOperation]
+    ) -> List[AnnotationOperationResult]:
+        """
+        Adds, updates and removes annotations of the solution of the user in the given order
+        within a single transaction.
+
+        :param db: DB-Session
+        :param user_id: Id of the user
+        :param task_id: Id of the task
+        :param operations: The operations that should be applied
+        :return: The result of every operation
+        """
+        results = []
+        for operation in operations:
+            found = True
+            if operation.operation == AnnotationOperationType.ADD:
+                self.add_annotation(
+                    db,
+                    user_id=user_id,
+                    task_id=task_id,
+                    annotation=jsonable_encoder(
+                        operation.annotation, exclude_unset=True
+                    ),
+                    commit=False,
+                )
+            elif operation.operation == AnnotationOperationType.UPDATE:
+                found = self.update_annotation(
+                    db,
+                    user_id=user_id,
+                    task_id=task_id,
+                    annotation_id=operation.annotation_id,
+                    annotation=jsonable_encoder(
+                        operation.annotation, exclude_unset=True
+                    ),
+                    commit=False,
+                )
+            else:
+                found = self.remove_annotation(
+                    db,
+                    user_id=user_id,
+                    task_id=task_id,
+                    annotation_id=operation.annotation_id,
+                    commit=False,
+                )
+            results.append(
+                AnnotationOperationResult(
+                    annotation_id=operation.annotation_id,
+                    status_code=200 if found else 404,
+                )
+            )
+        db.commit()
+        return results
+
+    @staticmethod
+    def __query_annotation(
+        db: Session, *, user_id: str, task_id: int, annotation_id: str
+    ) -> Query:
+        return (
+            db.query(UserSolutionAnnotation)
+            .filter(UserSolutionAnnotation.user_id == user_id)
+            .filter(UserSolutionAnnotation.task_id == task_id)
+            .filter(UserSolutionAnnotation.annotation_id == annotation_id)
+        )
+
     def get_solution_and_user_to_task(
         self, db: Session, *, user_id: str, task_id: int
     ) -> Tuple[UserSolution, User]:
@@ -52,6 +278,28 @@ class CRUDUserSolution(CRUDBase[UserSolution, UserSolutionCreate, UserSolutionUp
             .first()
         )
 
+    def get_solutions_to_tasks_and_user(
+        self, db: Session, *, user_id: str, task_ids: List[int]
+    ) -> Dict[int, UserSolution]:
+        """
+        Returns the UserSolutions of the user to the given tasks with a single query.
+
+        :param db: DB-Session
+        :param user_id: id of the user
+        :param task_ids: ids of the tasks
+        :return: The found UserSolutions by task id
+        """
+        if len(task_ids) == 0:
+            return {}
+        return {
+            user_solution.task_id: user_solution
+            for user_solution in db.query(self.model)
+            .filter(UserSolution.user_id == user_id)
+            .filter(UserSolution.task_id.in_(task_ids))
+            .options(selectinload(UserSolution.annotations))
+            .all()
+        }
+
     def get_user_solution_to_users(
         self, db: Session, *, task_id: int, user_ids: List[int]
     ):
@@ -89,7 +337,62 @@ class CRUDUserSolution(CRUDBase[UserSolution, UserSolutionCreate, UserSolutionUp
         :param task_id: Id of the task
         :return: All found user solutions
         """
-        return db.query(self.model).filter(UserSolution.task_id == task_id).all()
+        return (
+            db.query(self.model)
+            .filter(UserSolution.task_id == task_id)
+            .options(selectinload(UserSolution.annotations))
+            .all()
+        )
+
+    def get_annotations_and_users_to_tasks(
+        self, db: Session, *, task_ids: List[int], chunk_size: int = 1000
+    ) -> Iterator[Tuple[int, str, str, str, Any]]:
+        """
+        Returns the annotations of all user solutions to the given tasks with the names of their users.
+        The rows are fetched in chunks while they are iterated, ordered by task and user.
+
+        :param db: DB-Session
+        :param task_ids: Ids of the tasks
+        :param chunk_size: Number of rows fetched at once
+        :return: The task id, user id, firstname, lastname and data of every annotation
+        """
+        return (
+            db.query(
+                UserSolutionAnnotation.task_id,
+                User.id,
+                User.firstname,
+                User.lastname,
+                UserSolutionAnnotation.data,
+            )
+            .join(User, User.id == UserSolutionAnnotation.user_id)
+            .filter(UserSolutionAnnotation.task_id.in_(task_ids))
+            .order_by(
+                UserSolutionAnnotation.task_id,
+                UserSolutionAnnotation.user_id,
+                UserSolutionAnnotation.id,
+            )
+            .yield_per(chunk_size)
+        )
+
+    def get_annotation_changes_to_tasks(
+        self, db: Session, *, task_ids: List[int]
+    ) -> Tuple[int, Optional[int], Optional[datetime]]:
+        """
+        Returns what changes whenever an annotation of the tasks is added, changed or removed.
+
+        :param db: DB-Session
+        :param task_ids: Ids of the tasks
+        :return: The number of annotations, the highest annotation id and the latest change
+        """
+        return tuple(
+            db.query(
+                func.count(UserSolutionAnnotation.id),
+                func.max(UserSolutionAnnotation.id),
+                func.max(UserSolutionAnnotation.updated),
+            )
+            .filter(UserSolutionAnnotation.task_id.in_(task_ids))
+            .one()
+        )
 
     def remove_by_user_id_and_task_id(
         self, db: Session, *, user_id: str, task_id: int
@@ -108,96 +411,88 @@ class CRUDUserSolution(CRUDBase[UserSolution, UserSolutionCreate, UserSolutionUp
             .filter(UserSolution.task_id == task_id)
             .first()
         )
+        # Loaded before the delete, so the deleted solution can still be returned
+        db_obj.annotations
+        crud_progress_counter.update_counters(
+            db, removed=[self.__get_counted_values(db_obj)], added=[], commit=False
+        )
         db.delete(db_obj)
         db.commit()
         return db_obj
 
     def remove_all_by_task_id(
-        self, db: Session, *, task_id: int
-    ) -> List[SchemaSolution]:
+        self, db: Session, *, task_id: int, chunk_size: Optional[int] = None
+    ) -> int:
         """
         Removes all UserSolutions to the task.
 
         :param db: DB-Session
         :param task_id: id of the Task
-        :return: The deleted UserSolutions
+        :param chunk_size: Maximum number of UserSolutions removed per transaction
+        :return: The number of deleted UserSolutions
         """
-        db_objs = db.query(self.model).filter(UserSolution.task_id == task_id).all()
-        for obj in db_objs:
-            db.delete(obj)
-            db.commit()
-        return db_objs
+        return self.__remove_where(
+            db, [UserSolution.task_id == task_id], chunk_size=chunk_size
+        )
 
     def remove_all_by_user_to_course(
         self, db: Session, user_id: str, course_id: int
-    ) -> List[SchemaSolution]:
+    ) -> int:
         """
         Removes all UserSolution of the User to a Course.
 
         :param db: DB-Session
         :param user_id: Id of the User
         :param course_id: Id of the Course
-        :return: The deleted UserSolution
+        :return: The number of deleted UserSolutions
         """
-        db_objs = (
-            db.query(self.model)
-            .filter(UserSolution.course_id == course_id)
-            .filter(UserSolution.user_id == user_id)
-            .all()
+        return self.__remove_where(
+            db,
+            [UserSolution.course_id == course_id, UserSolution.user_id == user_id],
+            user_id=user_id,
         )
-        for obj in db_objs:
-            db.delete(obj)
-        db.commit()
-        return db_objs
 
-    def remove_all_to_course(self, db: Session, course_id: int) -> List[SchemaSolution]:
+    def remove_all_to_course(
+        self, db: Session, course_id: int, chunk_size: Optional[int] = None
+    ) -> int:
         """
         Removes all UserSolutions to a Course
         :param db: DB-Session
         :param course_id: Id of the Course
-        :return: The deleted UserSolutions
+        :param chunk_size: Maximum number of UserSolutions removed per transaction
+        :return: The number of deleted UserSolutions
         """
-        db_objs = db.query(self.model).filter(UserSolution.course_id == course_id).all()
-        for obj in db_objs:
-            db.delete(obj)
-        db.commit()
-        return db_objs
+        return self.__remove_where(
+            db, [UserSolution.course_id == course_id], chunk_size=chunk_size
+        )
 
     def remove_all_to_task_group(
-        self, db: Session, task_group_id: int
-    ) -> List[SchemaSolution]:
+        self, db: Session, task_group_id: int, chunk_size: Optional[int] = None
+    ) -> int:
         """
         Removes all UserSolutions to the TaskGroup
         :param db: DB-Session
         :param task_group_id: Id of the TaskGroup
-        :return: The deleted UserSolutions
+        :param chunk_size: Maximum number of UserSolutions removed per transaction
+        :return: The number of deleted UserSolutions
         """
-        db_objs = (
-            db.query(self.model)
-            .filter(UserSolution.task_group_id == task_group_id)
-            .all()
+        return self.__remove_where(
+            db, [UserSolution.task_group_id == task_group_id], chunk_size=chunk_size
         )
-        for obj in db_objs:
-            db.delete(obj)
-        db.commit()
-        return db_objs
 
     def remove_all_to_base_task(
-        self, db: Session, base_task_id: int
-    ) -> List[SchemaSolution]:
+        self, db: Session, base_task_id: int, chunk_size: Optional[int] = None
+    ) -> int:
         """
         Removes all UserSolutions to the BaseTask
         :param db: DB-Session
         :param base_task_id: Id of the BaseTask
-        :return: The deleted UserSolutions
+        :param chunk_size: Maximum number of UserSolutions removed per transaction
+        :return: The number of deleted UserSolutions
         """
-        db_objs = (
-            db.query(self.model).filter(UserSolution.base_task_id == base_task_id).all()
+        return self.__remove_where(
+            db, [UserSolution.base_task_id == base_task_id], chunk_size=chunk_size
         )
-        for obj in db_objs:
-            db.delete(obj)
-        db.commit()
-        return db_objs
 
     def get_solved_percentage_to_task_group(
         self, db: Session, *, user_id: str, task_group_id: int
@@ -344,6 +639,25 @@ class CRUDUserSolution(CRUDBase[UserSolution, UserSolutionCreate, UserSolutionUp
             db, user_id=user_id, id_name="base_task_id", id_value=base_task_id
         )
 
+    def get_percentage_solved_to_tasks(
+        self, db: Session, *, task_ids: List[int]
+    ) -> Iterator[Tuple[str, int, Decimal]]:
+        """
+        Returns the solved percentage of all user solutions to the given tasks.
+        The rows are fetched in batches while iterating, so large courses are not loaded at once.
+
+        :param db: DB-Session
+        :param task_ids: ids of the tasks
+        :return: Iterator over the user id, task id and solved percentage of every solution
+        """
+        return (
+            db.query(
+                self.model.user_id, self.model.task_id, self.model.percentage_solved
+            )
+            .filter(self.model.task_id.in_(task_ids))
+            .yield_per(1000)
+        )
+
     def increment_failed_attempts(self, db: Session, user_id: str, task_id: int) -> int:
         model = self.get_solution_to_task_and_user(db, user_id=user_id, task_id=task_id)
         new_attempts = model.failed_attempts + 1
@@ -353,6 +667,109 @@ class CRUDUserSolution(CRUDBase[UserSolution, UserSolutionCreate, UserSolutionUp
         db.refresh(model)
         return new_attempts
 
+    def update_task_results(
+        self, db: Session, *, task_id: int, task_results: List[Tuple[str, TaskFeedback]]
+    ) -> None:
+        """
+        Saves the task results of multiple users to the task with a single statement.
+        The failed attempts are incremented for every result that is not correct.
+        The progress counters of the users are changed in the same transaction.
+
+        :param db: DB-Session
+        :param task_id: Id of the task
+        :param task_results: Pairs of user id and task result
+        """
+        if len(task_results) == 0:
+            return
+
+        table = self.model.__table__
+        statement = (
+            update(table)
+            .where(
+                and_(
+                    table.c.task_id == bindparam("b_task_id"),
+                    table.c.user_id == bindparam("b_user_id"),
+                )
+            )
+            .values(
+                task_result=bindparam("b_task_result", type_=JSON),
+                percentage_solved=bindparam("b_percentage_solved"),
+                failed_attempts=table.c.failed_attempts
+                + bindparam("b_failed_attempts"),
+            )
+        )
+        parameters = [
+            {
+                "b_task_id": task_id,
+                "b_user_id": user_id,
+                "b_task_result": jsonable_encoder(task_result),
+                "b_percentage_solved": (
+                    1.0 if task_result.task_status == TaskStatus.CORRECT else 0.0
+                ),
+                "b_failed_attempts": (
+                    0 if task_result.task_status == TaskStatus.CORRECT else 1
+                ),
+            }
+            for user_id, task_result in task_results
+        ]
+
+        previous = [
+            dict(row._mapping)
+            for row in db.query(
+                *[getattr(self.model, column) for column in COUNTED_COLUMNS]
+            )
+            .filter(self.model.task_id == task_id)
+            .filter(self.model.user_id.in_([user_id for user_id, _ in task_results]))
+        ]
+        updated = {
+            parameter["b_user_id"]: {
+                "task_result": parameter["b_task_result"],
+                "percentage_solved": parameter["b_percentage_solved"],
+            }
+            for parameter in parameters
+        }
+        crud_progress_counter.update_counters(
+            db,
+            removed=previous,
+            added=[{**values, **updated[values["user_id"]]} for values in previous],
+            commit=False,
+        )
+
+        db.execute(statement, parameters)
+        db.commit()
+
+    def __remove_where(
+        self,
+        db: Session,
+        criteria: List[Any],
+        *,
+        chunk_size: Optional[int] = None,
+        user_id: Optional[str] = None
+    ) -> int:
+        """
+        Removes the matching user solutions and rebuilds the progress counters to their courses.
+
+        :param db: DB-Session
+        :param criteria: Filter criteria for the user solutions to delete
+        :param chunk_size: Maximum number of user solutions removed per transaction
+        :param user_id: Only rebuilds the counters of this user, if only their solutions are removed
+        :return: The number of deleted user solutions
+        """
+        course_ids = [
+            course_id
+            for course_id, in db.query(self.model.course_id)
+            .filter(*criteria)
+            .distinct()
+            if course_id is not None
+        ]
+        deleted = self.remove_where(db, *criteria, chunk_size=chunk_size)
+        for course_id in course_ids:
+            crud_progress_counter.rebuild(db, course_id=course_id, user_id=user_id)
+        return deleted
+
+    def __get_counted_values(self, db_obj: UserSolution) -> Dict[str, Any]:
+        return {column: getattr(db_obj, column) for column in COUNTED_COLUMNS}
+
     def __get_amount_of_wrong_solutions(
         self, db: Session, *, user_id: str, id_name: str, id_value: int
     ) -> int:
@@ -360,12 +777,7 @@ class CRUDUserSolution(CRUDBase[UserSolution, UserSolutionCreate, UserSolutionUp
             db.query(func.count())
             .filter(self.model.user_id == user_id)
             .filter(getattr(self.model, id_name) == id_value)
-            .filter(
-                and_(
-                    func.JSON_LENGTH(self.model.task_result) != 1,
-                    self.model.percentage_solved != 1.00,
-                )
-            )
+            .filter(self.__is_wrong())
             .first()[0]
             or 0.0
         )
@@ -377,10 +789,43 @@ class CRUDUserSolution(CRUDBase[UserSolution, UserSolutionCreate, UserSolutionUp
             db.query(func.count())
             .filter(self.model.user_id == user_id)
             .filter(getattr(self.model, id_name) == id_value)
-            .filter(self.model.percentage_solved == 1.00)
+            .filter(self.__is_correct())
             .first()[0]
             or 0.0
         )
 
+    def __is_correct(self) -> ColumnElement:
+        return self.model.percentage_solved == 1.00
+
+    def __is_wrong(self) -> ColumnElement:
+        return and_(
+            func.JSON_LENGTH(self.model.task_result) != 1,
+            self.model.percentage_solved != 1.00,
+        )
+
 
 crud_user_solution = CRUDUserSolution(UserSolution)
+
+
+class AsyncCRUDUserSolution(AsyncCRUDBase[UserSolution]):
+    async def get_solution_to_task_and_user(
+        self, db: AsyncSession, *, user_id: str, task_id: int
+    ) -> Optional[UserSolution]:
+        """
+        Returns the UserSolution to the given user and task with its annotations.
+
+        :param db: Async DB-Session
+        :param user_id: id of the user
+        :param task_id: id of the task
+        :return: The found UserSolution
+        """
+        result = await db.execute(
+            select(self.model)
+            .where(UserSolution.user_id == user_id)
+            .where(UserSolution.task_id == task_id)
+            .options(selectinload(UserSolution.annotations))
+        )
+        return result.scalars().first()
+
+
+async_crud_user_solution = AsyncCRUDUserSolution(UserSolution)
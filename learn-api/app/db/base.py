@@ -22,6 +22,12 @@ from app.models.user import User
 # noinspection PyUnresolvedReferences
 from app.models.user_solution import UserSolution
 
+# noinspection PyUnresolvedReferences
+from app.models.user_solution_annotation import UserSolutionAnnotation
+
+# noinspection PyUnresolvedReferences
+from app.models.progress_counter import ProgressCounter
+
 # noinspection PyUnresolvedReferences
 from app.models.new_task import NewTask
 
@@ -45,3 +51,6 @@ from app.models.questionnaire_question_option import QuestionnaireQuestionOption
 
 # noinspection PyUnresolvedReferences
 from app.models.task_questionnaires import TaskQuestionnaires
+
+# noinspection PyUnresolvedReferences
+from app.models.image_select_error import ImageSelectError
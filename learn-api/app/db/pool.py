@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Counts the checkouts of a connection pool and how long they had to wait for a connection.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def add_checkout(self, wait: float, timed_out: bool = False) -> None:
+        """
+        :param wait: Seconds the checkout took
+        :param timed_out: If no connection became free in time
+        """
+        with self.lock:
+            self.checkouts += 1
+            self.timeouts += int(timed_out)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool which measures how long every checkout waits until it gets a connection.
+    The wait includes opening new connections and the pre ping.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.add_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.add_checkout(time.perf_counter() - start)
+        return connection
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the current usage of the pool and the checkout times since the process started.
+        The saturation is the share of all allowed connections that is checked out.
+
+        :return: Usage and checkout times
+        """
+        capacity = self.size() + max(self._max_overflow, 0)
+        with self.metrics.lock:
+            checkouts = self.metrics.checkouts
+            return {
+                "size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": self.checkedout(),
+                "overflow": self.overflow(),
+                "saturation": self.checkedout() / capacity if capacity > 0 else 0.0,
+                "checkouts": checkouts,
+                "timeouts": self.metrics.timeouts,
+                "average_wait_ms": (
+                    self.metrics.total_wait / checkouts * 1000 if checkouts > 0 else 0.0
+                ),
+                "max_wait_ms": self.metrics.max_wait * 1000,
+            }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+    InstrumentedQueuePool for engines with an async driver.
+    """
@@ -2,28 +2,36 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool
 
 """
 Database connection configuration and connection creation
 """
 engine = create_engine(
-    settings.DATABASE_URL, pool_pre_ping=True, echo=False, echo_pool=False
+    settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    echo=False,
+    echo_pool=False,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 class SessionManager(object):
+    """
+    Opens a session of the shared session factory and closes it on exit,
+    which returns its connection to the pool, also if an exception was raised.
+    """
+
     def __init__(self):
-        self.session: Session = sessionmaker(
-            autocommit=False, autoflush=False, bind=engine
-        )()
+        self.session: Session = SessionLocal()
 
     def __enter__(self):
         return self.session
 
     def __exit__(self, exception_type, exception_value, traceback):
         self.session.close()
-
-
-def close_session(session: Session):
-    session.close()
@@ -0,0 +1,49 @@
+"""
+Exports the task statistics created since the last export to the Parquet datasets in STATISTIC_PARQUET_URI.
+Meant to be run periodically, e.g. by a cron job. Deleted task statistics stay in the datasets until they are rebuilt.
+
+Run with: python -m app.export_task_statistics [--rebuild] [--batch-size 10000]
+"""
+
+import argparse
+from typing import List, Optional
+
+from app.core.export.statistic_exporter import statistic_exporter
+from app.db.session import SessionManager
+from app.utils.logger import logger
+from app.utils.timer import Timer
+
+
+def export(rebuild: bool = False, batch_size: int = 10000) -> int:
+    """
+    Exports the task statistics batch by batch, the watermark is updated after every batch
+
+    :param rebuild: Removes the datasets and exports all task statistics again
+    :param batch_size: Number of task statistics written at once
+    :return: Number of exported task statistics
+    """
+    if rebuild:
+        statistic_exporter.clear()
+    with SessionManager() as db:
+        return statistic_exporter.export(db, batch_size=batch_size)
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Export all task statistics again"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=10000, help="Statistics written at once"
+    )
+    arguments = parser.parse_args(arguments)
+
+    timer = Timer()
+    timer.start()
+    exported = export(arguments.rebuild, arguments.batch_size)
+    timer.stop()
+    logger.info(f"Exported {exported} task statistics in {timer.total_run_time}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -154,11 +154,12 @@ def import_task_into_new_db(task, user_mapping: dict):
 
 
 def import_user_solution_into_new_db(user_solution, user_mapping: dict):
-    new_user_solution = UserSolution(**user_solution._mapping)
-    if user_solution.solution_data is None:
-        delattr(new_user_solution, "solution_data")
-    else:
-        new_user_solution.solution_data = json.loads(new_user_solution.solution_data)
+    values = dict(user_solution._mapping)
+    # The annotations are stored as rows of their own in the new database
+    solution_data = values.pop("solution_data")
+    new_user_solution = UserSolution(**values)
+    if solution_data is not None:
+        new_user_solution.solution_data = json.loads(solution_data)
     if user_solution["task_result"] is None:
         delattr(new_user_solution, "task_result")
     else:
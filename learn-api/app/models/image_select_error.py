@@ -0,0 +1,25 @@
+from sqlalchemy import Column, ForeignKey, Integer, String, text
+
+from app.db.base_class import Base
+
+
+class ImageSelectError(Base):
+    """
+    How often an image was selected in the first attempts of the users to an image select task.
+    The counters are changed when the tasks are solved, so the statistic of a base task doesn't have
+    to be calculated from all task statistics on every read. Selections of images in the task
+    solution are counted as well and left out when read, so the counters stay valid if the
+    solution changes.
+    """
+
+    task_id = Column(
+        Integer, ForeignKey("task.id", ondelete="CASCADE"), primary_key=True
+    )
+    task_image_id = Column(String(255), primary_key=True)
+    base_task_id = Column(
+        Integer,
+        ForeignKey("basetask.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    amount = Column(Integer, nullable=False, server_default=text("0"), default=0)
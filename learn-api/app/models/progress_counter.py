@@ -0,0 +1,28 @@
+from sqlalchemy import CHAR, Column, ForeignKey, Integer, Numeric, text
+
+from app.db.base_class import Base
+
+
+class ProgressCounter(Base):
+    """
+    Solved percentage and amount of correct and wrong solutions of a user to a course, task group or base task.
+    The counters are changed together with the user solutions, so they don't have to be aggregated on every read.
+    """
+
+    user_id = Column(
+        CHAR(36), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Value of ProgressScope, the scope id is the id of the course, task group or base task
+    scope = Column(Integer, primary_key=True, autoincrement=False)
+    scope_id = Column(Integer, primary_key=True, autoincrement=False)
+    course_id = Column(
+        Integer,
+        ForeignKey("course.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    percentage_solved = Column(
+        Numeric(10, 2), nullable=False, server_default=text("0"), default=0
+    )
+    correct_tasks = Column(Integer, nullable=False, server_default=text("0"), default=0)
+    wrong_tasks = Column(Integer, nullable=False, server_default=text("0"), default=0)
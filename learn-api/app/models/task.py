@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Boolean, Column, ForeignKey, Integer, Text
+from sqlalchemy import JSON, Boolean, Column, ForeignKey, Integer, Text, text
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -17,6 +17,9 @@ class Task(Base):
     task_data = Column(JSON, nullable=True)
     info_annotations = Column(JSON, nullable=True)
     annotation_groups = Column(JSON, nullable=True)
+    solution_revision = Column(
+        Integer, nullable=False, server_default=text("0"), default=0
+    )
     hints = relationship(
         "TaskHint", cascade="all, delete-orphan", order_by="TaskHint.needed_mistakes"
     )
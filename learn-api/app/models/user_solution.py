@@ -1,6 +1,11 @@
+from typing import Any, List
+
 from sqlalchemy import JSON, Column, ForeignKey, Integer, Numeric, text, CHAR
+from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import flag_modified
 
 from app.db.base_class import Base
+from app.models.user_solution_annotation import UserSolutionAnnotation
 
 
 class UserSolution(Base):
@@ -10,8 +15,57 @@ class UserSolution(Base):
     base_task_id = Column(Integer, ForeignKey("basetask.id"))
     task_group_id = Column(Integer, ForeignKey("taskgroup.id"))
     course_id = Column(Integer, ForeignKey("course.id"))
-    solution_data = Column(JSON, nullable=False)
     task_result = Column(JSON, nullable=True)
+    annotation_results = Column(JSON, nullable=True)
     failed_attempts = Column(
         Integer, nullable=False, server_default=text("0"), default=0
     )
+    annotations = relationship(
+        "UserSolutionAnnotation",
+        cascade="all, delete-orphan",
+        order_by="UserSolutionAnnotation.id",
+        passive_deletes=True,
+    )
+
+    @property
+    def solution_data(self) -> List[Any]:
+        """
+        Assembles the annotations of the solution in the order they were added
+
+        :return: The annotations of the user
+        """
+        return [annotation.data for annotation in self.annotations]
+
+    @solution_data.setter
+    def solution_data(self, solution_data: List[Any]) -> None:
+        """
+        Replaces all annotations of the solution.
+        If the annotation ids stay the same, the existing rows are updated instead of being recreated.
+
+        :param solution_data: The new annotations of the user
+        """
+        solution_data = solution_data or []
+        annotation_ids = [get_annotation_id(data) for data in solution_data]
+        if annotation_ids != [
+            annotation.annotation_id for annotation in self.annotations
+        ]:
+            self.annotations = [
+                UserSolutionAnnotation(annotation_id=annotation_id, data=data)
+                for annotation_id, data in zip(annotation_ids, solution_data)
+            ]
+            return
+
+        for annotation, data in zip(self.annotations, solution_data):
+            # The data may have been changed in place, so it is always marked as modified
+            annotation.data = data
+            flag_modified(annotation, "data")
+
+
+def get_annotation_id(data: Any) -> Any:
+    """
+    Returns the id of an annotation of a user solution
+
+    :param data: The annotation, or the image of an image select task
+    :return: The id of the annotation or None if it has none
+    """
+    return data.get("id") if isinstance(data, dict) else None
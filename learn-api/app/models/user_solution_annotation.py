@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    CHAR,
+    Column,
+    DateTime,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.dialects import mysql
+
+from app.db.base_class import Base
+
+
+class UserSolutionAnnotation(Base):
+    """
+    A single annotation of a user solution, so annotations can be added, changed and removed
+    without rewriting the whole solution. The annotations keep the order they were added in by their id.
+    """
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "task_id"],
+            ["usersolution.user_id", "usersolution.task_id"],
+            ondelete="CASCADE",
+        ),
+        Index(
+            "ix_usersolutionannotation_user_id_task_id_annotation_id",
+            "user_id",
+            "task_id",
+            "annotation_id",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(CHAR(36), nullable=False)
+    task_id = Column(Integer, nullable=False)
+    # Images of image select tasks are stored without an id
+    annotation_id = Column(String(255), nullable=True)
+    data = Column(JSON, nullable=False)
+    # Changes with every write, exports of the solutions are cached by the latest change
+    updated = Column(
+        DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
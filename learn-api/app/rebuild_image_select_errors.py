@@ -0,0 +1,46 @@
+"""
+Counts the wrongly selected images of all image select tasks again from the task statistics.
+Needed to fill the counters initially and after task statistics were changed directly in the database.
+
+Run with: python -m app.rebuild_image_select_errors [--base-tasks 1 2 3]
+"""
+
+import argparse
+from typing import List, Optional
+
+from app.db.session import SessionManager
+from app.crud.crud_image_select_error import crud_image_select_error
+from app.utils.logger import logger
+from app.utils.timer import Timer
+
+
+def rebuild(base_task_ids: Optional[List[int]] = None) -> None:
+    """
+    Rebuilds the counters base task by base task, every base task is committed on its own
+
+    :param base_task_ids: ids of the base tasks, all base tasks with image select tasks if None
+    """
+    with SessionManager() as db:
+        if base_task_ids is None:
+            base_task_ids = crud_image_select_error.get_base_task_ids(db)
+        for base_task_id in base_task_ids:
+            crud_image_select_error.rebuild(db, base_task_id=base_task_id)
+            logger.info(f"Rebuilt image select errors to base task {base_task_id}")
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--base-tasks", type=int, nargs="+", help="Ids of the base tasks"
+    )
+    arguments = parser.parse_args(arguments)
+
+    timer = Timer()
+    timer.start()
+    rebuild(arguments.base_tasks)
+    timer.stop()
+    logger.info(f"Image select errors rebuilt in {timer.total_run_time}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Calculates the progress counters of all users again from their user solutions.
+Needed after user solutions were changed directly in the database, e.g. by migrate_new_database.
+
+Run with: python -m app.rebuild_progress_counters [--courses 1 2 3]
+"""
+
+import argparse
+from typing import List, Optional
+
+from app.db.session import SessionManager
+from app.crud.crud_progress_counter import crud_progress_counter
+from app.models.course import Course
+from app.utils.logger import logger
+from app.utils.timer import Timer
+
+
+def rebuild(course_ids: Optional[List[int]] = None) -> None:
+    """
+    Rebuilds the counters course by course, every course is committed on its own
+
+    :param course_ids: ids of the courses, all courses if None
+    """
+    with SessionManager() as db:
+        if course_ids is None:
+            course_ids = [course_id for course_id, in db.query(Course.id).all()]
+        for course_id in course_ids:
+            crud_progress_counter.rebuild(db, course_id=course_id)
+            logger.info(f"Rebuilt progress counters to course {course_id}")
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--courses", type=int, nargs="+", help="Ids of the courses")
+    arguments = parser.parse_args(arguments)
+
+    timer = Timer()
+    timer.start()
+    rebuild(arguments.courses)
+    timer.stop()
+    logger.info(f"Progress counters rebuilt in {timer.total_run_time}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from enum import IntEnum
+from typing import Any, Dict, Optional, Union
+
+from pydantic import BaseModel, root_validator
+
+from app.schemas.polygon_data import (
+    AnnotationData,
+    InfoAnnotationData,
+    OffsetLineData,
+    OffsetPointData,
+    OffsetPolygonData,
+    OffsetRectangleData,
+    RectangleData,
+)
+
+
+class AnnotationOperationType(IntEnum):
+    ADD = 0
+    UPDATE = 1
+    DELETE = 2
+
+
+class AnnotationOperation(BaseModel):
+    operation: AnnotationOperationType
+    annotation_id: Optional[str]
+    annotation: Optional[Any]
+
+    @root_validator(skip_on_failure=True)
+    def check_operation(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Checks that every operation has the annotation or the id it needs.
+        The id of added and updated annotations defaults to the id of the annotation.
+        """
+        annotation = values.get("annotation")
+        if values["operation"] != AnnotationOperationType.DELETE and annotation is None:
+            raise ValueError("The operation needs an annotation")
+        if values.get("annotation_id") is None and annotation is not None:
+            values["annotation_id"] = annotation.id
+        if values["operation"] != AnnotationOperationType.ADD and (
+            values.get("annotation_id") is None
+        ):
+            raise ValueError("The operation needs an annotation id")
+        return values
+
+
+class UserSolutionAnnotationOperation(AnnotationOperation):
+    annotation: Optional[Union[RectangleData, AnnotationData]]
+
+
+class TaskAnnotationOperation(AnnotationOperation):
+    annotation: Optional[
+        Union[
+            OffsetRectangleData,
+            OffsetPolygonData,
+            OffsetLineData,
+            OffsetPointData,
+            RectangleData,
+            InfoAnnotationData,
+            AnnotationData,
+        ]
+    ]
+
+
+class AnnotationOperationResult(BaseModel):
+    annotation_id: Optional[str]
+    status_code: int
@@ -0,0 +1,28 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ExportFormat(str, Enum):
+    XLSX = "xlsx"
+    CSV = "csv"
+
+
+class ExportKind(str, Enum):
+    TASK = "task"
+    BASE_TASK = "base_task"
+    TASK_GROUP = "task_group"
+
+
+class ExportCreate(BaseModel):
+    kind: ExportKind
+    entity_id: int
+    export_format: ExportFormat = ExportFormat.XLSX
+
+
+class ExportJob(BaseModel):
+    job_id: Optional[str]
+    status: str
+    course_id: Optional[int]
+    file_name: Optional[str]
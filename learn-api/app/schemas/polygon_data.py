@@ -1,7 +1,9 @@
+from collections.abc import Sequence
 from enum import IntEnum
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, parse_obj_as
 
 
 class AnnotationType(IntEnum):
@@ -24,11 +26,105 @@ class Point(BaseModel):
     y: float
 
 
-class AnnotationCoord(BaseModel):
-    image: List[Point]
-
-
-class AnnotationData(BaseModel):
+class Coordinates(Sequence):
+    """
+    Vertices of an annotation stored as float64 array of shape (n, 2).
+    Behaves like a list of points, the points are only created when they are accessed.
+    """
+
+    __slots__ = ("array",)
+
+    def __init__(self, array: Any):
+        self.array = np.ascontiguousarray(array, dtype=np.float64).reshape(-1, 2)
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable[[Any], "Coordinates"]]:
+        yield cls.validate
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type="array", items=Point.schema())
+
+    @classmethod
+    def validate(cls, value: Any) -> "Coordinates":
+        """
+        Parses the coordinates from a list of points in the JSON format or from an array
+
+        :param value: The value to parse
+        :return: The coordinates
+        """
+        if isinstance(value, Coordinates):
+            return value
+        if isinstance(value, np.ndarray):
+            return cls(value)
+        if not isinstance(value, (list, tuple)):
+            raise TypeError("value is not a valid list")
+
+        try:
+            # Fast path for the JSON format which avoids creating a model per point
+            array = np.fromiter(
+                (
+                    coordinate
+                    for point in value
+                    for coordinate in (point["x"], point["y"])
+                ),
+                dtype=np.float64,
+                count=2 * len(value),
+            )
+        except (KeyError, TypeError, ValueError):
+            array = [[point.x, point.y] for point in parse_obj_as(List[Point], value)]
+        return cls(array)
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Point, "Coordinates"]:
+        if isinstance(index, slice):
+            return Coordinates(self.array[index])
+        x, y = self.array[index].tolist()
+        return Point.construct(x=x, y=y)
+
+    def __iter__(self) -> Iterator[Point]:
+        for x, y in self.array.tolist():
+            yield Point.construct(x=x, y=y)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Coordinates):
+            return np.array_equal(self.array, other.array)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Coordinates({self.to_json()!r})"
+
+    def to_json(self) -> List[Dict[str, float]]:
+        """
+        Returns the coordinates in the JSON format
+
+        :return: List of points
+        """
+        return [{"x": x, "y": y} for x, y in self.array.tolist()]
+
+
+class CoordinatesModel(BaseModel):
+    """
+    Base of all models containing coordinates, so they are converted to the JSON format by .json()
+    """
+
+    class Config:
+        json_encoders = {Coordinates: Coordinates.to_json}
+
+
+class AnnotationCoord(CoordinatesModel):
+    image: Coordinates
+
+    def dict(self, **kwargs) -> Dict[str, Any]:
+        result = super().dict(**kwargs)
+        if isinstance(result.get("image"), Coordinates):
+            result["image"] = result["image"].to_json()
+        return result
+
+
+class AnnotationData(CoordinatesModel):
     id: str
     type: AnnotationType
     color: str
@@ -1,4 +1,4 @@
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Union
 
 from pydantic import BaseModel
 
@@ -22,3 +22,14 @@ class LineResult(SolverResultBase):
 
 class PolygonResult(LineResult):
     percentage_area_difference: float
+
+
+class AnnotationOutcome(BaseModel):
+    """
+    Result of a single user annotation against all solution annotations
+    """
+
+    checked: bool = True
+    no_match: bool = False
+    invalid: int = 0
+    matches: List[Tuple[str, Union[PolygonResult, LineResult]]] = []
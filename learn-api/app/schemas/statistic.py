@@ -23,3 +23,23 @@ class WrongLabelStatistic(BaseModel):
 class ImageSelectStatistic(BaseModel):
     wrong_image_statistics: List[WrongImageStatistic]
     wrong_label_statistics: List[WrongLabelStatistic]
+
+
+class DailyAttemptStatistic(BaseModel):
+    solved_day: str
+    attempts: int
+    users: int
+    correct_attempts: int
+    average_percentage_solved: float
+
+
+class AnnotationStatusStatistic(BaseModel):
+    status: Optional[int]
+    amount: int
+
+
+class ImageSelectErrorCount(BaseModel):
+    task_id: int
+    task_image_id: str
+    base_task_id: int
+    amount: int
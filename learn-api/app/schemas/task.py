@@ -62,6 +62,27 @@ class TaskFeedback(BaseModel):
     result_detail: Optional[Union[List[SelectImageFeedback], List[AnnotationFeedback]]]
 
 
+class SolveJob(BaseModel):
+    job_id: str
+    task_id: int
+    status: str
+    task_result: Optional[TaskFeedback]
+
+
+class SolvableTask(BaseModel):
+    id: int
+    task_type: int
+    annotation_type: int
+    min_correct: int
+    knowledge_level: Optional[int]
+    can_be_solved: Optional[bool]
+    solution: Optional[Any]
+    solution_revision: Optional[int]
+
+    class Config:
+        orm_mode = True
+
+
 class TaskBase(BaseModel):
     layer: int
     task_type: TaskType
@@ -1,4 +1,5 @@
-from typing import Any, List, Optional, Union
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel
 
@@ -30,6 +31,7 @@ class UserSolutionUpdate(BaseModel):
     solution_data: Optional[Any]
     task_result: Optional[TaskFeedback]
     percentage_solved: Optional[float]
+    annotation_results: Optional[Any]
 
 
 class UserSolutionInDB(UserSolutionBase):
@@ -47,6 +49,29 @@ class UserSolution(UserSolutionInDB):
     pass
 
 
+class UserSolutionData(BaseModel):
+    user_id: str
+    solution_data: Any
+
+
 class UserSolutionWithUser(BaseModel):
     user_solution: UserSolution
     user: User
+
+
+class ProgressScope(IntEnum):
+    COURSE = 0
+    TASK_GROUP = 1
+    BASE_TASK = 2
+
+
+class SolutionProgress(BaseModel):
+    percentage_solved: float = 0.0
+    correct_tasks: int = 0
+    wrong_tasks: int = 0
+
+
+class UserProgress(BaseModel):
+    courses: Dict[int, SolutionProgress] = {}
+    task_groups: Dict[int, SolutionProgress] = {}
+    base_tasks: Dict[int, SolutionProgress] = {}
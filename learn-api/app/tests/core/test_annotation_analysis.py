@@ -0,0 +1,174 @@
+import json
+
+import pytest
+
+from app.benchmarks import reference
+from app.benchmarks.synthetic import (
+    circle_points,
+    line_solution,
+    line_user_solution,
+    point_solution,
+    point_user_solution,
+    polygon_solution,
+    polygon_user_solution,
+)
+from app.core.solver.annotation_analysis import AnnotationAnalysis
+from app.core.solver.annotation_results import AnnotationResultCache
+from app.core.solver.solution_geometry import CompiledPointSolution
+from app.schemas.polygon_data import AnnotationCoord, AnnotationData, AnnotationType
+
+
+def user_polygon(annotation_id, center_x, center_y, radius, name="gland"):
+    return AnnotationData(
+        id=annotation_id,
+        type=AnnotationType.USER_SOLUTION,
+        color="#00FF00",
+        name=name,
+        coord=AnnotationCoord(image=circle_points(center_x, center_y, radius, 16)),
+    )
+
+
+def test_polygon_in_polygon_matches_only_overlapping_solutions():
+    solution = polygon_solution(4, radius=100)
+    matched_ids, no_match_ids, invalid_ids = (
+        AnnotationAnalysis.check_polygon_in_polygon(
+            user_annotation_data=[user_polygon("inside", 0, 0, 100)],
+            solution_annotation_data=solution,
+        )
+    )
+
+    assert list(matched_ids.keys()) == [s.id for s in solution]
+    assert [r.id for r in matched_ids["solution-0"]] == ["inside"]
+    assert all(len(matched_ids[s.id]) == 0 for s in solution[1:])
+    assert no_match_ids == []
+    assert invalid_ids == []
+
+
+def test_polygon_in_polygon_no_match_and_invalid():
+    solution = polygon_solution(4, radius=100)
+    bow_tie = AnnotationData(
+        id="invalid",
+        type=AnnotationType.USER_SOLUTION,
+        color="#00FF00",
+        coord=AnnotationCoord(
+            image=[
+                {"x": 0, "y": 0},
+                {"x": 10, "y": 10},
+                {"x": 10, "y": 0},
+                {"x": 0, "y": 10},
+                {"x": 0, "y": 0},
+            ]
+        ),
+    )
+    matched_ids, no_match_ids, invalid_ids = (
+        AnnotationAnalysis.check_polygon_in_polygon(
+            user_annotation_data=[user_polygon("far", 5000, 5000, 50), bow_tie],
+            solution_annotation_data=solution,
+        )
+    )
+
+    assert all(len(results) == 0 for results in matched_ids.values())
+    assert no_match_ids == ["far"]
+    assert invalid_ids == ["invalid"]
+
+
+def result_dicts(solve_result):
+    matched_ids, *rest = solve_result
+    return {
+        key: [result.dict() for result in results]
+        for key, results in matched_ids.items()
+    }, *rest
+
+
+@pytest.mark.parametrize("broadcast_limit", [0, 10**9])
+def test_point_in_point_equals_reference(monkeypatch, broadcast_limit):
+    monkeypatch.setattr(CompiledPointSolution, "BROADCAST_LIMIT", broadcast_limit)
+    solution = point_solution(200, seed=3)
+    user_solution = point_user_solution(solution, 300, seed=3)
+
+    expected = reference.check_point_in_point(
+        user_annotation_data=user_solution, solution_annotation_data=solution
+    )
+    actual = AnnotationAnalysis.check_point_in_point(
+        user_annotation_data=user_solution, solution_annotation_data=solution
+    )
+
+    assert len(expected[1]) > 0
+    assert result_dicts(actual) == result_dicts(expected)
+
+
+def test_polygon_in_polygon_reuses_unchanged_annotations():
+    solution = polygon_solution(20, seed=5)
+    user_solution = polygon_user_solution(solution, 10, vertices=8, seed=5)
+
+    annotation_results = AnnotationResultCache(None, solution_revision=0)
+    AnnotationAnalysis.check_polygon_in_polygon(
+        user_annotation_data=user_solution,
+        solution_annotation_data=solution,
+        annotation_results=annotation_results,
+    )
+    stored = json.loads(json.dumps(annotation_results.to_json()))
+
+    changed_solution = user_solution[:-2] + [
+        user_polygon("added", 0, 0, 90),
+        user_polygon("moved", 5000, 5000, 50),
+    ]
+    annotation_results = AnnotationResultCache(stored, solution_revision=0)
+    actual = AnnotationAnalysis.check_polygon_in_polygon(
+        user_annotation_data=changed_solution,
+        solution_annotation_data=solution,
+        annotation_results=annotation_results,
+    )
+    expected = AnnotationAnalysis.check_polygon_in_polygon(
+        user_annotation_data=changed_solution, solution_annotation_data=solution
+    )
+
+    assert (annotation_results.hits, annotation_results.misses) == (8, 2)
+    assert result_dicts(actual) == result_dicts(expected)
+    assert len(annotation_results.to_json()["annotations"]) == 10
+
+
+def test_annotation_results_ignore_other_solution_revision():
+    annotation_results = AnnotationResultCache(None, solution_revision=0)
+    AnnotationAnalysis.check_polygon_in_polygon(
+        user_annotation_data=[user_polygon("inside", 0, 0, 100)],
+        solution_annotation_data=polygon_solution(4),
+        annotation_results=annotation_results,
+    )
+
+    annotation_results = AnnotationResultCache(
+        annotation_results.to_json(), solution_revision=1
+    )
+
+    assert annotation_results.stored == {}
+
+
+def test_line_in_line_equals_reference():
+    solution = line_solution(30, seed=2)
+    user_solution = line_user_solution(solution, 60, seed=2)
+
+    expected = reference.check_line_in_line(
+        user_annotation_data=user_solution, solution_annotation_data=solution
+    )
+    actual = AnnotationAnalysis.check_line_in_line(
+        user_annotation_data=user_solution, solution_annotation_data=solution
+    )
+
+    assert len(expected[1]) > 0
+    assert any(len(results) > 0 for results in expected[0].values())
+    assert result_dicts(actual) == result_dicts(expected)
+
+
+def test_polygon_in_polygon_equals_reference():
+    solution = polygon_solution(30, seed=4)
+    user_solution = polygon_user_solution(solution, 40, vertices=8, seed=4)
+
+    expected = reference.check_polygon_in_polygon(
+        user_annotation_data=user_solution, solution_annotation_data=solution
+    )
+    actual = AnnotationAnalysis.check_polygon_in_polygon(
+        user_annotation_data=user_solution, solution_annotation_data=solution
+    )
+
+    assert any(len(results) > 0 for results in expected[0].values())
+    assert result_dicts(actual) == result_dicts(expected)
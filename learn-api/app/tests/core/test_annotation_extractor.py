@@ -0,0 +1,85 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.benchmarks.synthetic import circle_points
+from app.core.annotation_extractor import create_mask_from_annotations
+from app.schemas.polygon_data import AnnotationType, OffsetPolygonData
+from app.schemas.task import AnnotationGroup
+
+GROUPS = [
+    AnnotationGroup(name="tumor", color="#FF0000"),
+    AnnotationGroup(name="gland", color="#00C8FF"),
+]
+
+
+def polygon(annotation_id, name, points):
+    coord = {"image": points}
+    return OffsetPolygonData(
+        id=annotation_id,
+        type=AnnotationType.SOLUTION,
+        color="#FF0000",
+        name=name,
+        coord=coord,
+        outerPoints=coord,
+        innerPoints=coord,
+        outerOffset=0,
+        innerOffset=0,
+        changedManual=False,
+    )
+
+
+ANNOTATIONS = [
+    polygon("a", "tumor", circle_points(300, 200, 150, 32)),
+    polygon("b", "gland", circle_points(350, 250, 80, 16)),
+    polygon(
+        "c",
+        "tumor",
+        [
+            {"x": 0, "y": 390},
+            {"x": 639, "y": 390},
+            {"x": 639, "y": 399},
+            {"x": 0, "y": 399},
+        ],
+    ),
+]
+
+
+def render_full(annotations, width, height, downsample):
+    # Renders the whole mask at once, like the mask was created before it was streamed
+    colors = {
+        group.name: tuple(int(group.color[i : i + 2], 16) for i in (1, 3, 5))
+        for group in GROUPS
+    }
+    mask = np.zeros((height, width, 3), dtype=np.uint8)
+    for annotation in annotations:
+        points = (annotation.coord.image.array / downsample).astype(np.int32)
+        cv2.fillPoly(mask, pts=[points], color=colors[annotation.name])
+    return mask
+
+
+@pytest.mark.parametrize("downsample, strip_bytes", [(1, 640 * 3 * 7), (3, 1)])
+def test_create_mask_in_strips(downsample, strip_bytes):
+    png = b"".join(
+        create_mask_from_annotations(
+            ANNOTATIONS,
+            GROUPS,
+            640,
+            400,
+            downsample=downsample,
+            strip_bytes=strip_bytes,
+        )
+    )
+    mask = cv2.cvtColor(
+        cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB
+    )
+
+    width, height = -(-640 // downsample), -(-400 // downsample)
+    assert mask.shape == (height, width, 3)
+    full_mask = render_full(ANNOTATIONS, width, height, downsample)
+    # OpenCV clips the polygons to every strip, which may move their edges by a pixel
+    kernel = np.ones((3, 3), np.uint8)
+    edges = cv2.morphologyEx(full_mask, cv2.MORPH_GRADIENT, kernel).any(axis=2)
+    different = (mask != full_mask).any(axis=2)
+    assert not (different & ~edges).any()
+    assert tuple(mask[200 // downsample, 300 // downsample]) == (0, 200, 255)
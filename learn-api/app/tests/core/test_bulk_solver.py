@@ -0,0 +1,45 @@
+from app.benchmarks.synthetic import point_solution, point_user_solution
+from app.core.solver.bulk_solver import BulkSolver
+from app.core.solver.solver import Solver
+from app.schemas.polygon_data import AnnotationType
+from app.schemas.task import SolvableTask, TaskType
+from app.schemas.user_solution import UserSolutionData
+
+
+def test_bulk_solver_matches_single_solve():
+    solution = point_solution(20)
+    task = SolvableTask(
+        id=1,
+        task_type=TaskType.DRAWING,
+        annotation_type=AnnotationType.SOLUTION_POINT,
+        min_correct=15,
+        can_be_solved=True,
+        solution=[annotation.dict() for annotation in solution],
+        solution_revision=0,
+    )
+    user_solutions = [
+        UserSolutionData(
+            user_id=str(seed),
+            solution_data=[
+                annotation.dict()
+                for annotation in point_user_solution(solution, 20, seed=seed)
+            ],
+        )
+        for seed in range(7)
+    ]
+
+    results = [
+        result
+        for chunk in BulkSolver.solve(
+            task=task, user_solutions=user_solutions, max_workers=1
+        )
+        for result in chunk
+    ]
+
+    assert [user_solution.user_id for user_solution, _ in results] == [
+        user_solution.user_id for user_solution in user_solutions
+    ]
+    for user_solution, task_result in results:
+        assert task_result == Solver.solve(
+            user_solution=user_solution, task=task, force_solve=True
+        )
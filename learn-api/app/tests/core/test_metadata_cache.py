@@ -0,0 +1,59 @@
+from app.core.metadata_cache import LocalCacheBackend, MetadataCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_metadata_cache_loads_missing_values_once():
+    cache = MetadataCache(LocalCacheBackend())
+    loads = []
+
+    def load():
+        loads.append(1)
+        return "owner"
+
+    assert cache.get("course_owner_id", 1, load) == "owner"
+    assert cache.get("course_owner_id", 1, load) == "owner"
+    assert len(loads) == 1
+    assert cache.stats() == {"course_owner_id": {"hits": 1, "misses": 1}}
+
+
+def test_metadata_cache_does_not_cache_none():
+    cache = MetadataCache(LocalCacheBackend())
+    cache.get("course_owner_id", 1, lambda: None)
+
+    assert cache.get("course_owner_id", 1, lambda: "owner") == "owner"
+
+
+def test_metadata_cache_invalidates_values():
+    cache = MetadataCache(LocalCacheBackend())
+    cache.get("course_member", "1:user", lambda: False)
+    cache.invalidate("course_member", "1:user")
+
+    assert cache.get("course_member", "1:user", lambda: True) is True
+
+
+def test_local_cache_backend_expires_entries():
+    clock = Clock()
+    backend = LocalCacheBackend(ttl=10, clock=clock)
+    backend.set("key", 1)
+    clock.now = 9
+
+    assert backend.get("key") == (True, 1)
+    clock.now = 10
+    assert backend.get("key") == (False, None)
+
+
+def test_local_cache_backend_evicts_least_recently_used():
+    backend = LocalCacheBackend(max_size=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert list(backend.entries.keys()) == ["a", "c"]
@@ -0,0 +1,43 @@
+import json
+
+from app.schemas.polygon_data import (
+    AnnotationCoord,
+    AnnotationType,
+    Coordinates,
+    OffsetPolygonData,
+)
+
+POINTS = [{"x": 1.5, "y": 2.0}, {"x": 3.0, "y": 4.25}, {"x": 1.5, "y": 2.0}]
+
+
+def test_coordinates_round_trip():
+    coord = AnnotationCoord(image=POINTS)
+
+    assert isinstance(coord.image, Coordinates)
+    assert coord.image.array.shape == (3, 2)
+    assert coord.dict() == {"image": POINTS}
+    assert json.loads(coord.json()) == {"image": POINTS}
+    assert AnnotationCoord.parse_raw(coord.json()) == coord
+    assert AnnotationCoord(**coord.dict()) == coord
+
+
+def test_annotation_round_trip():
+    coord = {"image": POINTS}
+    annotation = OffsetPolygonData(
+        id="a",
+        type=AnnotationType.SOLUTION,
+        color="#FF0000",
+        name="tumor",
+        coord=coord,
+        outerPoints=coord,
+        innerPoints=coord,
+        outerOffset=1,
+        innerOffset=1,
+        changedManual=False,
+    )
+
+    data = json.loads(annotation.json())
+    assert data["coord"] == coord
+    assert data["outerPoints"] == coord
+    assert OffsetPolygonData.parse_obj(data) == annotation
+    assert OffsetPolygonData.parse_obj(annotation.dict()) == annotation
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from app.benchmarks.synthetic import polygon_solution
+from app.core.solver.solution_cache import SolutionCache
+from app.schemas.polygon_data import AnnotationType
+from app.schemas.task import TaskType
+
+
+def polygon_task(task_id, revision):
+    return SimpleNamespace(
+        id=task_id,
+        solution_revision=revision,
+        task_type=TaskType.DRAWING,
+        annotation_type=AnnotationType.SOLUTION,
+        solution=[annotation.dict() for annotation in polygon_solution(3)],
+    )
+
+
+def test_solution_cache_reuses_same_revision():
+    cache = SolutionCache()
+    compiled_solution = cache.get(polygon_task(1, 0))
+
+    assert cache.get(polygon_task(1, 0)) is compiled_solution
+    assert len(compiled_solution.polygons.annotations) == 3
+
+
+def test_solution_cache_recompiles_changed_revision():
+    cache = SolutionCache()
+    compiled_solution = cache.get(polygon_task(1, 0))
+
+    assert cache.get(polygon_task(1, 1)) is not compiled_solution
+
+
+def test_solution_cache_evicts_least_recently_used():
+    cache = SolutionCache(max_size=2)
+    first = cache.get(polygon_task(1, 0))
+    cache.get(polygon_task(2, 0))
+    cache.get(polygon_task(1, 0))
+    cache.get(polygon_task(3, 0))
+
+    assert list(cache.entries.keys()) == [1, 3]
+    assert cache.get(polygon_task(1, 0)) is first
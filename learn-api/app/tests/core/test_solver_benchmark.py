@@ -0,0 +1,35 @@
+import copy
+
+from app.benchmarks.solver_benchmark import CASES, STAGES, compare, run_benchmark
+
+
+def test_solver_benchmark_times_every_stage():
+    results = run_benchmark(kinds=list(CASES), scales=[5], repeat=1)
+
+    assert [result["name"] for result in results["results"]] == [
+        f"{kind}-5" for kind in CASES
+    ]
+    for result in results["results"]:
+        assert result["total_ms"]["median"] > 0
+        assert set(result["stages_ms"]) == set(STAGES)
+        assert result["stages_ms"]["analysis"]["median"] > 0
+
+
+def test_solver_benchmark_compare_flags_regressions():
+    baseline = {
+        "results": [
+            {
+                "name": "polygon-100",
+                "total_ms": {"median": 10.0, "min": 9.0},
+                "stages_ms": {stage: {"median": 3.0, "min": 3.0} for stage in STAGES},
+            }
+        ]
+    }
+    current = copy.deepcopy(baseline)
+    current["results"][0]["total_ms"]["median"] = 10.5
+    current["results"][0]["stages_ms"]["analysis"]["median"] = 6.0
+
+    assert compare(baseline, current, tolerance=0.25) == [
+        "polygon-100 analysis: 3.00ms -> 6.00ms"
+    ]
+    assert compare(baseline, baseline, tolerance=0.25) == []
@@ -0,0 +1,94 @@
+from collections import namedtuple
+from datetime import datetime
+
+from app.core.export.statistic_exporter import StatisticExporter, flatten_statistics
+
+Statistic = namedtuple(
+    "Statistic",
+    [
+        "id",
+        "user_id",
+        "task_id",
+        "base_task_id",
+        "course_id",
+        "solved_date",
+        "percentage_solved",
+        "solution_data",
+        "task_result",
+    ],
+)
+
+
+def statistic(statistic_id, user_id, course_id, solved_date, percentage, statuses):
+    return Statistic(
+        id=statistic_id,
+        user_id=user_id,
+        task_id=1,
+        base_task_id=1,
+        course_id=course_id,
+        solved_date=solved_date,
+        percentage_solved=percentage,
+        solution_data=[{"id": str(i)} for i in range(len(statuses))],
+        task_result={
+            "task_status": 2 if percentage == 1 else 3,
+            "result_detail": [
+                {"id": str(i), "status": status, "percentage": percentage}
+                for i, status in enumerate(statuses)
+            ],
+        },
+    )
+
+
+STATISTICS = [
+    statistic(1, "a", 1, datetime(2024, 3, 1, 10), 0.5, [1000, 1001]),
+    statistic(2, "a", 1, datetime(2024, 3, 1, 11), 1, [1000, 1000]),
+    statistic(3, "b", 1, datetime(2024, 3, 2, 9), 0, [1001]),
+    statistic(4, "b", 2, datetime(2024, 3, 2, 9), 1, [1000]),
+]
+
+
+def test_flatten_statistics():
+    attempts, results = flatten_statistics(STATISTICS)
+
+    assert attempts["id"] == [1, 2, 3, 4]
+    assert attempts["solved_day"] == [
+        "2024-03-01",
+        "2024-03-01",
+        "2024-03-02",
+        "2024-03-02",
+    ]
+    assert attempts["annotations"] == [2, 2, 1, 1]
+    assert results["statistic_id"] == [1, 1, 2, 2, 3, 4]
+    assert results["position"] == [0, 1, 0, 1, 0, 0]
+    assert results["status"] == [1000, 1001, 1000, 1000, 1001, 1000]
+
+
+def test_export_and_query(tmp_path):
+    exporter = StatisticExporter(str(tmp_path))
+    assert exporter.get_watermark() == 0
+    assert exporter.get_daily_attempts(course_id=1) == []
+
+    exporter.write(STATISTICS[:2])
+    exporter.write(STATISTICS[2:])
+    # Writing the same statistics again replaces their files
+    exporter.write(STATISTICS[2:])
+    exporter.set_watermark(4)
+
+    assert exporter.get_watermark() == 4
+    days = exporter.get_daily_attempts(course_id=1)
+    assert [(day.solved_day, day.attempts, day.users) for day in days] == [
+        ("2024-03-01", 2, 1),
+        ("2024-03-02", 1, 1),
+    ]
+    assert days[0].correct_attempts == 1
+    assert days[0].average_percentage_solved == 0.75
+
+    statuses = exporter.get_annotation_statuses(course_id=1)
+    assert [(status.status, status.amount) for status in statuses] == [
+        (1000, 3),
+        (1001, 2),
+    ]
+    assert len(exporter.get_daily_attempts(course_id=1, task_id=2)) == 0
+
+    exporter.clear()
+    assert exporter.get_watermark() == 0
@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.db.pool import InstrumentedQueuePool
+
+
+def create_test_engine(tmp_path, **kwargs):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        **kwargs,
+    )
+
+
+def test_pool_counts_checkouts(tmp_path):
+    engine = create_test_engine(tmp_path)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert engine.pool.stats()["saturation"] == 1.0
+
+    stats = engine.pool.stats()
+    assert stats["checkouts"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["saturation"] == 0.0
+
+
+def test_pool_counts_timeouts(tmp_path):
+    engine = create_test_engine(tmp_path, pool_timeout=0.01)
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = engine.pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_ms"] >= 10
+
+
+def test_pool_keeps_metrics_when_recreated(tmp_path):
+    engine = create_test_engine(tmp_path)
+    with engine.connect():
+        pass
+    engine.dispose()
+
+    assert engine.pool.stats()["checkouts"] == 1
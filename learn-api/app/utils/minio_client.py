@@ -1,10 +1,13 @@
 import json
 import os
-from typing import Any
+from typing import Any, Optional
 
 from app.core.config import settings
 from minio import Minio
+from minio.commonconfig import ENABLED, Filter
 from minio.deleteobjects import DeleteObject
+from minio.error import S3Error
+from minio.lifecycleconfig import Expiration, LifecycleConfig, Rule
 
 
 def policy(bucket_name):
@@ -24,6 +27,7 @@ def policy(bucket_name):
 class MinioClient:
     hint_bucket = "hint-images"
     task_bucket = "task-images"
+    export_bucket = "exports"
 
     def __init__(self):
         self.instance = Minio(
@@ -35,24 +39,50 @@ class MinioClient:
         self.bucket = None
         self.bucket_name = None
 
-    def create_bucket(self, bucket_name: str) -> None:
+    def create_bucket(self, bucket_name: str, public: bool = True) -> None:
         self.bucket = self.instance.bucket_exists(bucket_name)
         self.bucket_name = bucket_name
         if not self.bucket:
             self.bucket = self.instance.make_bucket(bucket_name, "eu")
             print("✔️ Bucket created")
-            self.instance.set_bucket_policy(
-                self.bucket_name, json.dumps(policy(self.bucket_name))
-            )
-            print("✔️ Bucket policy created")
+            if public:
+                self.instance.set_bucket_policy(
+                    self.bucket_name, json.dumps(policy(self.bucket_name))
+                )
+                print("✔️ Bucket policy created")
         else:
             print("Bucket already exists")
 
-    def create_object(self, file_name: str, file_content: Any, content_type: Any):
+    def create_export_bucket(self) -> None:
+        """
+        Creates the private bucket of the exports, whose objects are deleted after the retention time
+        """
+        self.create_bucket(MinioClient.export_bucket, public=False)
+        self.instance.set_bucket_lifecycle(
+            MinioClient.export_bucket,
+            LifecycleConfig(
+                [
+                    Rule(
+                        ENABLED,
+                        rule_filter=Filter(prefix=""),
+                        rule_id="expire-exports",
+                        expiration=Expiration(days=settings.EXPORT_RETENTION_DAYS),
+                    )
+                ]
+            ),
+        )
+
+    def create_object(
+        self,
+        file_name: str,
+        file_content: Any,
+        content_type: Any,
+        bucket_name: Optional[str] = None,
+    ):
         try:
-            print(file_name, self.bucket_name)
+            print(file_name, bucket_name or self.bucket_name)
             self.instance.fput_object(
-                self.bucket_name,
+                bucket_name or self.bucket_name,
                 file_name,
                 file_content,
                 metadata={"Content-type": content_type},
@@ -93,8 +123,19 @@ class MinioClient:
             self.instance.remove_object(self.bucket_name, item.object_name)
         print("✔️ All Objects deleted")
 
-    def get_object(self, file_name: str):
-        return self.instance.get_object(self.bucket_name, object_name=file_name)
+    def get_object(self, file_name: str, bucket_name: Optional[str] = None):
+        return self.instance.get_object(
+            bucket_name or self.bucket_name, object_name=file_name
+        )
+
+    def object_exists(self, file_name: str, bucket_name: Optional[str] = None) -> bool:
+        try:
+            self.instance.stat_object(bucket_name or self.bucket_name, file_name)
+            return True
+        except S3Error as exc:
+            if exc.code in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise
 
 
 minio_client = MinioClient()
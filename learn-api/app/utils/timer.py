@@ -1,4 +1,5 @@
 import time
+from typing import Dict
 
 
 # https://gist.github.com/sumeet/1123871
@@ -89,3 +90,28 @@ class Timer(object):
         self.stop()
         if type:
             raise type(value).with_traceback(traceback)
+
+
+class StageTimer:
+    """
+    Measures the run time of consecutive stages of a computation in seconds.
+    Every lap adds the time since the previous lap to the given stage.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.last_lap = time.perf_counter()
+
+    def start(self) -> None:
+        """Start timing the first stage."""
+        self.last_lap = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """
+        Ends the current stage
+
+        :param stage: Name of the stage that ended
+        """
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self.last_lap
+        self.last_lap = now
@@ -0,0 +1,58 @@
+import os
+from typing import Any, Dict, Optional
+
+from pusher import Pusher
+
+from app.utils.logger import logger
+
+_ws_client: Optional[Pusher] = None
+
+
+def get_ws_client() -> Optional[Pusher]:
+    """
+    Creates the websocket client on first use, so the api can be imported without websocket settings
+
+    :return: The client or None if the websocket server isn't configured
+    """
+    global _ws_client
+    if _ws_client is None and os.environ.get("WEBSOCKET_APP_ID"):
+        _ws_client = Pusher(
+            app_id=os.environ.get("WEBSOCKET_APP_ID"),
+            key=os.environ.get("WEBSOCKET_APP_KEY"),
+            secret=os.environ.get("WEBSOCKET_APP_SECRET"),
+            host=os.environ.get("WEBSOCKET_HOST"),
+            port=(
+                None
+                if "WEBSOCKET_PORT" not in os.environ
+                or os.environ.get("WEBSOCKET_PORT") == ""
+                else int(os.environ.get("WEBSOCKET_PORT"))
+            ),
+            ssl=False if os.environ.get("WEBSOCKET_SSL") == "False" else True,
+        )
+    return _ws_client
+
+
+def trigger(channel: str, event: str, data: Dict[str, Any]) -> None:
+    ws_client = get_ws_client()
+    if ws_client is None:
+        logger.debug(f"Websocket isn't configured, {event} is not pushed")
+        return
+    ws_client.trigger(channel, event, data)
+
+
+def trigger_ws_task_solved(*, user_id: str, job_id: str, task_id: int, task_result):
+    trigger(
+        f"user-{user_id}",
+        "task-solved",
+        {"job_id": job_id, "task_id": task_id, "task_result": task_result},
+    )
+
+
+def trigger_ws_export_finished(
+    *, user_id: str, job_id: str, course_id: int, file_name: str
+):
+    trigger(
+        f"user-{user_id}",
+        "export-finished",
+        {"job_id": job_id, "course_id": course_id, "file_name": file_name},
+    )
@@ -0,0 +1,115 @@
+import uuid
+
+from celery import Celery
+from celery.utils.log import get_task_logger
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.export.export_cache import ExportCache
+from app.core.solver.user_solution_solver import UserSolutionSolver
+from app.crud.crud_task import crud_task
+from app.db.session import SessionManager
+from app.schemas.export import ExportFormat, ExportKind
+from app.utils.ws_client import trigger_ws_export_finished, trigger_ws_task_solved
+
+celery_app = Celery(__name__)
+celery_app.conf.broker_url = settings.RABBIT_URL
+celery_app.conf.result_backend = settings.CELERY_RESULT_BACKEND
+celery_app.conf.result_extended = True
+
+logger = get_task_logger(__name__)
+
+
+def create_job_id(user_id: str) -> str:
+    """
+    Creates the id of a job of the user. The id contains the user, so the owner of a job
+    is known before the job is started and its arguments are stored with the result.
+
+    :param user_id: Id of the user who enqueues the job
+    :return: The job id
+    """
+    return f"{user_id}:{uuid.uuid4()}"
+
+
+def is_job_of_user(job_id: str, user_id: str) -> bool:
+    """
+    Checks if the job was enqueued by the user
+
+    :param job_id: Id of the job
+    :param user_id: Id of the user
+    :return: If the user owns the job
+    """
+    return job_id.startswith(f"{user_id}:")
+
+
+@celery_app.task(name="solve_task", bind=True)
+def solve_task(self, task_id: int, user_id: str) -> dict:
+    """
+    Solves the solution of the user to the task and pushes the feedback to the channel of the user.
+
+    :param task_id: Id of the task
+    :param user_id: Id of the user
+    :return: The task and user id together with the feedback
+    """
+    with SessionManager() as db:
+        task = crud_task.get(db, id=task_id)
+        task_result = jsonable_encoder(
+            UserSolutionSolver.solve(db, task=task, user_id=user_id)
+        )
+
+    try:
+        trigger_ws_task_solved(
+            user_id=user_id,
+            job_id=self.request.id,
+            task_id=task_id,
+            task_result=task_result,
+        )
+    except Exception as exc:
+        # The feedback can still be polled, so a failed push must not fail the job
+        logger.exception(exc)
+
+    return {"task_id": task_id, "user_id": user_id, "task_result": task_result}
+
+
+@celery_app.task(name="export_user_solutions", bind=True)
+def export_user_solutions(
+    self,
+    kind: str,
+    entity_id: int,
+    export_format: str,
+    course_id: int,
+    file_name: str,
+    user_id: str,
+) -> dict:
+    """
+    Stores the export of the user solutions in the export bucket and notifies the user on their channel.
+
+    :param kind: What is exported, a value of ExportKind
+    :param entity_id: Id of the task, base task or task group
+    :param export_format: Format of the file, a value of ExportFormat
+    :param course_id: Id of the course of the exported entity
+    :param file_name: File name of the export
+    :param user_id: Id of the user who requested the export
+    :return: The course id and the file name to download the export with
+    """
+    object_name = ExportCache.get_object_name(course_id, file_name)
+    # An equal export may have been stored while the job was queued
+    if not ExportCache.is_stored(object_name):
+        with SessionManager() as db:
+            entity = ExportCache.get_entity(db, ExportKind(kind), entity_id)
+            ExportCache.store(
+                db, ExportKind(kind), entity, ExportFormat(export_format), object_name
+            )
+
+    try:
+        trigger_ws_export_finished(
+            user_id=user_id,
+            job_id=self.request.id,
+            course_id=course_id,
+            file_name=file_name,
+        )
+    except Exception as exc:
+        # The export can still be polled, so a failed push must not fail the job
+        logger.exception(exc)
+
+    return {"user_id": user_id, "course_id": course_id, "file_name": file_name}